@@ -1,5 +1,6 @@
 from io import BytesIO
 import os
+import numpy as np
 import pandas as pd
 from docx import Document
 from docx.oxml import OxmlElement
@@ -11,6 +12,17 @@ import random
 from copy import deepcopy
 from docx.oxml import OxmlElement
 from docx.oxml.ns import qn
+from estadisticas import bootstrap_intervalos, conteos_ponderados, describir
+from faltantes import puntuar_dimensiones
+from proveedores import RegistroProveedores, marcadores_plantilla
+from graficos import conteos_a_matriz, grafico_dimensiones, grafico_distribucion, graficos_por_pregunta, insertar_graficos
+from tablas import rellenar_tablas, tabla_conteos, tabla_estadisticas
+from utils import docx_a_bytes, huella_respuestas, semilla_derivada
+from clasificacion import cargar_reglas_alerta
+from planificador import leer_respuestas
+from ponderacion import clave_ponderacion, columnas_ponderacion, pesos_encuestados
+from validacion import Validacion, decodificador, minusculas
+from resultados import Resultados, conteos_matriz, montar_resultados
 
 
 def seleccionar_csv(ruta):
@@ -115,7 +127,7 @@ def replace_bookmark_pair(doc, pair):
     if not found:
         print(f"Marcador '{bookmark_name}' no encontrado")
 
-def obtenerRespuestas(dataframe, inicio, fin):
+def obtenerRespuestas(dataframe, inicio, fin, pesos=None):
     """
     Genera un diccionario con el conteo de cada respuesta por pregunta en un DataFrame, 
     construyendo las claves en el formato 'PREGUNTA_X_Y'.
@@ -129,6 +141,10 @@ def obtenerRespuestas(dataframe, inicio, fin):
     mapa_respuestas : dict
         Diccionario que mapea las respuestas posibles (claves) a valores numéricos (valores). 
         Ejemplo: {"Muy de acuerdo": 5, "De acuerdo": 4, ...}
+    pesos : np.ndarray | None
+        Peso de cada encuestado (ver ponderacion.py). Si se indica, cada conteo es
+        la suma de los pesos de quienes han dado esa respuesta, redondeada a entero,
+        calculada para todas las preguntas con un único np.bincount.
 
     Proceso de la función
     ---------------------
@@ -180,6 +196,13 @@ def obtenerRespuestas(dataframe, inicio, fin):
     """
     conteo_respuestas = {}
     valores_posibles = range(inicio, fin)
+
+    if pesos is not None:
+        conteos = np.rint(conteos_ponderados(dataframe, inicio, fin, pesos)).astype(int)
+        for i, fila in enumerate(conteos.tolist(), start=1):
+            for valor, cuenta in zip(valores_posibles, fila):
+                conteo_respuestas[f"PREGUNTA_{i}_{valor}"] = cuenta
+        return conteo_respuestas
     
     for i, pregunta in enumerate(dataframe.columns, start=1):
         # Contar respuestas para la pregunta
@@ -191,15 +214,25 @@ def obtenerRespuestas(dataframe, inicio, fin):
     
     return conteo_respuestas
 
-def calcularValores(respuestas_dim: pd.DataFrame) -> pd.DataFrame:
+def calcularValores(respuestas_dim: pd.DataFrame, intervalos=False, n_remuestras=1000, semilla=None,
+                    pesos=None) -> pd.DataFrame:
     """
-    Devuelve un DataFrame con la media y la desviación estándar
-    por cada dimensión (como filas), ya redondeadas a 2 decimales.
+    Devuelve un DataFrame con los estadísticos descriptivos de cada
+    dimensión (como filas), ya redondeados a 2 decimales.
     
     Índices: nombre de la dimensión.
-    Columnas: ['mean', 'std'].
+    Columnas: ['mean', 'std', 'min', 'max', 'p25', 'p75', 'count'] (ver
+    `estadisticas.describir`) y, si `intervalos` es True, ['ic_inf', 'ic_sup']
+    con el intervalo de confianza bootstrap (95 %) de la media.
+
+    Con `pesos` (uno por encuestado, ver ponderacion.py) los estadísticos y el
+    intervalo son ponderados.
     """
-    stats = respuestas_dim.agg(['mean', 'std']).T
+    stats = describir(respuestas_dim, pesos)
+    if intervalos:
+        stats['ic_inf'], stats['ic_sup'] = bootstrap_intervalos(
+            respuestas_dim, n_remuestras=n_remuestras, semilla=semilla, pesos=pesos
+        )
     return stats.round(2)
 
 def df_a_reemplazos(df_stats: pd.DataFrame) -> dict:
@@ -207,20 +240,28 @@ def df_a_reemplazos(df_stats: pd.DataFrame) -> dict:
     for dim, row in df_stats.iterrows():
         reemplazos[f"MEDIA_{dim}"] = row['mean']
         reemplazos[f"STD_{dim}"] = row['std']
+        if 'p25' in row:
+            reemplazos[f"P25_{dim}"] = row['p25']
+            reemplazos[f"P75_{dim}"] = row['p75']
+        if 'ic_inf' in row:
+            reemplazos[f"IC_INF_{dim}"] = row['ic_inf']
+            reemplazos[f"IC_SUP_{dim}"] = row['ic_sup']
     return reemplazos
 
-def escogerMedidas(estadisticas: pd.DataFrame, ruta_medidas, limite=10) -> dict:
-    estadisticas_corregidas = estadisticas.copy()
-    estadisticas_corregidas.loc[['FISICAS', 'SOCIALES', 'PSICOLOGICAS'], 'mean'] *= 3
-
-    # Buscar las dimensiones (filas) de estadisticas cuya media sea mayor que el límite indicado
-    alertas = estadisticas_corregidas[estadisticas_corregidas['mean'] > limite]
-
-    dims = list(alertas.index)
+def escogerMedidas(estadisticas: pd.DataFrame, ruta_medidas, limite=10, rng=None, reglas=None) -> dict:
+    """
+    Propone una medida al azar por cada dimensión en alerta. `rng` es el
+    random.Random propio del informe; sin él se usa uno sin semilla.
 
-    if len(dims) < 2:
-        dims = estadisticas_corregidas['mean'].nlargest(2).index.tolist()
+    Las dimensiones en alerta las decide `reglas` (clasificacion.ReglasAlerta);
+    por defecto se leen de alertas.json, junto a la carpeta de medidas, con el
+    `limite` indicado.
+    """
+    rng = rng if rng is not None else random.Random()
+    if reglas is None:
+        reglas = cargar_reglas_alerta(os.path.join(os.path.dirname(ruta_medidas), 'alertas.json'), limite)
 
+    dims = reglas.dimensiones(estadisticas['mean'])
 
     ficheros = {
         "CARACTERISTICAS_TAREA": 'caracteristicas_tarea',
@@ -265,7 +306,7 @@ def escogerMedidas(estadisticas: pd.DataFrame, ruta_medidas, limite=10) -> dict:
 
         #print(lista_medidas)
         # Escoge una medida al azar
-        medida = random.choice(lista_medidas)
+        medida = rng.choice(lista_medidas)
 
         parrafos.append(f"{medida}")
 
@@ -334,50 +375,32 @@ def calcular_metricas_estadisticas(respuestas_agrupadas: pd.DataFrame) -> dict:
         ...
     }
     """
-    metricas = {}
-
     dimensiones = [
         "Satisfaccion_General",
         "Satisfaccion_Intrinseca",
         "Satisfaccion_Extrinseca"
     ]
 
-    for dimension in dimensiones:
-        serie = respuestas_agrupadas[dimension]
+    # Todos los estadísticos de todas las dimensiones en una sola pasada
+    descriptivos = describir(respuestas_agrupadas[dimensiones])
 
+    metricas = {}
+    for dimension, fila in descriptivos.iterrows():
         metricas[dimension] = {
-            "media": round(serie.mean(), 2),
-            "std": round(serie.std(), 2),
-            "min": int(serie.min()),
-            "max": int(serie.max()),
-            "p25": round(serie.quantile(0.25), 2),
-            "p75": round(serie.quantile(0.75), 2),
-            "count": int(serie.count())
+            "media": round(fila['mean'], 2),
+            "std": round(fila['std'], 2),
+            "min": int(fila['min']),
+            "max": int(fila['max']),
+            "p25": round(fila['p25'], 2),
+            "p75": round(fila['p75'], 2),
+            "count": int(fila['count'])
         }
 
     return metricas
 
-def generar_informe_burnout(csv_source, empresa, invitados, limite=10) -> bytes:
-    ruta_script = os.path.dirname("./Burnout/")
-    carpeta_plantillas = os.path.join(ruta_script, "Plantillas")
-    carpeta_medidas = os.path.join(ruta_script, "Medidas")
-    ruta_config = os.path.join(ruta_script, "Dimensiones_CBB.json")
-
-    # Carga de la configuración de dimensiones del CBB
-    ruta_config = os.path.join(ruta_script, 'Dimensiones_CBB.json')
-    with open(ruta_config, 'r', encoding='utf-8') as f:
-        config = json.load(f)
-
-    # Leer CSV (puede ser filepath o UploadedFile)
-    if hasattr(csv_source, "read"):
-        respuestas = pd.read_csv(csv_source, sep=None, engine="python")
-    else:
-        respuestas = pd.read_csv(csv_source, sep=None, engine="python")
-    preguntas = list(respuestas.columns)
-
-    # Mapa de respuestas CBB
-    # Se normaliza todo a minúsculas y sin espacios sobrantes
-    mapa_respuestas = {
+# Mapa de respuestas CBB
+# Se normaliza todo a minúsculas y sin espacios sobrantes
+MAPA_RESPUESTAS_CBB = {
     # Escala “nada” → “mucho” (ítems 13,15,16,17,19)
     "nada": 1,
     "muy poco": 2,
@@ -399,43 +422,195 @@ def generar_informe_burnout(csv_source, empresa, invitados, limite=10) -> bytes:
     # Escala “nunca” → “siempre” (ítems 9,18)
     "nunca": 1,
     "siempre": 5
-    }
-
-    # Conversión de texto a números
-    '''respuestas_convertidas = respuestas.applymap(lambda x: mapa_respuestas.get(x.strip().lower(), x) if isinstance(x, str) else x)
-    respuestas_convertidas = respuestas.applymap(lambda x: mapa_respuestas.get(x, x))'''
+}
 
-    respuestas_convertidas = respuestas.map(lambda x: mapa_respuestas.get(x.strip().lower(), x.strip().lower()) if isinstance(x, str) else x)
+def leer_respuestas_cbb(csv_source, config: dict, plan=None, excluir=()) -> Validacion:
+    """
+    Lectura, validación y conversión de las respuestas de texto del CBB a su valor
+    numérico (1-5), con el modo de lectura que corresponda al tamaño del fichero.
+    Las filas con respuestas fuera del vocabulario quedan en cuarentena; las
+    columnas de `excluir` (las de la ponderación) no se leen como respuestas.
+    """
+    n_items = max(item for bloque in config.values() for info in bloque.values() for item in info['items'])
+    return leer_respuestas(csv_source, decodificador(MAPA_RESPUESTAS_CBB, minusculas), 1, 5,
+                           n_columnas=n_items, plan=plan, excluir=excluir)
 
-    # Agrupamiento por dimensión
-    respuestas_agrupadas = pd.DataFrame(index=respuestas.index)
+def agrupar_dimensiones(respuestas_convertidas: pd.DataFrame, config: dict) -> pd.DataFrame:
+    """
+    Puntuación de cada encuestado en cada dimensión del CBB: suma de los ítems
+    (índices 1-based sobre las columnas del CSV) que indica `config`. Los ítems
+    sin responder se tratan según la clave opcional "faltantes" de cada dimensión
+    (p. ej. {"politica": "prorrateo", "minimo": 2}; ver faltantes.py).
+    """
+    preguntas = list(respuestas_convertidas.columns)
+    dimensiones, politicas = {}, {}
 
     for bloque_nombre, bloque in config.items():
         for dim_nombre, info in bloque.items():
-            items = info['items']
             # Convertimos la lista de índices 1-based en nombres de columna
-            cols = [preguntas[i-1] for i in items]
-            respuestas_agrupadas[dim_nombre] = respuestas_convertidas[cols].sum(axis=1)
+            dimensiones[dim_nombre] = [preguntas[i-1] for i in info['items']]
+            politicas[dim_nombre] = info.get('faltantes')
+    return puntuar_dimensiones(respuestas_convertidas, dimensiones, politicas)
+
+def puntuar_burnout(csv_source, ruta_config="./Burnout/Dimensiones_CBB.json", excluir=()) -> pd.DataFrame:
+    """
+    Lectura, conversión y agrupación por dimensiones de un CSV del CBB, sin montar
+    ningún documento. Devuelve las puntuaciones por encuestado (filas) y dimensión.
+    """
+    with open(ruta_config, 'r', encoding='utf-8') as f:
+        config = json.load(f)
+    validacion = leer_respuestas_cbb(csv_source, config, excluir=excluir)
+    return agrupar_dimensiones(validacion.valores, config)
+
+def nombres_dimensiones(config: dict) -> dict:
+    """{dimensión: nombre legible} de la configuración del CBB."""
+    return {dim: info['nombre'] for bloque in config.values() for dim, info in bloque.items()}
 
+def registrar_proveedores_burnout(registro: RegistroProveedores, validacion: Validacion, config: dict,
+                                  empresa, invitados, limite=10, intervalos_confianza=False,
+                                  n_remuestras=1000, semilla=None, carpeta_medidas="./Burnout/Medidas",
+                                  ponderacion=None):
+    """
+    Registra en `registro` los proveedores de datos del informe de Burnout. La
+    clave de cada uno son los parámetros de los que depende: si se vuelven a
+    registrar en el mismo registro con otros parámetros, solo se recalcula lo que
+    depende de los que han cambiado (ver vista_previa.py).
+    """
+    # Semilla del informe (medidas y bootstrap): la indicada o una derivada de las
+    # entradas, de modo que las mismas entradas dan exactamente el mismo .docx
+    def derivar_semilla(r):
+        if semilla is not None:
+            return semilla
+        return semilla_derivada(r.obtener('huella_respuestas'), empresa, invitados, limite)
 
     # Cálculo de la participación
-    informacion = {
-        "NOMBRE_EMPRESA": empresa,
-        "PARTICIPACION": round(len(respuestas)/invitados*100, 2) if invitados>0 else 0
+    def informacion(r):
+        n_respuestas = len(r.obtener('respuestas_convertidas'))
+        return {
+            "NOMBRE_EMPRESA": empresa,
+            "PARTICIPACION": round(n_respuestas/invitados*100, 2) if invitados>0 else 0
+        }
+
+    def estadisticas(r):
+        # Los intervalos salen en la tabla de dimensiones y en los resultados exportados,
+        # no solo en los marcadores IC_*: se calculan siempre que se pidan
+        return calcularValores(r.obtener('respuestas_agrupadas'), intervalos_confianza, n_remuestras,
+                               r.obtener('semilla') if intervalos_confianza else None, r.obtener('pesos'))
+
+    registro.registrar('respuestas_convertidas', lambda r: validacion.valores, clave=id(validacion))
+    registro.registrar('pesos', lambda r: pesos_encuestados(validacion, ponderacion),
+                       clave=(id(validacion), clave_ponderacion(ponderacion)))
+    registro.registrar('huella_respuestas', lambda r: huella_respuestas(r.obtener('respuestas_convertidas')), clave=())
+    registro.registrar('semilla', derivar_semilla, clave=(semilla, empresa, invitados, limite))
+    registro.registrar('informacion', informacion, patron=r'NOMBRE_EMPRESA|PARTICIPACION', clave=(empresa, invitados))
+    # Agrupamiento por dimensión
+    registro.registrar('respuestas_agrupadas',
+                       lambda r: agrupar_dimensiones(r.obtener('respuestas_convertidas'), config), clave=())
+    registro.registrar('estadisticas', estadisticas, clave=(intervalos_confianza, n_remuestras))
+    registro.registrar('calculos', lambda r: df_a_reemplazos(r.obtener('estadisticas')),
+                       patron=r'(MEDIA|STD|P25|P75|IC_INF|IC_SUP)_\w+', clave=())
+    registro.registrar('conteo_respuestas', lambda r: obtenerRespuestas(r.obtener('respuestas_convertidas'), 1, 6,
+                                                                        r.obtener('pesos')),
+                       patron=r'PREGUNTA_\d+_\d+', clave=())
+    registro.registrar('reglas_alerta', lambda r: cargar_reglas_alerta(
+        os.path.join(os.path.dirname(carpeta_medidas), 'alertas.json'), limite), clave=(limite, carpeta_medidas))
+    registro.registrar('alertas', lambda r: r.obtener('reglas_alerta').dimensiones(r.obtener('estadisticas')['mean']),
+                       clave=())
+    registro.registrar('medidas', lambda r: escogerMedidas(r.obtener('estadisticas'), carpeta_medidas, limite,
+                                                       random.Random(r.obtener('semilla')),
+                                                       r.obtener('reglas_alerta')),
+                       patron=r'MEDIDAS', clave=(limite, carpeta_medidas))
+    registro.registrar('matriz_conteos', lambda r: conteos_a_matriz(r.obtener('conteo_respuestas')), clave=())
+
+def tablas_burnout(registro: RegistroProveedores, config: dict) -> dict:
+    """Proveedores (cabecera, filas) de las tablas TABLA_* del informe de Burnout."""
+    preguntas = list(registro.obtener('respuestas_convertidas').columns)
+    return {
+        'TABLA_PORCENTAJES': lambda: tabla_conteos(registro.obtener('matriz_conteos'), titulos=preguntas, porcentajes=True),
+        'TABLA_DIMENSIONES': lambda: tabla_estadisticas(registro.obtener('estadisticas'), nombres_dimensiones(config)),
     }
 
-    estadisticas = calcularValores(respuestas_agrupadas)
-    calculos = df_a_reemplazos(estadisticas)
-    conteo_respuestas = obtenerRespuestas(respuestas, 1, 6)
-    medidas = escogerMedidas(estadisticas, carpeta_medidas, limite)
+def resultados_burnout(registro: RegistroProveedores, validacion: Validacion, config: dict,
+                       empresa, invitados) -> Resultados:
+    """Resultados del informe de Burnout con los datos ya calculados en `registro`."""
+    return montar_resultados(
+        "burnout", empresa, invitados, registro.obtener('informacion')['PARTICIPACION'],
+        len(validacion.valores), len(validacion.cuarentena), registro.obtener('estadisticas'),
+        conteos_matriz(registro.obtener('matriz_conteos'), titulos=list(validacion.valores.columns)),
+        nombres=nombres_dimensiones(config), alertas=registro.obtener('alertas'),
+        medidas=registro.obtener('medidas')['MEDIDAS'].split("\n"),
+    )
+
+def generar_informe_burnout(csv_source, empresa, invitados, limite=10,
+                            intervalos_confianza=False, n_remuestras=1000, semilla=None,
+                            graficos=False, resultados=False, ponderacion=None, registro=None):
+    """
+    Genera el informe de Burnout (CBB) en memoria y devuelve los bytes del .docx.
+
+    Si `intervalos_confianza` es True se calcula el intervalo bootstrap de cada
+    media con `n_remuestras` remuestras; aparece en la tabla TABLA_DIMENSIONES,
+    en los resultados y en los marcadores IC_INF_<DIM> e IC_SUP_<DIM> si la
+    plantilla los tiene.
+
+    `semilla` fija la selección de medidas y el bootstrap; si es None se deriva
+    de las respuestas y los parámetros, así que las mismas entradas producen
+    siempre el mismo documento, byte a byte.
+
+    Si `graficos` es True se insertan gráficos nativos de Word (medias por
+    dimensión, distribución global y uno por pregunta) en el marcador GRAFICOS
+    o, si la plantilla no lo tiene, al final del documento.
+
+    Si `resultados` es True devuelve (bytes del .docx, resultados.Resultados) con
+    los estadísticos, conteos, alertas y medidas del informe.
+
+    `ponderacion` ({"columna": ...} o {"segmento": ..., "poblacion": ...}, ver
+    ponderacion.py) pondera los conteos y los estadísticos de cada encuestado.
+
+    Si se pasa un `registro` (proveedores.RegistroProveedores) vacío, el informe
+    deja en él sus datos calculados ('respuestas_agrupadas', 'pesos',
+    'estadisticas'...) para reutilizarlos sin volver a leer el CSV.
+    """
+    ruta_script = os.path.dirname("./Burnout/")
+    carpeta_plantillas = os.path.join(ruta_script, "Plantillas")
+    carpeta_medidas = os.path.join(ruta_script, "Medidas")
+    ruta_config = os.path.join(ruta_script, "Dimensiones_CBB.json")
+
+    # Carga de la configuración de dimensiones del CBB
+    ruta_config = os.path.join(ruta_script, 'Dimensiones_CBB.json')
+    with open(ruta_config, 'r', encoding='utf-8') as f:
+        config = json.load(f)
+
+    # Leer y validar el CSV (ruta, volcado proyectado en memoria o UploadedFile) antes
+    # de cualquier cálculo: las filas no reconocidas quedan en cuarentena
+    validacion = leer_respuestas_cbb(csv_source, config, excluir=columnas_ponderacion(ponderacion))
+    preguntas = list(validacion.valores.columns)
 
-    reemplazos = informacion | calculos | conteo_respuestas | medidas
     plantilla = os.path.join(carpeta_plantillas, "plantilla_burnout.docx")
 
+    # Cada dato se calcula solo si la plantilla contiene algún marcador que lo use
+    registro = registro if registro is not None else RegistroProveedores()
+    registrar_proveedores_burnout(registro, validacion, config, empresa, invitados, limite,
+                                  intervalos_confianza, n_remuestras, semilla, carpeta_medidas, ponderacion)
+    reemplazos = registro.resolver(marcadores_plantilla(plantilla))
+
+    nombres = nombres_dimensiones(config)
+
     doc = Document(plantilla)
     list(map(lambda pair: replace_bookmark_pair(doc, pair), reemplazos.items()))
 
-    buffer = BytesIO()
-    doc.save(buffer)
-    buffer.seek(0)
-    return buffer.getvalue()
+    # Tablas completas (si la plantilla las marca con TABLA_*), escritas de una vez
+    rellenar_tablas(doc, tablas_burnout(registro, config))
+
+    if graficos:
+        matriz = registro.obtener('matriz_conteos')
+        estadisticas = registro.obtener('estadisticas')
+        medias = {nombres.get(dim, dim): media for dim, media in estadisticas['mean'].items()}
+        insertar_graficos(doc, [
+            grafico_dimensiones(medias),
+            grafico_distribucion(matriz),
+            *graficos_por_pregunta(matriz, titulos=[f"{i}. {p}" for i, p in enumerate(preguntas, start=1)]),
+        ])
+
+    if resultados:
+        return docx_a_bytes(doc), resultados_burnout(registro, validacion, config, empresa, invitados)
+    return docx_a_bytes(doc)
@@ -1,4 +1,5 @@
 import os
+import numpy as np
 import pandas as pd
 from docx import Document
 from docx.oxml import OxmlElement
@@ -11,6 +12,16 @@ from docx import Document
 from docx.text.paragraph import Paragraph
 from docx.enum.style import WD_STYLE_TYPE
 from io import BytesIO
+from estadisticas import bootstrap_intervalos, conteos_ponderados, describir
+from graficos import insertar_grafico, xml_grafico_barras
+from tablas import crear_tabla
+from catalogo_preguntas import MAPA_RESPUESTAS_GENERICO, cargar_catalogo
+from planificador import leer_respuestas
+from ponderacion import clave_ponderacion, pesos_encuestados
+from proveedores import RegistroProveedores
+from utils import docx_a_bytes, leer_cabecera, semilla_derivada
+from validacion import Validacion, decodificador, minusculas
+from resultados import Resultados, montar_resultados
 
 def seleccionar_csv(ruta):
     """Busca archivos CSV en la carpeta de la ruta proporcionada.
@@ -138,7 +149,7 @@ def replace_bookmark_pair(doc, pair):
     if not found:
         print(f"Marcador '{bookmark_name}' no encontrado")
 
-def obtenerRespuestas(dataframe, inicio, fin):
+def obtenerRespuestas(dataframe, inicio, fin, pesos=None):
     """
     Genera un diccionario con el conteo de cada respuesta por pregunta en un DataFrame, 
     construyendo las claves en el formato 'PREGUNTA_X_Y'.
@@ -152,6 +163,10 @@ def obtenerRespuestas(dataframe, inicio, fin):
     mapa_respuestas : dict
         Diccionario que mapea las respuestas posibles (claves) a valores numéricos (valores). 
         Ejemplo: {"Muy de acuerdo": 5, "De acuerdo": 4, ...}
+    pesos : np.ndarray | None
+        Peso de cada encuestado (ver ponderacion.py). Si se indica, cada conteo es
+        la suma de los pesos de quienes han dado esa respuesta, redondeada a entero,
+        calculada para todas las preguntas con un único np.bincount.
 
     Proceso de la función
     ---------------------
@@ -203,6 +218,13 @@ def obtenerRespuestas(dataframe, inicio, fin):
     """
     conteo_respuestas = {}
     valores_posibles = range(inicio, fin)
+
+    if pesos is not None:
+        conteos = np.rint(conteos_ponderados(dataframe, inicio, fin, pesos)).astype(int)
+        for i, fila in enumerate(conteos.tolist(), start=1):
+            for valor, cuenta in zip(valores_posibles, fila):
+                conteo_respuestas[f"PREGUNTA_{i}_{valor}"] = cuenta
+        return conteo_respuestas
     
     for i, pregunta in enumerate(dataframe.columns, start=1):
         # Contar respuestas para la pregunta
@@ -214,15 +236,25 @@ def obtenerRespuestas(dataframe, inicio, fin):
     
     return conteo_respuestas
 
-def calcularValores(respuestas_dim: pd.DataFrame) -> pd.DataFrame:
+def calcularValores(respuestas_dim: pd.DataFrame, intervalos=False, n_remuestras=1000, semilla=None,
+                    pesos=None) -> pd.DataFrame:
     """
-    Devuelve un DataFrame con la media y la desviación estándar
-    por cada dimensión (como filas), ya redondeadas a 2 decimales.
+    Devuelve un DataFrame con los estadísticos descriptivos de cada
+    dimensión (como filas), ya redondeados a 2 decimales.
     
     Índices: nombre de la dimensión.
-    Columnas: ['mean', 'std'].
+    Columnas: ['mean', 'std', 'min', 'max', 'p25', 'p75', 'count'] (ver
+    `estadisticas.describir`) y, si `intervalos` es True, ['ic_inf', 'ic_sup']
+    con el intervalo de confianza bootstrap (95 %) de la media.
+
+    Con `pesos` (uno por encuestado, ver ponderacion.py) los estadísticos y el
+    intervalo son ponderados.
     """
-    stats = respuestas_dim.agg(['mean', 'std']).T
+    stats = describir(respuestas_dim, pesos)
+    if intervalos:
+        stats['ic_inf'], stats['ic_sup'] = bootstrap_intervalos(
+            respuestas_dim, n_remuestras=n_remuestras, semilla=semilla, pesos=pesos
+        )
     return stats.round(2)
 
 def df_a_reemplazos(df_stats: pd.DataFrame) -> dict:
@@ -230,9 +262,16 @@ def df_a_reemplazos(df_stats: pd.DataFrame) -> dict:
     for dim, row in df_stats.iterrows():
         reemplazos[f"MEDIA_{dim}"] = row['mean']
         reemplazos[f"STD_{dim}"] = row['std']
+        if 'p25' in row:
+            reemplazos[f"P25_{dim}"] = row['p25']
+            reemplazos[f"P75_{dim}"] = row['p75']
+        if 'ic_inf' in row:
+            reemplazos[f"IC_INF_{dim}"] = row['ic_inf']
+            reemplazos[f"IC_SUP_{dim}"] = row['ic_sup']
     return reemplazos
 
-def escogerMedidas(estadisticas: pd.DataFrame, limite=10) -> dict:
+def escogerMedidas(estadisticas: pd.DataFrame, limite=10, rng=None) -> dict:
+    rng = rng if rng is not None else random.Random()
     estadisticas_corregidas = estadisticas.copy()
     estadisticas_corregidas.loc[['FISICAS', 'SOCIALES', 'PSICOLOGICAS'], 'mean'] *= 3
 
@@ -288,7 +327,7 @@ def escogerMedidas(estadisticas: pd.DataFrame, limite=10) -> dict:
 
         #print(lista_medidas)
         # Escoge una medida al azar
-        medida = random.choice(lista_medidas)
+        medida = rng.choice(lista_medidas)
 
         parrafos.append(f"{medida}")
 
@@ -347,25 +386,25 @@ def calcular_metricas_estadisticas(respuestas_agrupadas: pd.DataFrame) -> dict:
         ...
     }
     """
-    metricas = {}
-
     dimensiones = [
         "Satisfaccion_General",
         "Satisfaccion_Intrinseca",
         "Satisfaccion_Extrinseca"
     ]
 
-    for dimension in dimensiones:
-        serie = respuestas_agrupadas[dimension]
+    # Todos los estadísticos de todas las dimensiones en una sola pasada
+    descriptivos = describir(respuestas_agrupadas[dimensiones])
 
+    metricas = {}
+    for dimension, fila in descriptivos.iterrows():
         metricas[dimension] = {
-            "media": round(serie.mean(), 2),
-            "std": round(serie.std(), 2),
-            "min": int(serie.min()),
-            "max": int(serie.max()),
-            "p25": round(serie.quantile(0.25), 2),
-            "p75": round(serie.quantile(0.75), 2),
-            "count": int(serie.count())
+            "media": round(fila['mean'], 2),
+            "std": round(fila['std'], 2),
+            "min": int(fila['min']),
+            "max": int(fila['max']),
+            "p25": round(fila['p25'], 2),
+            "p75": round(fila['p75'], 2),
+            "count": int(fila['count'])
         }
 
     return metricas
@@ -385,25 +424,20 @@ def load_questions(json_data: dict, locale: str = "es") -> list[dict]:
     -------
     List[Dict]
         Lista de preguntas con {'text', 'options'} para el locale.
+        Se obtiene del catálogo compilado (ver `catalogo_preguntas.cargar_catalogo`).
     """
-    # Validación de locale
-    locales = json_data.get("availableLocales", [])
-    if locale not in locales:
-        raise ValueError(
-            f"Locale '{locale}' no disponible. Solo están: {locales}"
-        )
-    preguntas = []
-    for q in json_data.get("questions", []):
-        texto = q.get("questionTexts", {}).get(locale, "").strip()
-        opts = []
-        for opt in q.get("options", []):
-            opt_text = opt.get("optionTexts", {}).get(locale, "").strip()
-            opts.append({
-                "text": opt_text,
-                "value": opt.get("value")
-            })
-        preguntas.append({"text": texto, "options": opts})
-    return preguntas
+    catalogo = cargar_catalogo(json_data)
+    catalogo.validar_locale(locale)
+    return [
+        {
+            "text": pregunta.textos.get(locale, ""),
+            "options": [
+                {"text": opcion.textos.get(locale, ""), "value": opcion.valor}
+                for opcion in pregunta.opciones
+            ],
+        }
+        for pregunta in catalogo.preguntas
+    ]
 
 def insert_paragraph_after(paragraph, text=None, style=None):
     """
@@ -419,64 +453,191 @@ def insert_paragraph_after(paragraph, text=None, style=None):
         new_para.style = style
     return new_para
 
-def generar_informe_generico(csv_source, json_source, empresa: str, titulo: str, invitados: int, locale: str = "es") -> bytes:
+def leer_respuestas_generico(csv_source, catalogo, cabecera=None, plan=None) -> Validacion:
     """
-    Genera un informe genérico leyendo:
-      - csv_source: ruta o UploadedFile de Streamlit con las respuestas.
-      - json_source: ruta o UploadedFile de Streamlit con las preguntas.
-    Devuelve el .docx en memoria (bytes) listo para descargar.
+    Lectura, validación y conversión (0-10) de las columnas del CSV con preguntas
+    del catálogo, con el modo de lectura que corresponda al tamaño del fichero.
     """
-    # 1) Plantilla
-    ruta_script = os.path.dirname("./Generico/")
-    carpeta_plantillas = os.path.join(ruta_script, "Plantillas")
-    plantilla_path = os.path.join(carpeta_plantillas, "plantilla_generico.docx")
+    cabecera = cabecera if cabecera is not None else leer_cabecera(csv_source, sep=";")
+    columnas = [cabecera[p.columna - 1] for p in catalogo.preguntas if p.columna <= len(cabecera)]
+    return leer_respuestas(
+        csv_source, decodificador(MAPA_RESPUESTAS_GENERICO, minusculas), 0, 10, sep=";",
+        columnas=columnas, n_columnas=max((p.columna for p in catalogo.preguntas), default=0), plan=plan)
 
-    # 2) Carga del JSON de preguntas (file-like o ruta)
-    if isinstance(json_source, dict):
-        json_data = json_source
-    elif hasattr(json_source, "read"):
-        json_source.seek(0)
-        json_data = json.load(json_source)
-    else:
-        json_data = json.load(open(json_source, encoding="utf-8"))
+def puntuar_generico(csv_source, json_source) -> pd.DataFrame:
+    """
+    Lectura y conversión de un CSV genérico sin montar ningún documento. Devuelve
+    la puntuación (0-10) de cada encuestado (filas) en cada pregunta del catálogo.
+    """
+    return leer_respuestas_generico(csv_source, cargar_catalogo(json_source)).valores
 
-    preguntas = load_questions(json_data, locale)
+def registrar_proveedores_generico(registro: RegistroProveedores, validacion: Validacion, ponderacion=None):
+    """
+    Registra en `registro` las puntuaciones de cada encuestado en cada pregunta
+    ('respuestas_agrupadas') y sus 'pesos', con los mismos nombres que los
+    proveedores de los informes de Burnout y satisfacción.
+    """
+    registro.registrar('respuestas_agrupadas', lambda r: validacion.valores, clave=id(validacion))
+    registro.registrar('pesos', lambda r: pesos_encuestados(validacion, ponderacion),
+                       clave=(id(validacion), clave_ponderacion(ponderacion)))
 
-    # 3) Lectura del CSV
-    if hasattr(csv_source, "read"):
-        respuestas = pd.read_csv(csv_source, sep=";", engine="python")
-    else:
-        respuestas = pd.read_csv(csv_source, sep=";", engine="python")
+def calcular_generico(csv_source, json_source, intervalos_confianza: bool = False,
+                      n_remuestras: int = 1000, semilla=None, ponderacion=None, registro=None) -> dict:
+    """
+    Parte común (independiente del idioma) del informe genérico: lee el CSV,
+    convierte las respuestas, cuenta y calcula los estadísticos una sola vez.
 
-    
-    # 4) Info fija
-    info = {
+    Retorna
+    -------
+    dict
+        {'catalogo': CatalogoPreguntas, 'n_respuestas': int, 'n_cuarentena': int, 'intervalos': bool,
+         'secciones': [{'pregunta': Pregunta, 'conteos': [int por opción], 'stats': pd.Series}]}
+        Las secciones solo contienen datos numéricos; los textos se toman del
+        catálogo en el idioma de cada informe al renderizar.
+
+    Con un `registro` (proveedores.RegistroProveedores) quedan en él las
+    puntuaciones y los pesos de cada encuestado (ver `registrar_proveedores_generico`).
+    """
+    # Catálogo compilado de preguntas (file-like, ruta o dict; cacheado por contenido)
+    catalogo = cargar_catalogo(json_source)
+
+    # Leer CSV (ruta, volcado proyectado en memoria o UploadedFile), validar y mapear
+    # texto→valor las columnas con preguntas del catálogo: las filas no reconocidas
+    # quedan en cuarentena antes de cualquier cálculo
+    cabecera = leer_cabecera(csv_source, sep=";")
+    validacion = leer_respuestas_generico(csv_source, catalogo, cabecera)
+    registro = registro if registro is not None else RegistroProveedores()
+    registrar_proveedores_generico(registro, validacion, ponderacion)
+    return resumir_generico(validacion, catalogo, cabecera, intervalos_confianza, n_remuestras, semilla,
+                            registro.obtener('pesos'))
+
+def resumir_generico(validacion: Validacion, catalogo, cabecera, intervalos_confianza: bool = False,
+                     n_remuestras: int = 1000, semilla=None, pesos=None) -> dict:
+    """
+    Conteos y estadísticos de `calcular_generico` a partir de unas respuestas ya
+    leídas y validadas (con la `cabecera` completa del CSV), ponderados si se
+    pasan los `pesos` de cada encuestado (ver ponderacion.py).
+    """
+    # Las columnas sin pregunta quedan vacías para conservar la posición de cada pregunta
+    df_val = validacion.valores.reindex(columns=cabecera)
+
+    # Semilla del bootstrap: la indicada o una derivada de las respuestas
+    if semilla is None:
+        semilla = semilla_derivada(validacion.valores, catalogo.huella)
+
+    # Conteos y stats, con el mismo rango 0-10 de la validación ("No" es el código 0)
+    conteos  = obtenerRespuestas(df_val, inicio=0, fin=11, pesos=pesos)
+    df_stats = calcularValores(df_val, intervalos_confianza, n_remuestras, semilla, pesos)
+
+    secciones = []
+    for pregunta in catalogo.preguntas:
+        idx = pregunta.columna
+        # el código de cada opción ya viene compilado en el catálogo
+        secciones.append({
+            "pregunta": pregunta,
+            "conteos": [conteos.get(f"PREGUNTA_{idx}_{opcion.codigo}", 0) for opcion in pregunta.opciones],
+            "stats": df_stats.iloc[idx-1],
+        })
+
+    return {
+        "catalogo": catalogo,
+        "n_respuestas": len(df_val),
+        "n_cuarentena": len(validacion.cuarentena),
+        "intervalos": intervalos_confianza,
+        "secciones": secciones,
+    }
+
+def contenido_pregunta(seccion: dict, locale: str, intervalos_confianza: bool = False) -> dict:
+    """
+    Textos de una sección de `calcular_generico` en el idioma `locale`:
+    {'texto': enunciado, 'conteos': {opción: respuestas}, 'resultados': [líneas de estadísticos]}.
+    """
+    pregunta = seccion["pregunta"]
+    stats = seccion["stats"]
+    resultados = [f"{etiqueta}: {stats[campo]:.2f}"
+                  for etiqueta, campo in (("Media","mean"),("Desviación típica","std"),
+                                          ("Percentil 25","p25"),("Percentil 75","p75"))]
+    if intervalos_confianza:
+        resultados.append(f"Intervalo de confianza (95 %): [{stats['ic_inf']:.2f}, {stats['ic_sup']:.2f}]")
+    return {
+        "texto": pregunta.textos.get(locale, ""),
+        "conteos": {opcion.textos.get(locale, ""): cnt for opcion, cnt in zip(pregunta.opciones, seccion["conteos"])},
+        "resultados": resultados,
+    }
+
+def tabla_generico(calculo: dict, locale: str):
+    """(cabecera, filas) de la tabla compacta de resultados, con una fila por pregunta."""
+    cabecera = ["Pregunta", "Respuestas", "N", "Media", "Desv. típica", "P25", "P75"]
+    if calculo["intervalos"]:
+        cabecera.append("IC 95 %")
+    filas = []
+    for seccion in calculo["secciones"]:
+        contenido = contenido_pregunta(seccion, locale)
+        stats = seccion["stats"]
+        fila = [
+            contenido["texto"],
+            "; ".join(f"{texto}: {cnt}" for texto, cnt in contenido["conteos"].items()),
+            int(stats["count"]),
+            stats["mean"], stats["std"], stats["p25"], stats["p75"],
+        ]
+        if calculo["intervalos"]:
+            fila.append(f"[{stats['ic_inf']:.2f}, {stats['ic_sup']:.2f}]")
+        filas.append(fila)
+    return cabecera, filas
+
+def informacion_generico(calculo: dict, empresa: str, titulo: str, invitados: int) -> dict:
+    """Marcadores fijos del informe genérico."""
+    return {
         "NOMBRE_EMPRESA": empresa,
         "TITULO_INFORME":  titulo,
-        "PARTICIPACION":   round(len(respuestas) / invitados * 100, 2) if invitados>0 else 0
+        "PARTICIPACION":   round(calculo["n_respuestas"] / invitados * 100, 2) if invitados>0 else 0
     }
 
-    # 5) Mapeo texto→valor
-    mapa_respuestas = {'no':0, 'sí':10, 'si':10}
-    df_val = respuestas.applymap(
-        lambda x: mapa_respuestas.get(str(x).strip().lower(),
-                     int(x) if str(x).isdigit() else x)
-        if isinstance(x, str) else x
-    )
+def resultados_generico(calculo: dict, empresa: str, invitados: int, locale: str) -> Resultados:
+    """
+    Resultados del informe genérico a partir de `calcular_generico`: una
+    "dimensión" por pregunta y los conteos de sus opciones, con los textos en `locale`.
+    """
+    secciones = calculo["secciones"]
+    estadisticas = pd.DataFrame([seccion["stats"] for seccion in secciones],
+                                index=[str(seccion["pregunta"].id) for seccion in secciones])
+    conteos = []
+    nombres = {}
+    for seccion in secciones:
+        contenido = contenido_pregunta(seccion, locale)
+        nombres[str(seccion["pregunta"].id)] = contenido["texto"]
+        conteos.extend({"pregunta": contenido["texto"], "valor": opcion.codigo, "etiqueta": texto, "respuestas": int(cnt)}
+                       for opcion, (texto, cnt) in zip(seccion["pregunta"].opciones, contenido["conteos"].items()))
+    info = informacion_generico(calculo, empresa, "", invitados)
+    return montar_resultados("generico", empresa, invitados, info["PARTICIPACION"], calculo["n_respuestas"],
+                             calculo["n_cuarentena"], estadisticas, conteos, nombres=nombres)
+
+def renderizar_generico(calculo: dict, empresa: str, titulo: str, invitados: int, locale: str = "es",
+                        graficos: bool = False, formato: str = "lista") -> bytes:
+    """
+    Monta el .docx de un informe genérico en el idioma `locale` a partir del
+    resultado de `calcular_generico`, sin repetir ningún cálculo.
+    """
+    catalogo = calculo["catalogo"]
+    catalogo.validar_locale(locale)
+    intervalos_confianza = calculo["intervalos"]
+
+    # Plantilla
+    ruta_script = os.path.dirname("./Generico/")
+    carpeta_plantillas = os.path.join(ruta_script, "Plantillas")
+    plantilla_path = os.path.join(carpeta_plantillas, "plantilla_generico.docx")
 
-    # 6) Conteos y stats
-    from Generar_informe_Generico import obtenerRespuestas, calcularValores  # o importa desde utils
-    conteos  = obtenerRespuestas(df_val, inicio=1, fin=11)
-    df_stats = calcularValores(df_val)
+    # Info fija
+    info = informacion_generico(calculo, empresa, titulo, invitados)
 
-    # 7) Montaje del DOCX en memoria
+    # Montaje del DOCX en memoria
     doc = Document(plantilla_path)
 
-    # 7.1) Reemplazo de marcadores con info fija
+    # Reemplazo de marcadores con info fija
     for marcador, texto in info.items():
         replace_bookmark_pair(doc, (marcador, str(texto)))
 
-    # 7.2) Inserción dinámica de preguntas y resultados
+    # Inserción dinámica de preguntas y resultados
     # Busca párrafo-ancla
     for p in doc.paragraphs:
         if "TEXTO_PREGUNTAS" in p.text:
@@ -487,29 +648,101 @@ def generar_informe_generico(csv_source, json_source, empresa: str, titulo: str,
         raise RuntimeError("Marcador TEXTO_PREGUNTAS no encontrado")
 
     current = anchor
-    for idx, q in enumerate(preguntas, start=1):
+    graficos_tabla = []
+    for seccion in calculo["secciones"]:
+        contenido = contenido_pregunta(seccion, locale, intervalos_confianza)
+        conteos_pregunta = contenido["conteos"]
+        xml = None
+        if graficos:
+            xml = xml_grafico_barras(contenido["texto"], list(conteos_pregunta),
+                                     {"Respuestas": list(conteos_pregunta.values())})
+
+        if formato == "tabla":
+            if xml is not None:
+                graficos_tabla.append(xml)
+            continue
+
         # pregunta
-        print(f"Imprimiendo {q}")
-        current = insert_paragraph_after(current, q["text"], style="Normal")
-        # opciones y conteos
-        for opt in q["options"]:
-            raw = opt["value"]
-            val = mapa_respuestas.get(str(raw).strip().lower(), 
-                                      int(raw) if str(raw).isdigit() else None)
-            cnt = conteos.get(f"PREGUNTA_{idx}_{val}", 0)
-            current = insert_paragraph_after(current, f"{opt['text']}: {cnt}", style="Bullet list")
+        print(f"Imprimiendo {{'text': {contenido['texto']!r}}}")
+        current = insert_paragraph_after(current, contenido["texto"], style="Normal")
+        for texto, cnt in conteos_pregunta.items():
+            current = insert_paragraph_after(current, f"{texto}: {cnt}", style="Bullet list")
+        if xml is not None:
+            current = Paragraph(insertar_grafico(doc, xml, current._p), current._parent)
         # estadísticos
-        stats = df_stats.iloc[idx-1]
         current = insert_paragraph_after(current, "Resultados:", style="Normal")
-        for etiqueta, campo in (("Media","mean"),("Desviación típica","std")):
-            current = insert_paragraph_after(
-                current,
-                f"{etiqueta}: {stats[campo]:.2f}",
-                style="Bullet list"
-            )
-
-    # 8) Volcado a bytes
-    buf = BytesIO()
-    doc.save(buf)
-    buf.seek(0)
-    return buf.getvalue()
\ No newline at end of file
+        for linea in contenido["resultados"]:
+            current = insert_paragraph_after(current, linea, style="Bullet list")
+
+    if formato == "tabla":
+        ultimo = crear_tabla(doc, anchor._p, *tabla_generico(calculo, locale))
+        for xml in graficos_tabla:
+            ultimo = insertar_grafico(doc, xml, ultimo)
+
+    # Volcado a bytes (deterministas: mismas entradas, mismo .docx)
+    return docx_a_bytes(doc)
+
+def generar_informe_generico(csv_source, json_source, empresa: str, titulo: str, invitados: int, locale: str = "es",
+                             intervalos_confianza: bool = False, n_remuestras: int = 1000, semilla=None,
+                             graficos: bool = False, formato: str = "lista", resultados: bool = False,
+                             ponderacion=None, registro=None):
+    """
+    Genera un informe genérico leyendo:
+      - csv_source: ruta o UploadedFile de Streamlit con las respuestas.
+      - json_source: ruta o UploadedFile de Streamlit con las preguntas.
+    Si `intervalos_confianza` es True, cada pregunta incluye además el intervalo
+    de confianza bootstrap (95 %) de su media.
+    Si `graficos` es True, tras cada pregunta se inserta un gráfico de barras
+    nativo de Word con la distribución de sus respuestas.
+    `formato` puede ser "lista" (un bloque de párrafos por pregunta) o "tabla"
+    (una única tabla compacta de resultados con una fila por pregunta).
+    Devuelve el .docx en memoria (bytes) listo para descargar o, si `resultados`
+    es True, (bytes, resultados.Resultados) con los estadísticos y conteos de cada pregunta.
+    `ponderacion` ({"columna": ...} o {"segmento": ..., "poblacion": ...}, ver
+    ponderacion.py) pondera los conteos y los estadísticos de cada encuestado.
+    Con un `registro` quedan en él las puntuaciones y los pesos de cada encuestado.
+    """
+    cargar_catalogo(json_source).validar_locale(locale)
+    calculo = calcular_generico(csv_source, json_source, intervalos_confianza, n_remuestras, semilla, ponderacion,
+                                registro)
+    docx_bytes = renderizar_generico(calculo, empresa, titulo, invitados, locale, graficos, formato)
+    if resultados:
+        return docx_bytes, resultados_generico(calculo, empresa, invitados, locale)
+    return docx_bytes
+
+def generar_informes_generico(csv_source, json_source, empresa: str, titulo: str, invitados: int,
+                              locales=None, intervalos_confianza: bool = False, n_remuestras: int = 1000,
+                              semilla=None, graficos: bool = False, formato: str = "lista",
+                              resultados: bool = False, ponderacion=None, registro=None):
+    """
+    Genera el mismo informe genérico en varios idiomas a partir de un único cálculo:
+    el CSV se lee, se convierte y se resume una sola vez y solo se repite el
+    montaje del .docx para cada idioma.
+
+    Parámetros
+    ----------
+    locales : list[str] | None
+        Idiomas a generar; por defecto, todos los 'availableLocales' del JSON.
+    registro : proveedores.RegistroProveedores | None
+        Registro en el que dejar las puntuaciones y los pesos de cada encuestado.
+
+    Retorna
+    -------
+    dict
+        {locale: bytes del .docx}; con `resultados`, ({locale: bytes}, resultados.Resultados)
+        con los textos en el primer idioma.
+    """
+    catalogo = cargar_catalogo(json_source)
+    locales = list(locales) if locales else catalogo.locales
+    for locale in locales:
+        catalogo.validar_locale(locale)
+
+    calculo = calcular_generico(csv_source, json_source, intervalos_confianza, n_remuestras, semilla, ponderacion,
+                                registro)
+    informes = {
+        locale: renderizar_generico(calculo, empresa, titulo, invitados, locale, graficos, formato)
+        for locale in locales
+    }
+    if resultados:
+        return informes, resultados_generico(calculo, empresa, invitados, locales[0])
+    return informes
\ No newline at end of file
@@ -1,5 +1,6 @@
 from io import BytesIO
 import os
+import numpy as np
 import pandas as pd
 from docx import Document
 from docx.oxml import OxmlElement
@@ -8,6 +9,18 @@ import glob
 from datetime import datetime
 import json
 import random
+import re
+from estadisticas import bootstrap_intervalos, conteos_ponderados, describir
+from faltantes import puntuar_dimensiones
+from proveedores import RegistroProveedores, marcadores_plantilla
+from graficos import conteos_a_matriz, grafico_dimensiones, grafico_distribucion, graficos_por_pregunta, insertar_graficos
+from tablas import rellenar_tablas, tabla_conteos, tabla_estadisticas
+from utils import docx_a_bytes, huella_respuestas, semilla_derivada
+from clasificacion import clasificador_rangos
+from planificador import leer_respuestas
+from ponderacion import clave_ponderacion, columnas_ponderacion, pesos_encuestados
+from validacion import Validacion, decodificador
+from resultados import Resultados, conteos_matriz, montar_resultados
 
 def seleccionar_csv(ruta):
     """Busca archivos CSV en la carpeta de la ruta proporcionada.
@@ -110,7 +123,7 @@ def replace_bookmark_pair(doc, pair):
         print(f"Marcador '{bookmark_name}' no encontrado")
 
 
-def obtenerRespuestas(dataframe, inicio, fin):
+def obtenerRespuestas(dataframe, inicio, fin, pesos=None):
     """
     Genera un diccionario con el conteo de cada respuesta por pregunta en un DataFrame, 
     construyendo las claves en el formato 'PREGUNTA_X_Y'.
@@ -124,6 +137,10 @@ def obtenerRespuestas(dataframe, inicio, fin):
     mapa_respuestas : dict
         Diccionario que mapea las respuestas posibles (claves) a valores numéricos (valores). 
         Ejemplo: {"Muy de acuerdo": 5, "De acuerdo": 4, ...}
+    pesos : np.ndarray | None
+        Peso de cada encuestado (ver ponderacion.py). Si se indica, cada conteo es
+        la suma de los pesos de quienes han dado esa respuesta, redondeada a entero,
+        calculada para todas las preguntas con un único np.bincount.
 
     Proceso de la función
     ---------------------
@@ -175,6 +192,13 @@ def obtenerRespuestas(dataframe, inicio, fin):
     """
     conteo_respuestas = {}
     valores_posibles = range(inicio, fin)
+
+    if pesos is not None:
+        conteos = np.rint(conteos_ponderados(dataframe, inicio, fin, pesos)).astype(int)
+        for i, fila in enumerate(conteos.tolist(), start=1):
+            for valor, cuenta in zip(valores_posibles, fila):
+                conteo_respuestas[f"PREGUNTA_{i}_{valor}"] = cuenta
+        return conteo_respuestas
     
     for i, pregunta in enumerate(dataframe.columns, start=1):
         # Contar respuestas para la pregunta
@@ -186,15 +210,24 @@ def obtenerRespuestas(dataframe, inicio, fin):
     
     return conteo_respuestas
 
-def calcularValores(respuestas_agrupadas):
+def calcularValores(respuestas_agrupadas, intervalos=False, n_remuestras=1000, semilla=None, pesos=None):
     """
-    Calcula la media y la desviación estándar para tres columnas clave de un DataFrame: 
+    Calcula la media, la desviación estándar y los percentiles 25 y 75 de tres columnas clave de un DataFrame:
     'Satisfaccion_Intrinseca', 'Satisfaccion_Extrinseca' y 'Satisfaccion_General'.
 
     Parámetros
     ----------
     respuestas_agrupadas : pd.DataFrame
         DataFrame que contiene las columnas anteriores con valores numéricos.
+    intervalos : bool
+        Si es True, añade el intervalo de confianza bootstrap (95 %) de cada media.
+    n_remuestras : int
+        Número de remuestras del bootstrap.
+    semilla : int | None
+        Semilla del generador aleatorio del bootstrap.
+    pesos : np.ndarray | None
+        Peso de cada encuestado (ver ponderacion.py) para medias, desviaciones,
+        percentiles e intervalos ponderados.
 
     Retorna
     -------
@@ -202,25 +235,66 @@ def calcularValores(respuestas_agrupadas):
         Diccionario con las claves:
         - "MEDIA_INTRINSECA", "MEDIA_EXTRINSECA", "MEDIA_GENERAL" (medias),
         - "STD_INTRINSECA", "STD_EXTRINSECA", "STD_GENERAL" (desviaciones),
+        - "P25_*" y "P75_*" (percentiles 25 y 75 de cada dimensión),
+        - si `intervalos` es True, "IC_INF_*" e "IC_SUP_*" con los límites del intervalo,
         todas redondeadas a 2 decimales.
     """
-    reemplazos = {
-        "MEDIA_INTRINSECA": round(respuestas_agrupadas['Satisfaccion_Intrinseca'].mean(), 2),
-        "MEDIA_EXTRINSECA": round(respuestas_agrupadas['Satisfaccion_Extrinseca'].mean(), 2),
-        "MEDIA_GENERAL": round(respuestas_agrupadas['Satisfaccion_General'].mean(), 2),
-        "STD_INTRINSECA": round(respuestas_agrupadas['Satisfaccion_Intrinseca'].std(), 2),
-        "STD_EXTRINSECA": round(respuestas_agrupadas['Satisfaccion_Extrinseca'].std(), 2),
-        "STD_GENERAL": round(respuestas_agrupadas['Satisfaccion_General'].std(), 2),
+    sufijos = {
+        'Satisfaccion_Intrinseca': 'INTRINSECA',
+        'Satisfaccion_Extrinseca': 'EXTRINSECA',
+        'Satisfaccion_General': 'GENERAL',
     }
+    # Todos los estadísticos de las tres dimensiones en una sola pasada
+    descriptivos = describir(respuestas_agrupadas[list(sufijos)], pesos)
+
+    reemplazos = {}
+    for prefijo, campo in (("MEDIA", "mean"), ("STD", "std"), ("P25", "p25"), ("P75", "p75")):
+        for columna, sufijo in sufijos.items():
+            reemplazos[f"{prefijo}_{sufijo}"] = round(float(descriptivos.at[columna, campo]), 2)
+
+    if intervalos:
+        inferior, superior = bootstrap_intervalos(
+            respuestas_agrupadas[list(sufijos)], n_remuestras=n_remuestras, semilla=semilla, pesos=pesos
+        )
+        for sufijo, inf, sup in zip(sufijos.values(), inferior, superior):
+            reemplazos[f"IC_INF_{sufijo}"] = round(float(inf), 2)
+            reemplazos[f"IC_SUP_{sufijo}"] = round(float(sup), 2)
 
     return reemplazos
 
-def escogerMedidas(media, archivo_medidas):
+def estadisticas_calculos(calculos: dict, respuestas_agrupadas: pd.DataFrame = None) -> pd.DataFrame:
+    """
+    Estadísticos de cada dimensión (columnas 'mean', 'std', 'p25', 'p75' y, si se
+    han calculado, 'ic_inf' e 'ic_sup') a partir de los marcadores de `calcularValores`.
+    Con `respuestas_agrupadas` se añade 'count': las puntuaciones de cada dimensión
+    con las que se han calculado (las de quien la ha dejado sin puntuar no cuentan).
+    """
+    campos = {"MEDIA": "mean", "STD": "std", "P25": "p25", "P75": "p75", "IC_INF": "ic_inf", "IC_SUP": "ic_sup"}
+    dimensiones = ["Satisfaccion_General", "Satisfaccion_Intrinseca", "Satisfaccion_Extrinseca"]
+    # Los estadísticos de cada dimensión, a partir de sus marcadores (MEDIA_GENERAL, STD_GENERAL...)
+    estadisticas = pd.DataFrame({
+        campo: [calculos[f"{prefijo}_{dim.split('_')[1].upper()}"] for dim in dimensiones]
+        for prefijo, campo in campos.items() if f"{prefijo}_GENERAL" in calculos
+    }, index=dimensiones)
+    if respuestas_agrupadas is not None:
+        estadisticas["count"] = respuestas_agrupadas[dimensiones].count().astype(float)
+    return estadisticas
+
+# Marcadores MEDIDA_1, MEDIDA_2... de la plantilla
+MEDIDAS_PLANTILLA = 3
+
+def escogerMedidas(media, archivo_medidas, rng=None, num_medidas=3):
     """
     Carga los datos de rangos y medidas desde medidas.json,
-    clasifica la media y devuelve un diccionario con 3 medidas seleccionadas
-    aleatoriamente en función del nivel obtenido.
+    clasifica la media y devuelve un diccionario con `num_medidas` medidas
+    seleccionadas aleatoriamente en función del nivel obtenido. `rng` es el
+    random.Random propio del informe; sin él se usa uno sin semilla.
+
+    La plantilla tiene MEDIDAS_PLANTILLA marcadores (MEDIDA_1...): los que sobran
+    quedan vacíos y, si se piden más medidas, las restantes van en el último,
+    una por línea. "seleccionadas" es la lista de todas las medidas elegidas.
     """
+    rng = rng if rng is not None else random.Random()
     # Carga de datos desde el archivo JSON
     with open(archivo_medidas, "r", encoding="utf-8") as f:
         data = json.load(f)
@@ -231,37 +305,21 @@ def escogerMedidas(media, archivo_medidas):
     medidas = data["medidas"]
 
     # Clasificación según la media
-    if rangos["rojo"][0] <= media <= rangos["rojo"][1]:
-        nivel = "rojo"
-    elif rangos["naranja"][0] <= media <= rangos["naranja"][1]:
-        nivel = "naranja"
-    elif rangos["amarillo"][0] <= media <= rangos["amarillo"][1]:
-        nivel = "amarillo"
-    elif rangos["verde"][0] <= media <= rangos["verde"][1]:
-        nivel = "verde"
-    else:
-        nivel = None
+    nivel = clasificador_rangos(rangos).clasificar(media)
     
     # Selección de medidas
-    generar = 3
     if nivel:
-        
-        medidas_seleccionadas = random.sample(medidas[nivel], generar)
-        return {
-            "Prueba": nivel,
-            "MEDIDAS": generar,
-            "MEDIDA_1": medidas_seleccionadas[0],
-            "MEDIDA_2": medidas_seleccionadas[1],
-            "MEDIDA_3": medidas_seleccionadas[2]
-        }
+        seleccionadas = rng.sample(medidas[nivel], min(num_medidas, len(medidas[nivel])))
+        resultado = {"Prueba": nivel}
     else:
-        return {
-            "nivel": "Fuera de rango",
-            "MEDIDAS": generar,
-            "MEDIDA_1": "",
-            "MEDIDA_2": "",
-            "MEDIDA_3": ""
-        }
+        seleccionadas = []
+        resultado = {"nivel": "Fuera de rango"}
+    marcadores = seleccionadas[:MEDIDAS_PLANTILLA - 1] + ["\n".join(seleccionadas[MEDIDAS_PLANTILLA - 1:])]
+    marcadores += [""] * (MEDIDAS_PLANTILLA - len(marcadores))
+    resultado["MEDIDAS"] = len(seleccionadas)
+    resultado.update({f"MEDIDA_{i}": medida for i, medida in enumerate(marcadores, start=1)})
+    resultado["seleccionadas"] = seleccionadas
+    return resultado
 
 
 def generarWord(plantilla_doc, carpeta_informes, reemplazos):
@@ -309,21 +367,85 @@ def generarWord_bytes(plantilla_doc: str, informe: str, reemplazos: dict) -> byt
     buffer.seek(0)
     return buffer.getvalue()
 
-def generar_informe_satisfaccion(csv_source, empresa, invitados, num_medidas=3) -> bytes:
-    ruta_script = os.path.dirname("./Satisfacción laboral/")
-    carpeta_plantillas = os.path.join(ruta_script, "Plantillas")
-    ruta_info_prl = os.path.join(ruta_script, "informacion_prl.json")
-    plantilla_path = os.path.join(carpeta_plantillas, "plantilla_satisfaccion_laboral.docx")
-    archivo_medidas = os.path.join(ruta_script, "medidas.json")
+# Mapear respuestas textuales a valores numéricos
+MAPA_RESPUESTAS_SATISFACCION = {
+    "Muy insatisfecho": 1,
+    "Insatisfecho": 2,
+    "Moderadamente insatisfecho": 3,
+    "Ni satisfecho ni insatisfecho": 4,
+    "Moderadamente satisfecho": 5,
+    "Satisfecho": 6,
+    "Muy satisfecho": 7
+}
+
+# Texto de cada valor numérico (encabezados de las tablas y gráficos de conteos)
+ETIQUETAS_RESPUESTAS_SATISFACCION = {valor: texto for texto, valor in MAPA_RESPUESTAS_SATISFACCION.items()}
+
+# Nombre de cada dimensión en la tabla TABLA_DIMENSIONES
+NOMBRES_DIMENSIONES_SATISFACCION = {
+    "Satisfaccion_General": "Satisfacción general",
+    "Satisfaccion_Intrinseca": "Satisfacción intrínseca",
+    "Satisfaccion_Extrinseca": "Satisfacción extrínseca",
+}
+
+def leer_respuestas_satisfaccion(csv_source, plan=None, excluir=()) -> Validacion:
+    """
+    Lee, valida y convierte las respuestas textuales a su valor numérico (1-7), con
+    el modo de lectura que corresponda al tamaño del fichero.
+    Las filas con respuestas fuera del vocabulario quedan en cuarentena; las
+    columnas de `excluir` (las de la ponderación) no se leen como respuestas.
+    """
+    return leer_respuestas(csv_source, decodificador(MAPA_RESPUESTAS_SATISFACCION), 1, 7, plan=plan,
+                           excluir=excluir)
 
-    if hasattr(csv_source, "read"):
-        respuestas = pd.read_csv(csv_source, sep=None, engine="python")
-    else:
-        respuestas = pd.read_csv(csv_source, sep=None, engine="python")
+def agrupar_dimensiones(respuestas_convertidas: pd.DataFrame, politica=None) -> pd.DataFrame:
+    """
+    Puntuaciones de satisfacción intrínseca (preguntas pares), extrínseca
+    (impares) y general (suma de ambas) de cada encuestado. Los ítems sin
+    responder se tratan según `politica` (por defecto, prorrateo; ver faltantes.py).
+    """
+    preguntas = list(respuestas_convertidas.columns)
+
+    # Separar las preguntas en intrínsecas (pares) y extrínsecas (impares)
+    preguntas_intrinsecas = [q for i, q in enumerate(preguntas) if (i + 1) % 2 == 0]
+    preguntas_extrinsecas = [q for i, q in enumerate(preguntas) if (i + 1) % 2 != 0]
+
+    respuestas_agrupadas = puntuar_dimensiones(
+        respuestas_convertidas,
+        {'Satisfaccion_Intrinseca': preguntas_intrinsecas, 'Satisfaccion_Extrinseca': preguntas_extrinsecas},
+        {'Satisfaccion_Intrinseca': politica, 'Satisfaccion_Extrinseca': politica})
+    respuestas_agrupadas['Satisfaccion_General'] = respuestas_agrupadas['Satisfaccion_Intrinseca'] + respuestas_agrupadas['Satisfaccion_Extrinseca']
+    return respuestas_agrupadas
+
+def puntuar_satisfaccion(csv_source, excluir=()) -> pd.DataFrame:
+    """
+    Lectura, conversión y cálculo de las puntuaciones de un CSV de satisfacción,
+    sin montar ningún documento. Devuelve las puntuaciones por encuestado.
+    """
+    validacion = leer_respuestas_satisfaccion(csv_source, excluir=excluir)
+    return agrupar_dimensiones(validacion.valores)
 
+def registrar_proveedores_satisfaccion(registro: RegistroProveedores, validacion: Validacion, empresa, invitados,
+                                       num_medidas=3, intervalos_confianza=False, n_remuestras=1000, semilla=None,
+                                       ruta_info_prl="./Satisfacción laboral/informacion_prl.json",
+                                       archivo_medidas="./Satisfacción laboral/medidas.json", ponderacion=None):
+    """
+    Registra en `registro` los proveedores de datos del informe de satisfacción.
+    La clave de cada uno son los parámetros de los que depende: si se vuelven a
+    registrar en el mismo registro con otros parámetros, solo se recalcula lo que
+    depende de los que han cambiado (ver vista_previa.py).
+    """
+    # Semilla del informe (medidas y bootstrap): la indicada o una derivada de las
+    # entradas, de modo que las mismas entradas dan exactamente el mismo .docx
+    def derivar_semilla(r):
+        if semilla is not None:
+            return semilla
+        return semilla_derivada(r.obtener('huella_respuestas'), empresa, invitados, num_medidas)
+
+    n_respuestas = len(validacion.valores)
     informacion = {
         "NOMBRE_EMPRESA": empresa,
-        "PARTICIPACION": round(len(respuestas) / invitados * 100, 2) if invitados > 0 else 0
+        "PARTICIPACION": round(n_respuestas / invitados * 100, 2) if invitados > 0 else 0
     }
 
     try:
@@ -332,44 +454,129 @@ def generar_informe_satisfaccion(csv_source, empresa, invitados, num_medidas=3)
     except FileNotFoundError:
         pass
 
-    # Obtener las preguntas directamente de las cabeceras del CSV
-    preguntas = list(respuestas.columns)
+    def calculos(r):
+        # Los intervalos salen en la tabla de dimensiones y en los resultados exportados,
+        # no solo en los marcadores IC_*: se calculan siempre que se pidan
+        return calcularValores(r.obtener('respuestas_agrupadas'), intervalos_confianza, n_remuestras,
+                               r.obtener('semilla') if intervalos_confianza else None, r.obtener('pesos'))
+
+    registro.registrar('respuestas_convertidas', lambda r: validacion.valores, clave=id(validacion))
+    registro.registrar('pesos', lambda r: pesos_encuestados(validacion, ponderacion),
+                       clave=(id(validacion), clave_ponderacion(ponderacion)))
+    registro.registrar('huella_respuestas', lambda r: huella_respuestas(r.obtener('respuestas_convertidas')), clave=())
+    registro.registrar('semilla', derivar_semilla, clave=(semilla, empresa, invitados, num_medidas))
+    registro.registrar('informacion', lambda r: informacion,
+                       patron='|'.join(re.escape(clave) for clave in informacion),
+                       clave=tuple(informacion.items()))
+    # Calcular las puntuaciones
+    registro.registrar('respuestas_agrupadas', lambda r: agrupar_dimensiones(r.obtener('respuestas_convertidas')),
+                       clave=())
+    registro.registrar('calculos', calculos, patron=r'(MEDIA|STD|P25|P75|IC_INF|IC_SUP)_\w+',
+                       clave=(intervalos_confianza, n_remuestras))
+    registro.registrar('estadisticas', lambda r: estadisticas_calculos(r.obtener('calculos'),
+                                                                       r.obtener('respuestas_agrupadas')), clave=())
+    registro.registrar('conteo_respuestas', lambda r: obtenerRespuestas(r.obtener('respuestas_convertidas'), 1, 8,
+                                                                        r.obtener('pesos')),
+                       patron=r'PREGUNTA_\d+_\d+', clave=())
+    registro.registrar('medidas', lambda r: escogerMedidas(r.obtener('calculos')['MEDIA_GENERAL'], archivo_medidas,
+                                                       random.Random(r.obtener('semilla')), num_medidas),
+                       patron=r'MEDIDAS|MEDIDA_\d+', clave=(archivo_medidas, num_medidas))
+    registro.registrar('matriz_conteos', lambda r: conteos_a_matriz(r.obtener('conteo_respuestas')), clave=())
+
+def tablas_satisfaccion(registro: RegistroProveedores) -> dict:
+    """Proveedores (cabecera, filas) de las tablas TABLA_* del informe de satisfacción."""
+    preguntas = list(registro.obtener('respuestas_convertidas').columns)
+    etiquetas = ETIQUETAS_RESPUESTAS_SATISFACCION
+    return {
+        'TABLA_PORCENTAJES': lambda: tabla_conteos(registro.obtener('matriz_conteos'), titulos=preguntas,
+                                                   etiquetas=etiquetas, porcentajes=True),
+        'TABLA_DIMENSIONES': lambda: tabla_estadisticas(registro.obtener('estadisticas'),
+                                                        NOMBRES_DIMENSIONES_SATISFACCION),
+    }
 
-    # Separar las preguntas en intrínsecas (pares) y extrínsecas (impares)
-    preguntas_intrinsecas = [q for i, q in enumerate(preguntas) if (i + 1) % 2 == 0]
-    preguntas_extrinsecas = [q for i, q in enumerate(preguntas) if (i + 1) % 2 != 0]
+def resultados_satisfaccion(registro: RegistroProveedores, validacion: Validacion, empresa, invitados) -> Resultados:
+    """Resultados del informe de satisfacción con los datos ya calculados en `registro`."""
+    medidas = registro.obtener('medidas')
+    return montar_resultados(
+        "satisfaccion", empresa, invitados, registro.obtener('informacion')['PARTICIPACION'],
+        len(validacion.valores), len(validacion.cuarentena), registro.obtener('estadisticas'),
+        conteos_matriz(registro.obtener('matriz_conteos'), titulos=list(validacion.valores.columns),
+                       etiquetas=ETIQUETAS_RESPUESTAS_SATISFACCION),
+        nivel=medidas.get("Prueba", medidas.get("nivel")),
+        medidas=medidas["seleccionadas"],
+    )
+
+def generar_informe_satisfaccion(csv_source, empresa, invitados, num_medidas=3,
+                                 intervalos_confianza=False, n_remuestras=1000, semilla=None,
+                                 graficos=False, resultados=False, ponderacion=None, registro=None):
+    """
+    Genera el informe de satisfacción laboral en memoria y devuelve los bytes del .docx.
 
-    # Mapear respuestas textuales a valores numéricos
-    mapa_respuestas = {
-        "Muy insatisfecho": 1,
-        "Insatisfecho": 2,
-        "Moderadamente insatisfecho": 3,
-        "Ni satisfecho ni insatisfecho": 4,
-        "Moderadamente satisfecho": 5,
-        "Satisfecho": 6,
-        "Muy satisfecho": 7
-    }
+    Si `intervalos_confianza` es True se calcula el intervalo bootstrap de cada
+    media; aparece en la tabla TABLA_DIMENSIONES, en los resultados y en los
+    marcadores IC_INF_* e IC_SUP_* (GENERAL, INTRINSECA, EXTRINSECA) si la
+    plantilla los tiene.
 
-    # Convertir respuestas textuales a numéricas usando el mapeo
-    respuestas_convertidas = respuestas.copy()
-    respuestas_convertidas = respuestas_convertidas.map(lambda x: mapa_respuestas.get(x, x) if x in mapa_respuestas else x)
+    `semilla` fija la selección de medidas y el bootstrap; si es None se deriva
+    de las respuestas y los parámetros, así que las mismas entradas producen
+    siempre el mismo documento, byte a byte.
 
-    # Calcular las puntuaciones
-    respuestas_agrupadas = pd.DataFrame()
-    respuestas_agrupadas['Satisfaccion_Intrinseca'] = respuestas_convertidas[preguntas_intrinsecas].sum(axis=1)
-    respuestas_agrupadas['Satisfaccion_Extrinseca'] = respuestas_convertidas[preguntas_extrinsecas].sum(axis=1)
-    respuestas_agrupadas['Satisfaccion_General'] = respuestas_agrupadas['Satisfaccion_Intrinseca'] + respuestas_agrupadas['Satisfaccion_Extrinseca']
+    Si `graficos` es True se insertan gráficos nativos de Word (medias por
+    dimensión, distribución global y uno por pregunta) en el marcador GRAFICOS
+    o, si la plantilla no lo tiene, al final del documento.
+
+    Si `resultados` es True devuelve (bytes del .docx, resultados.Resultados) con
+    los estadísticos, conteos, nivel de riesgo y medidas del informe.
 
-    calculos = calcularValores(respuestas_agrupadas)
-    conteo_respuestas = obtenerRespuestas(respuestas, 1, 8)
-    medidas = escogerMedidas(calculos['MEDIA_GENERAL'], archivo_medidas)
+    `ponderacion` ({"columna": ...} o {"segmento": ..., "poblacion": ...}, ver
+    ponderacion.py) pondera los conteos y los estadísticos de cada encuestado.
 
-    reemplazos = informacion | calculos | conteo_respuestas | medidas
+    Si se pasa un `registro` (proveedores.RegistroProveedores) vacío, el informe
+    deja en él sus datos calculados ('respuestas_agrupadas', 'pesos',
+    'calculos'...) para reutilizarlos sin volver a leer el CSV.
+    """
+    ruta_script = os.path.dirname("./Satisfacción laboral/")
+    carpeta_plantillas = os.path.join(ruta_script, "Plantillas")
+    ruta_info_prl = os.path.join(ruta_script, "informacion_prl.json")
+    plantilla_path = os.path.join(carpeta_plantillas, "plantilla_satisfaccion_laboral.docx")
+    archivo_medidas = os.path.join(ruta_script, "medidas.json")
+
+    # Leer y validar el CSV (ruta, volcado proyectado en memoria o UploadedFile) antes
+    # de cualquier cálculo: las filas no reconocidas quedan en cuarentena
+    validacion = leer_respuestas_satisfaccion(csv_source, excluir=columnas_ponderacion(ponderacion))
+
+    # Obtener las preguntas directamente de las cabeceras del CSV
+    preguntas = list(validacion.valores.columns)
+
+    # Cada dato se calcula solo si la plantilla contiene algún marcador que lo use
+    registro = registro if registro is not None else RegistroProveedores()
+    registrar_proveedores_satisfaccion(registro, validacion, empresa, invitados, num_medidas, intervalos_confianza,
+                                       n_remuestras, semilla, ruta_info_prl, archivo_medidas, ponderacion)
+    reemplazos = registro.resolver(marcadores_plantilla(plantilla_path))
+
+    etiquetas = ETIQUETAS_RESPUESTAS_SATISFACCION
 
     doc = Document(plantilla_path)
     list(map(lambda pair: replace_bookmark_pair(doc, pair), reemplazos.items()))
-    buf = BytesIO()
-    doc.save(buf)
-    buf.seek(0)
-    return buf.getvalue()
 
+    # Tablas completas (si la plantilla las marca con TABLA_*), escritas de una vez
+    rellenar_tablas(doc, tablas_satisfaccion(registro))
+
+    if graficos:
+        matriz = registro.obtener('matriz_conteos')
+        calculos = registro.obtener('calculos')
+        medias = {
+            "General": calculos["MEDIA_GENERAL"],
+            "Intrínseca": calculos["MEDIA_INTRINSECA"],
+            "Extrínseca": calculos["MEDIA_EXTRINSECA"],
+        }
+        insertar_graficos(doc, [
+            grafico_dimensiones(medias),
+            grafico_distribucion(matriz, etiquetas=etiquetas),
+            *graficos_por_pregunta(matriz, titulos=[f"{i}. {p}" for i, p in enumerate(preguntas, start=1)],
+                                   etiquetas=etiquetas),
+        ])
+
+    if resultados:
+        return docx_a_bytes(doc), resultados_satisfaccion(registro, validacion, empresa, invitados)
+    return docx_a_bytes(doc)
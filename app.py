@@ -1,26 +1,129 @@
 # app.py
 import streamlit as st
 import json
-from Generar_informe_Satisfaccion import generar_informe_satisfaccion
-from Generar_informe_Burnout import generar_informe_burnout
-from Generar_informe_Generico import generar_informe_generico
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from Generar_informe_Generico import generar_informes_generico
+from aproximacion import estimaciones_previas, estimar, registro_encuestados
+from catalogo_preguntas import cargar_catalogo
+from utils import empaquetar_zip, leer_cabecera, volcar_subida
+from cache_informes import CacheInformes
+from encuestados import parquet_puntuaciones, tabla_puntuaciones
+from instrumentos import comprobar_instrumento, registro_instrumentos
+from oleadas import fuente_respuestas
+from ponderacion import cargar_poblacion, columnas_ponderacion
+from proveedores import RegistroProveedores
+from vista_previa import vista_previa_burnout, vista_previa_generico, vista_previa_satisfaccion
 
 st.set_page_config(page_title="Generador de Informes", layout="wide")
 
 st.title("📝 Generador de Informes Word")
 
-# 1) Selección de informe
+# Almacén compartido de informes ya generados (mismas entradas → mismo .docx)
+cache = CacheInformes()
+
+
+def volcado(subida):
+    """
+    Vuelca cada subida una sola vez a un fichero temporal proyectado en memoria y
+    lo reutiliza en las siguientes ejecuciones del script. El hash, la detección del
+    separador y la lectura del CSV trabajan sobre ese mapa, sin copias en RAM.
+    """
+    clave = f"volcado_{subida.file_id}"
+    if clave not in st.session_state:
+        st.session_state[clave] = volcar_subida(subida)
+    return st.session_state[clave]
+
+def mostrar_estimacion(hueco, estimacion, pendiente=True):
+    """Pinta en `hueco` (un st.empty) las medias por dimensión, alertas y nivel de riesgo."""
+    with hueco.container():
+        if estimacion.exacta:
+            st.subheader("Resultados")
+            st.dataframe(estimacion.tabla()[["media"]])
+        else:
+            st.subheader("Resultados aproximados")
+            st.caption(f"Muestra de {estimacion.n_muestra} de ~{estimacion.n_total} respuestas; "
+                       "intervalos de error al 95 %.")
+            st.dataframe(estimacion.tabla())
+        if estimacion.alertas is not None:
+            st.markdown(f"**Dimensiones en alerta:** {', '.join(estimacion.alertas) or 'ninguna'}")
+            if estimacion.dudosas:
+                st.markdown(f"**Podrían estar en alerta:** {', '.join(estimacion.dudosas)}")
+        if estimacion.niveles_posibles is not None:
+            st.markdown(f"**Nivel de riesgo:** {estimacion.nivel or 'fuera de rango'}")
+            if len(estimacion.niveles_posibles) > 1:
+                st.markdown(f"**Niveles posibles:** {', '.join(estimacion.niveles_posibles)}")
+        if pendiente:
+            st.caption("⏳ Calculando los resultados exactos y el informe…")
+
+# Tipo de informe de cada opción del selector
+INFORMES_APP = {"Satisfacción laboral": "satisfaccion", "Burnout": "burnout", "Genérico": "generico"}
+
+# 1) Fichero de respuestas y selección de informe
+# Varios ficheros de la misma empresa (exportación partida o con solape) se unen sin duplicados
+csv_files = st.file_uploader("Sube tu archivo CSV o Excel (o varias oleadas)", type=["csv", "xlsx"],
+                             accept_multiple_files=True)
+
+# El cuestionario se detecta por la cabecera del fichero y se propone como informe
+deteccion = registro_instrumentos().detectar_fuente(volcado(csv_files[0])) if csv_files else None
+opciones = list(INFORMES_APP)
+propuesto = next((i for i, o in enumerate(opciones) if deteccion and INFORMES_APP[o] == deteccion.informe), 0)
 report_type = st.selectbox(
     "¿Qué informe quieres generar?",
-    ["Satisfacción laboral", "Burnout", "Genérico"]
+    opciones,
+    index=propuesto,
 )
+if deteccion is not None:
+    st.caption(f"Cuestionario detectado: {deteccion}")
+elif csv_files:
+    st.caption("No se ha reconocido el cuestionario por su cabecera")
 
 st.markdown("---")
 
 # 2) Campos comunes
-csv_file = st.file_uploader("Sube tu archivo CSV", type="csv")
 empresa = st.text_input("Nombre de la empresa")
 invitados = st.number_input("Número de invitados", min_value=1, value=1)
+intervalos_confianza = st.checkbox("Incluir intervalos de confianza (bootstrap) de las medias")
+if intervalos_confianza:
+    n_remuestras = st.number_input("Número de remuestras bootstrap", min_value=100, max_value=20000, value=1000, step=100)
+else:
+    n_remuestras = 1000
+# Sin semilla se deriva de los datos: el mismo CSV y parámetros dan siempre el mismo informe
+semilla = st.number_input("Semilla (selección de medidas y bootstrap)", min_value=0, value=None, step=1,
+                          help="Déjala vacía para obtener siempre el mismo informe con las mismas entradas; "
+                               "cámbiala para sortear otras medidas.")
+if semilla is not None:
+    semilla = int(semilla)
+graficos = st.checkbox("Incluir gráficos de resultados")
+# Estadísticos, conteos, alertas y medidas en formato para herramientas de análisis (BI)
+exportar_resultados = st.checkbox("Descargar también los resultados en JSON y Parquet")
+exportar_puntuaciones = st.checkbox("Descargar también las puntuaciones por encuestado (Parquet)")
+# Con ficheros grandes, una muestra de las respuestas da las cifras principales mientras se genera el informe
+vista_previa = st.checkbox("Ver resultados aproximados mientras se genera el informe", value=True)
+
+# Ponderación cuando unas sedes o departamentos han contestado mucho más que otros
+ponderacion = None
+with st.expander("Ponderación de las respuestas"):
+    modo_ponderacion = st.radio("Ponderación", ["Sin ponderar", "Columna de pesos", "Postestratificación"],
+                                horizontal=True, label_visibility="collapsed")
+    if modo_ponderacion != "Sin ponderar" and not csv_files:
+        st.info("Sube primero el fichero de respuestas para elegir sus columnas")
+    elif modo_ponderacion == "Columna de pesos":
+        columna_pesos = st.selectbox("Columna con el peso de cada encuestado", leer_cabecera(volcado(csv_files[0])))
+        ponderacion = {"columna": columna_pesos}
+    elif modo_ponderacion == "Postestratificación":
+        columna_segmento = st.selectbox("Columna con el segmento (sede, departamento...)",
+                                        leer_cabecera(volcado(csv_files[0])))
+        tabla_plantilla = st.file_uploader("Personas de cada segmento en la plantilla (CSV: segmento, personas; o JSON)",
+                                           type=["csv", "json"])
+        if tabla_plantilla:
+            try:
+                ponderacion = {"segmento": columna_segmento, "poblacion": cargar_poblacion(tabla_plantilla)}
+            except ValueError as error:
+                st.error(f"❌ Tabla de plantilla no válida: {error}")
+    if ponderacion is not None and vista_previa:
+        st.caption("Los resultados aproximados que se muestran mientras se genera el informe no están ponderados; "
+                   "los exactos, sí.")
 
 # 3) Campos específicos según informe
 if report_type == "Satisfacción laboral":
@@ -34,67 +137,218 @@ elif report_type == "Genérico":
     titulo = st.text_input("Título del informe")
     json_file = st.file_uploader("JSON de preguntas", type="json")
     if json_file:
-        # Carga en memoria
-        json_data = json.load(json_file)
+        # Catálogo compilado (se reutiliza al generar el informe, sin volver a parsear)
+        json_file = volcado(json_file)
+        catalogo = cargar_catalogo(json_file)
+        registro_instrumentos().registrar_catalogo(json_file)
         # Extrae la lista de locales
-        locales = json_data.get("availableLocales", [])
-        # Desplegable con esos valores
-        locale = st.selectbox("Idioma del informe", locales)
+        locales = catalogo.locales
+        # Selección múltiple: con varios idiomas se calcula una vez y se descarga un .zip
+        idiomas = st.multiselect("Idiomas del informe", locales, default=locales[:1])
+        formato = st.radio("Presentación de resultados", ["lista", "tabla"], horizontal=True,
+                           format_func=lambda f: {"lista": "Lista por pregunta", "tabla": "Tabla compacta"}[f])
     else:
         st.info("Sube el JSON de preguntas para elegir idioma")
 
 st.markdown("---")
 
-# 4) Botón de generación
+# 4) Vista previa del contenido, sin generar el .docx: se vuelve a pintar con cada cambio
+# de parámetros reutilizando las respuestas ya leídas y los cálculos que no cambian
+if csv_files and st.checkbox("Vista previa del informe", help="Muestra el contenido del informe con los "
+                             "parámetros actuales (sin gráficos ni índice)."):
+    fuente = fuente_respuestas([volcado(f) for f in csv_files])
+    try:
+        comprobar_instrumento(INFORMES_APP[report_type], fuente)
+        if report_type == "Satisfacción laboral":
+            contenido = vista_previa_satisfaccion(fuente, empresa, invitados, num_medidas,
+                                                  intervalos_confianza, n_remuestras, semilla, ponderacion)
+        elif report_type == "Burnout":
+            contenido = vista_previa_burnout(fuente, empresa, invitados, limite_alerta,
+                                             intervalos_confianza, n_remuestras, semilla, ponderacion)
+        elif json_file and idiomas:
+            contenido = vista_previa_generico(fuente, json_file, empresa, titulo, invitados, idiomas[0],
+                                              intervalos_confianza, n_remuestras, semilla, formato, ponderacion)
+        else:
+            contenido = None
+            st.info("Sube el JSON de preguntas y elige un idioma para ver la vista previa")
+        if contenido is not None:
+            with st.container(height=600):
+                st.html(contenido)
+    except ValueError as error:
+        st.warning(f"No se puede mostrar la vista previa: {error}")
+
+st.markdown("---")
+
+# 5) Botón de generación
 if st.button("▶️ Generar informe"):
     # Validaciones básicas
-    if not csv_file:
-        st.error("❌ Debes subir primero un archivo CSV.")
+    if not csv_files:
+        st.error("❌ Debes subir primero un archivo CSV o Excel.")
+    elif modo_ponderacion != "Sin ponderar" and ponderacion is None:
+        st.error("❌ Debes subir la tabla de plantilla para la postestratificación")
     else:
-        # Llamada exclusiva según la elección
-        if report_type == "Satisfacción laboral":
-            docx_bytes = generar_informe_satisfaccion(
-                csv_file,
-                empresa=empresa,
-                invitados=invitados,
-                num_medidas=num_medidas,
-                # …otros params…
-            )
-            filename = f"Satisfaccion_{empresa}.docx"
-        elif report_type == "Burnout":  # Burnout
-            docx_bytes = generar_informe_burnout(
-                csv_file,
-                empresa=empresa,
-                invitados=invitados,
-                limite=limite_alerta,
-            )
-            filename = f"Burnout_{empresa}.docx"
-
-        else: #if report_type == "Generico":  # Genérico
-            if not json_file:
-                st.error("❌ Debes subir un JSON de preguntas")
-            elif not titulo:
-                st.error("❌ Debes ingresar un título para el informe")
-            elif not empresa:
-                st.error("❌ Debes ingresar el nombre de la empresa")
-            elif not locale:
-                st.error("❌ Debes elegir un idioma para el informe")
-            else:
-                docx_bytes = generar_informe_generico(
+        csv_file = fuente_respuestas([volcado(f) for f in csv_files])
+        mime = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+        informe = INFORMES_APP[report_type]
+        generar = None
+        # Con resultados, el almacén devuelve (informe, resultados) en lugar de solo el informe
+        generar_informe = cache.generar_resultados if exportar_resultados else cache.generar
+        # Datos que calcula el generador (puntuaciones y pesos de cada encuestado), para no volver a leer el fichero
+        registro = RegistroProveedores()
+        try:
+            # Un fichero de otro cuestionario se rechaza antes de leerlo entero
+            comprobar_instrumento(informe, csv_file)
+            # Llamada exclusiva según la elección
+            if report_type == "Satisfacción laboral":
+                generar = partial(
+                    generar_informe,
+                    "satisfaccion",
+                    csv_source=csv_file,
+                    empresa=empresa,
+                    invitados=invitados,
+                    num_medidas=num_medidas,
+                    intervalos_confianza=intervalos_confianza,
+                    n_remuestras=n_remuestras,
+                    semilla=semilla,
+                    graficos=graficos,
+                    ponderacion=ponderacion,
+                    registro=registro,
+                    # …otros params…
+                )
+                filename = f"Satisfaccion_{empresa}.docx"
+            elif report_type == "Burnout":  # Burnout
+                generar = partial(
+                    generar_informe,
+                    "burnout",
                     csv_source=csv_file,
-                    json_source=json_file,
                     empresa=empresa,
-                    titulo=titulo,
                     invitados=invitados,
-                    locale=locale,
+                    limite=limite_alerta,
+                    intervalos_confianza=intervalos_confianza,
+                    n_remuestras=n_remuestras,
+                    semilla=semilla,
+                    graficos=graficos,
+                    ponderacion=ponderacion,
+                    registro=registro,
                 )
-                filename = f"{titulo.replace(' ','_')}_{empresa}.docx"
+                filename = f"Burnout_{empresa}.docx"
+
+            else: #if report_type == "Generico":  # Genérico
+                if not json_file:
+                    st.error("❌ Debes subir un JSON de preguntas")
+                elif not titulo:
+                    st.error("❌ Debes ingresar un título para el informe")
+                elif not empresa:
+                    st.error("❌ Debes ingresar el nombre de la empresa")
+                elif not idiomas:
+                    st.error("❌ Debes elegir al menos un idioma para el informe")
+                elif len(idiomas) > 1:
+                    base = f"{titulo.replace(' ','_')}_{empresa}"
+
+                    def generar():
+                        informes = generar_informes_generico(
+                            csv_source=csv_file,
+                            json_source=json_file,
+                            empresa=empresa,
+                            titulo=titulo,
+                            invitados=invitados,
+                            locales=idiomas,
+                            intervalos_confianza=intervalos_confianza,
+                            n_remuestras=n_remuestras,
+                            semilla=semilla,
+                            graficos=graficos,
+                            formato=formato,
+                            resultados=exportar_resultados,
+                            ponderacion=ponderacion,
+                            registro=registro,
+                        )
+                        if exportar_resultados:
+                            informes, resultados = informes
+                            return empaquetar_zip({f"{base}_{loc}.docx": datos for loc, datos in informes.items()}), resultados
+                        return empaquetar_zip({f"{base}_{loc}.docx": datos for loc, datos in informes.items()})
+                    filename = f"{base}.zip"
+                    mime = "application/zip"
+                else:
+                    generar = partial(
+                        generar_informe,
+                        "generico",
+                        csv_source=csv_file,
+                        json_source=json_file,
+                        empresa=empresa,
+                        titulo=titulo,
+                        invitados=invitados,
+                        locale=idiomas[0],
+                        intervalos_confianza=intervalos_confianza,
+                        n_remuestras=n_remuestras,
+                        semilla=semilla,
+                        graficos=graficos,
+                        formato=formato,
+                        ponderacion=ponderacion,
+                        registro=registro,
+                    )
+                    filename = f"{titulo.replace(' ','_')}_{empresa}.docx"
+            if generar is None:
+                st.stop()
+
+            limite = limite_alerta if report_type == "Burnout" else 10
+            json_source = json_file if report_type == "Genérico" else None
+            excluir = columnas_ponderacion(ponderacion)
+
+            def calcular():
+                # El informe y, con vista previa, las cifras exactas que sustituyen a las aproximadas
+                datos, resultados = generar() if exportar_resultados else (generar(), None)
+                # Las puntuaciones por encuestado del generador sirven para las cifras exactas y para
+                # la descarga; si el informe ha salido del almacén, se lee el fichero una sola vez
+                puntos = None
+                if vista_previa or exportar_puntuaciones:
+                    datos_informe = registro if 'respuestas_agrupadas' in registro \
+                        else registro_encuestados(informe, csv_file, json_source, ponderacion)
+                    puntos = datos_informe.obtener('respuestas_agrupadas')
+                exacta = estimar(informe, puntos, limite=limite, pesos=datos_informe.obtener('pesos')) \
+                    if vista_previa else None
+                tabla = tabla_puntuaciones(puntos, informe) if exportar_puntuaciones else None
+                return datos, resultados, exacta, tabla
+
+            # El cálculo completo sigue en segundo plano mientras se muestran las aproximaciones
+            with ThreadPoolExecutor(max_workers=1) as ejecutor:
+                futuro = ejecutor.submit(calcular)
+                hueco = st.empty()
+                if vista_previa:
+                    try:
+                        for estimacion in estimaciones_previas(informe, csv_file, limite, json_source, excluir=excluir):
+                            mostrar_estimacion(hueco, estimacion)
+                            if futuro.done():
+                                break
+                    except ValueError as error:
+                        hueco.warning(f"No se pudo calcular la vista previa: {error}")
+                with st.spinner("Generando el informe…"):
+                    docx_bytes, resultados, exacta, tabla = futuro.result()
+            if exacta is not None:
+                mostrar_estimacion(hueco, exacta, pendiente=False)
+        except ValueError as error:
+            # CSV no aprovechable (columnas que faltan, demasiadas respuestas no reconocidas...)
+            st.error(f"❌ {error}")
+            st.stop()
 
+        # La cabecera queda registrada para reconocer este cuestionario la próxima vez
+        registro_instrumentos().registrar(INFORMES_APP[report_type], leer_cabecera(csv_file),
+                                          json_source=getattr(json_file, "name", None) if report_type == "Genérico" else None)
 
-        # 5) Descarga directa
+        # 6) Descarga directa
         st.download_button(
             label="📥 Descargar informe Word",
             data=docx_bytes,
             file_name=filename,
-            mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+            mime=mime
         )
+        if resultados is not None:
+            base = filename.rsplit(".", 1)[0]
+            st.download_button("📊 Descargar resultados (JSON)", data=resultados.a_json(),
+                               file_name=f"{base}_resultados.json", mime="application/json")
+            st.download_button("📊 Descargar resultados (Parquet)", data=resultados.a_parquet(),
+                               file_name=f"{base}_resultados.parquet", mime="application/vnd.apache.parquet")
+        if tabla is not None:
+            st.download_button(f"👥 Descargar puntuaciones por encuestado ({tabla.num_rows} filas, Parquet)",
+                               data=parquet_puntuaciones(tabla),
+                               file_name=f"{filename.rsplit('.', 1)[0]}_puntuaciones.parquet",
+                               mime="application/vnd.apache.parquet")
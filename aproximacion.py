@@ -0,0 +1,239 @@
+"""
+Resultados aproximados de un informe a partir de una muestra de las respuestas.
+
+Con ficheros muy grandes, el consultor puede ver enseguida si las cifras tienen
+sentido sin esperar a que termine el cálculo completo. El fichero se recorre por
+bloques y se mantiene una muestra de reservorio (algoritmo R, vectorizado por
+bloque) de MUESTRA_PREVIA filas: tras cada bloque la muestra es uniforme sobre
+todas las filas leídas hasta ese momento. Sobre la muestra se calculan las
+mismas puntuaciones que en el informe (`puntuar_*` de cada generador) y:
+
+- la media de cada dimensión con su margen de error al 95 % (con corrección
+  por población finita: es 0 cuando la muestra es todo el fichero),
+- en Burnout, las dimensiones en alerta y las dudosas (su intervalo cruza el límite),
+- en Satisfacción, el nivel de riesgo y los niveles posibles dentro del margen.
+
+`estimar` sobre las puntuaciones de todas las respuestas da las cifras exactas,
+con el mismo formato.
+"""
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from catalogo_preguntas import cargar_catalogo
+from clasificacion import cargar_reglas_alerta, clasificador_rangos
+from estadisticas import describir
+from Generar_informe_Burnout import agrupar_dimensiones as agrupar_burnout, leer_respuestas_cbb, puntuar_burnout
+from Generar_informe_Generico import leer_respuestas_generico, puntuar_generico
+from Generar_informe_Satisfaccion import (agrupar_dimensiones as agrupar_satisfaccion, leer_respuestas_satisfaccion,
+                                          puntuar_satisfaccion)
+from planificador import planificar, ruta_csv
+from ponderacion import columnas_ponderacion, pesos_encuestados
+from proveedores import RegistroProveedores
+from utils import DatosMapeados, leer_csv
+
+# Filas de la muestra de reservorio
+MUESTRA_PREVIA = 5000
+
+# Filas que se leen de cada vez al recorrer el fichero
+BLOQUE_MUESTRA = 20_000
+
+# Cuantil de la normal para los márgenes de error al 95 %
+Z_95 = 1.96
+
+RUTA_ALERTAS_BURNOUT = os.path.join("Burnout", "alertas.json")
+RUTA_CONFIG_BURNOUT = os.path.join("Burnout", "Dimensiones_CBB.json")
+RUTA_MEDIDAS_SATISFACCION = os.path.join("Satisfacción laboral", "medidas.json")
+
+
+class Estimacion:
+    """
+    Resultados principales de un informe, aproximados o exactos.
+
+    - medias, margenes: media de cada dimensión y semiamplitud de su intervalo al 95 %.
+    - alertas, dudosas: dimensiones en alerta y las que podrían estarlo (Burnout).
+    - nivel, niveles_posibles: nivel de riesgo de la satisfacción general y los
+      niveles compatibles con su margen de error (Satisfacción).
+    - n_muestra, n_total: respuestas usadas y respuestas del fichero (aproximado
+      mientras no se ha terminado de leer).
+    """
+
+    def __init__(self, medias, margenes, n_muestra, n_total, alertas=None, dudosas=None,
+                 nivel=None, niveles_posibles=None):
+        self.medias = medias
+        self.margenes = margenes
+        self.n_muestra = n_muestra
+        self.n_total = n_total
+        self.alertas = alertas
+        self.dudosas = dudosas
+        self.nivel = nivel
+        self.niveles_posibles = niveles_posibles
+
+    @property
+    def exacta(self) -> bool:
+        return self.n_muestra >= self.n_total
+
+    def tabla(self) -> pd.DataFrame:
+        """Medias con su intervalo, redondeadas como en el informe."""
+        return pd.DataFrame({"media": self.medias, "margen": self.margenes,
+                             "inferior": self.medias - self.margenes,
+                             "superior": self.medias + self.margenes}).round(2)
+
+
+def puntuaciones(informe: str, source, json_source=None, excluir=()) -> pd.DataFrame:
+    """
+    Puntuaciones por encuestado del informe `informe` (las mismas que usa su
+    generador). Las columnas de `excluir` (las de la ponderación) no son respuestas.
+    """
+    if informe == "burnout":
+        return puntuar_burnout(source, excluir=excluir)
+    if informe == "satisfaccion":
+        return puntuar_satisfaccion(source, excluir)
+    if informe == "generico":
+        return puntuar_generico(source, json_source)
+    raise ValueError(f"Tipo de informe desconocido: {informe}")
+
+
+def registro_encuestados(informe: str, source, json_source=None, ponderacion=None) -> RegistroProveedores:
+    """
+    Registro con las puntuaciones ('respuestas_agrupadas') y los 'pesos' de cada
+    encuestado, los mismos que deja el generador del informe. Es para cuando el
+    informe sale del almacén sin calcular nada: lee y valida el fichero una sola vez.
+    """
+    excluir = columnas_ponderacion(ponderacion)
+    if informe == "burnout":
+        with open(RUTA_CONFIG_BURNOUT, "r", encoding="utf-8") as f:
+            config = json.load(f)
+        validacion = leer_respuestas_cbb(source, config, excluir=excluir)
+        puntuar = lambda r: agrupar_burnout(validacion.valores, config)
+    elif informe == "satisfaccion":
+        validacion = leer_respuestas_satisfaccion(source, excluir=excluir)
+        puntuar = lambda r: agrupar_satisfaccion(validacion.valores)
+    elif informe == "generico":
+        validacion = leer_respuestas_generico(source, cargar_catalogo(json_source))
+        puntuar = lambda r: validacion.valores
+    else:
+        raise ValueError(f"Tipo de informe desconocido: {informe}")
+    registro = RegistroProveedores()
+    registro.registrar('respuestas_agrupadas', puntuar)
+    registro.registrar('pesos', lambda r: pesos_encuestados(validacion, ponderacion))
+    return registro
+
+
+def estimar(informe: str, puntuaciones_muestra: pd.DataFrame, n_total: int = None, limite=10,
+            pesos=None) -> Estimacion:
+    """
+    Estimación de los resultados del informe a partir de las puntuaciones de una
+    muestra aleatoria de `n_total` respuestas (por defecto, todas).
+
+    Con los `pesos` de cada encuestado (ver ponderacion.py) las medias son las
+    ponderadas del informe y los márgenes usan el tamaño efectivo de Kish de las
+    respuestas de cada dimensión en lugar de su número.
+    """
+    estadisticas = describir(puntuaciones_muestra, pesos)
+    n = len(puntuaciones_muestra)
+    n_total = max(n_total or n, n)
+    correccion = np.sqrt((n_total - n) / (n_total - 1)) if n_total > 1 else 0.0
+    cuenta = estadisticas["count"]
+    if pesos is not None:
+        # (suma de pesos)² / suma de pesos², con los pesos de las respuestas válidas de cada dimensión
+        validos = np.asarray(pesos, dtype=float)[:, None] * puntuaciones_muestra.notna().to_numpy()
+        cuadrados = (validos ** 2).sum(axis=0)
+        cuenta = pd.Series(np.divide(validos.sum(axis=0) ** 2, cuadrados, out=np.zeros(len(cuadrados)),
+                                     where=cuadrados > 0), index=estadisticas.index)
+    cuenta = cuenta.clip(lower=1)
+    medias = estadisticas["mean"].round(2)
+    margenes = (Z_95 * estadisticas["std"].fillna(0) / np.sqrt(cuenta) * correccion).round(2)
+    estimacion = Estimacion(medias, margenes, n, n_total)
+
+    if informe == "burnout":
+        reglas = cargar_reglas_alerta(RUTA_ALERTAS_BURNOUT, limite)
+        estimacion.alertas = reglas.dimensiones(medias)
+        inferior = reglas.clasificador.escalar(medias - margenes)
+        superior = reglas.clasificador.escalar(medias + margenes)
+        estimacion.dudosas = [dim for dim in medias.index
+                              if inferior[dim] <= reglas.limite < superior[dim] and dim not in estimacion.alertas]
+    elif informe == "satisfaccion":
+        with open(RUTA_MEDIDAS_SATISFACCION, "r", encoding="utf-8") as f:
+            clasificador = clasificador_rangos(json.load(f)["rangos"])
+        media, margen = medias["Satisfaccion_General"], margenes["Satisfaccion_General"]
+        estimacion.nivel = clasificador.clasificar(media)
+        # Niveles cuyo rango corta el intervalo [media - margen, media + margen]
+        cortan = (clasificador.inferiores <= media + margen) & (clasificador.superiores >= media - margen)
+        estimacion.niveles_posibles = [nivel for nivel, corta in zip(clasificador.niveles, cortan) if corta]
+    return estimacion
+
+
+def _sep_csv(source, sep=None):
+    ruta = ruta_csv(source)
+    if ruta is None or sep is not None:
+        return ruta, sep
+    datos = source if isinstance(source, DatosMapeados) else DatosMapeados(ruta)
+    try:
+        return ruta, datos.separador()
+    finally:
+        if datos is not source:
+            datos.close()
+
+
+def muestras_reservorio(source, tamano: int = MUESTRA_PREVIA, sep=None, semilla: int = 0,
+                        bloque_filas: int = BLOQUE_MUESTRA):
+    """
+    Recorre las respuestas de `source` por bloques y, tras cada bloque, devuelve
+    (muestra, filas leídas): una muestra aleatoria uniforme de hasta `tamano` filas
+    de todas las leídas hasta entonces.
+
+    Los CSV en disco se leen en streaming; el resto de fuentes (.xlsx, oleadas,
+    subidas en memoria) se leen enteras y se muestrean de una vez.
+    """
+    ruta, sep = _sep_csv(source, sep)
+    if ruta is None:
+        respuestas = leer_csv(source, sep)
+        n = len(respuestas)
+        elegidas = np.sort(np.random.default_rng(semilla).choice(n, min(tamano, n), replace=False))
+        yield respuestas.iloc[elegidas], n
+        return
+
+    rng = np.random.default_rng(semilla)
+    reservorio, columnas, vistas = None, None, 0
+    for bloque in pd.read_csv(ruta, sep=sep, chunksize=bloque_filas):
+        filas = bloque.to_numpy(dtype=object)
+        if reservorio is None:
+            columnas = bloque.columns
+            reservorio = filas[:0]
+        # Mientras no está lleno, el reservorio toma las filas tal cual
+        faltan = tamano - len(reservorio)
+        if faltan > 0:
+            reservorio = np.vstack([reservorio, filas[:faltan]])
+            vistas += len(filas[:faltan])
+            filas = filas[faltan:]
+        if len(filas):
+            # La fila i-ésima entra con probabilidad tamano / (i + 1) en un hueco al azar
+            huecos = rng.integers(0, vistas + np.arange(1, len(filas) + 1))
+            entran = np.flatnonzero(huecos < tamano)
+            # Si varias filas del bloque caen en el mismo hueco, se queda la última (como en el algoritmo secuencial)
+            _, ultimas = np.unique(huecos[entran][::-1], return_index=True)
+            entran = entran[::-1][ultimas]
+            reservorio[huecos[entran]] = filas[entran]
+            vistas += len(filas)
+        yield pd.DataFrame(reservorio, columns=columnas).infer_objects(), vistas
+
+
+def estimaciones_previas(informe: str, source, limite=10, json_source=None, tamano: int = MUESTRA_PREVIA,
+                         semilla: int = 0, excluir=()):
+    """
+    Estimaciones sucesivas de los resultados del informe mientras se recorre el
+    fichero: una tras cada bloque leído, cada vez sobre una muestra más representativa.
+    Las filas totales se toman del plan de lectura hasta conocerlas. Las
+    estimaciones no están ponderadas; `excluir` son las columnas de la ponderación.
+    """
+    sep = ";" if informe == "generico" else None
+    estimadas = planificar(source, sep).filas_estimadas or 0
+    muestra, vistas = None, 0
+    for muestra, vistas in muestras_reservorio(source, tamano, sep, semilla):
+        yield estimar(informe, puntuaciones(informe, muestra, json_source, excluir), max(vistas, estimadas), limite)
+    # Al terminar ya se conoce el número real de filas
+    if muestra is not None and estimadas > vistas:
+        yield estimar(informe, puntuaciones(informe, muestra, json_source, excluir), vistas, limite)
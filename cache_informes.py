@@ -0,0 +1,175 @@
+"""
+Almacén de informes direccionado por contenido.
+
+Cada .docx generado se guarda en disco bajo el hash SHA-256 de todas sus
+entradas: tipo de informe, contenido del CSV (y del JSON de preguntas),
+código del generador, plantilla, configuración, catálogo de medidas y todos
+los parámetros, incluida la semilla. Si otra persona (o el vigilante, o la
+reconstrucción por lotes) pide exactamente el mismo informe, se devuelve el
+fichero ya generado sin volver a calcular ni montar el documento.
+
+- Escrituras atómicas (fichero temporal + `os.replace`): varios procesos pueden
+  compartir la misma carpeta sin ver nunca un informe a medias.
+- Tamaño acotado con política LRU: cada acierto actualiza la fecha del fichero
+  y, al guardar, se eliminan los más antiguos hasta quedar por debajo del límite.
+- Con `generar_resultados` se guardan también, junto al .docx y con la misma
+  clave, los resultados del informe en JSON (ver resultados.py).
+"""
+import hashlib
+import json
+import os
+from functools import lru_cache
+
+from resultados import Resultados
+from trabajos import ficheros_configuracion, guardar_atomico, tipo_informe
+
+# Carpeta por defecto del almacén (se puede cambiar con la variable de entorno INFORMES_CACHE)
+CARPETA_CACHE = os.environ.get("INFORMES_CACHE", ".cache_informes")
+
+# Tamaño máximo del almacén en bytes
+MAX_BYTES_CACHE = 512 * 1024 * 1024
+
+# Extensión de los resultados (JSON) guardados junto a cada informe
+EXTENSION_RESULTADOS = ".resultados.json"
+
+
+@lru_cache(maxsize=256)
+def _hash_fichero(ruta: str, tamano: int, mtime_ns: int) -> str:
+    h = hashlib.sha256()
+    with open(ruta, "rb") as f:
+        for trozo in iter(lambda: f.read(1 << 20), b""):
+            h.update(trozo)
+    return h.hexdigest()
+
+
+def hash_fichero(ruta: str) -> str:
+    """Hash del contenido de un fichero; se recalcula solo si cambian su tamaño o fecha."""
+    info = os.stat(ruta)
+    return _hash_fichero(ruta, info.st_size, info.st_mtime_ns)
+
+
+def hash_fuente(source) -> str:
+    """
+    Hash del contenido de una ruta, file-like (UploadedFile de Streamlit), dict JSON
+    o volcado proyectado en memoria (`utils.DatosMapeados`, que ya lo tiene calculado).
+    """
+    if hasattr(source, "huella"):
+        return source.huella()
+    if isinstance(source, dict):
+        return hashlib.sha256(json.dumps(source, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+    if hasattr(source, "read"):
+        source.seek(0)
+        contenido = source.read()
+        source.seek(0)
+        if isinstance(contenido, str):
+            contenido = contenido.encode("utf-8")
+        return hashlib.sha256(contenido).hexdigest()
+    return hash_fichero(source)
+
+
+def clave_informe(tipo: str, **argumentos) -> str:
+    """
+    Clave del almacén para el informe `tipo` generado con `argumentos`
+    (los mismos que recibe su generador). Los argumentos '*_source' se
+    identifican por su contenido y el resto por su valor.
+    """
+    h = hashlib.sha256(tipo.encode("utf-8"))
+    for ruta in ficheros_configuracion(tipo):
+        if os.path.exists(ruta):
+            h.update(ruta.encode("utf-8"))
+            h.update(hash_fichero(ruta).encode("ascii"))
+
+    for nombre in sorted(argumentos):
+        valor = argumentos[nombre]
+        if nombre.endswith("_source"):
+            valor = hash_fuente(valor)
+        h.update(json.dumps([nombre, valor], ensure_ascii=False, default=str).encode("utf-8"))
+    return h.hexdigest()
+
+
+class CacheInformes:
+    """
+    Almacén en disco de informes .docx indexado por `clave_informe`.
+
+    Ejemplo de uso
+    --------------
+    >>> cache = CacheInformes()
+    >>> docx_bytes = cache.generar("burnout", csv_source="ACME.csv", empresa="ACME", invitados=50)
+    """
+
+    def __init__(self, carpeta: str = CARPETA_CACHE, max_bytes: int = MAX_BYTES_CACHE):
+        self.carpeta = carpeta
+        self.max_bytes = max_bytes
+
+    def _ruta(self, clave: str, extension: str = ".docx") -> str:
+        return os.path.join(self.carpeta, clave[:2], f"{clave}{extension}")
+
+    def obtener(self, clave: str, extension: str = ".docx"):
+        """Devuelve los bytes guardados para `clave` o None si no están."""
+        ruta = self._ruta(clave, extension)
+        try:
+            with open(ruta, "rb") as f:
+                datos = f.read()
+            os.utime(ruta)  # marca de uso reciente para el LRU
+        except FileNotFoundError:
+            return None
+        return datos
+
+    def guardar(self, clave: str, datos: bytes, extension: str = ".docx"):
+        guardar_atomico(self._ruta(clave, extension), datos)
+        self.recortar()
+
+    def recortar(self):
+        """Elimina los informes usados hace más tiempo hasta no superar `max_bytes`."""
+        ficheros = []
+        for raiz, _, nombres in os.walk(self.carpeta):
+            for nombre in nombres:
+                if not nombre.endswith((".docx", EXTENSION_RESULTADOS)):
+                    continue
+                ruta = os.path.join(raiz, nombre)
+                try:
+                    info = os.stat(ruta)
+                except FileNotFoundError:
+                    continue
+                ficheros.append((info.st_mtime, info.st_size, ruta))
+
+        total = sum(tamano for _, tamano, _ in ficheros)
+        for _, tamano, ruta in sorted(ficheros):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(ruta)
+            except FileNotFoundError:
+                pass  # otro proceso ya lo ha eliminado
+            total -= tamano
+
+    def generar(self, tipo: str, registro=None, **argumentos) -> bytes:
+        """
+        Devuelve el informe `tipo` del almacén o, si no está, lo genera con
+        su generador, lo guarda y lo devuelve.
+
+        El `registro` (proveedores.RegistroProveedores) no forma parte de la clave:
+        si el informe se genera, el generador deja en él sus datos calculados; si
+        sale del almacén, queda vacío.
+        """
+        clave = clave_informe(tipo, **argumentos)
+        datos = self.obtener(clave)
+        if datos is None:
+            datos = tipo_informe(tipo)["generador"](**argumentos, registro=registro)
+            self.guardar(clave, datos)
+        return datos
+
+    def generar_resultados(self, tipo: str, registro=None, **argumentos):
+        """
+        Como `generar`, pero devuelve (bytes del .docx, resultados.Resultados). Si
+        el informe está en el almacén sin sus resultados, se vuelve a generar.
+        """
+        clave = clave_informe(tipo, **argumentos)
+        datos = self.obtener(clave)
+        guardados = self.obtener(clave, EXTENSION_RESULTADOS)
+        if datos is not None and guardados is not None:
+            return datos, Resultados.desde_json(guardados)
+        datos, resultados = tipo_informe(tipo)["generador"](**argumentos, resultados=True, registro=registro)
+        self.guardar(clave, datos)
+        self.guardar(clave, resultados.a_json(), EXTENSION_RESULTADOS)
+        return datos, resultados
@@ -0,0 +1,155 @@
+import hashlib
+import json
+from collections import OrderedDict
+
+# Mapa texto→valor de las respuestas no numéricas de los cuestionarios genéricos
+MAPA_RESPUESTAS_GENERICO = {'no': 0, 'sí': 10, 'si': 10}
+
+# Número de catálogos compilados que se mantienen en memoria
+MAX_CATALOGOS = 32
+
+_catalogos = OrderedDict()
+
+
+def codificar_valor(valor, mapa_respuestas=MAPA_RESPUESTAS_GENERICO):
+    """
+    Traduce el valor de una opción ('Si', 'No', '7'...) a su código entero,
+    con la misma regla que se aplica a las respuestas del CSV.
+    Devuelve None si el valor no es codificable.
+    """
+    texto = str(valor).strip().lower()
+    return mapa_respuestas.get(texto, int(texto) if texto.isdigit() else None)
+
+
+class Opcion:
+    """Opción de respuesta compilada: id, valor original, código entero y textos por idioma."""
+    __slots__ = ('id', 'valor', 'codigo', 'textos')
+
+    def __init__(self, id, valor, codigo, textos):
+        self.id = id
+        self.valor = valor
+        self.codigo = codigo
+        self.textos = textos
+
+    def __repr__(self):
+        return f"Opcion(id={self.id!r}, valor={self.valor!r}, codigo={self.codigo!r})"
+
+
+class Pregunta:
+    """Pregunta compilada: id, columna (1-based) del CSV, textos por idioma y opciones."""
+    __slots__ = ('id', 'columna', 'textos', 'opciones', 'codigos')
+
+    def __init__(self, id, columna, textos, opciones):
+        self.id = id
+        self.columna = columna
+        self.textos = textos
+        self.opciones = opciones
+        # Índice id de opción / valor original → código entero
+        self.codigos = {}
+        for opcion in opciones:
+            self.codigos[opcion.id] = opcion.codigo
+            self.codigos[opcion.valor] = opcion.codigo
+
+    def __repr__(self):
+        return f"Pregunta(id={self.id!r}, columna={self.columna}, opciones={len(self.opciones)})"
+
+
+class CatalogoPreguntas:
+    """
+    Catálogo compilado de un cuestionario genérico (JSON con 'availableLocales'
+    y 'questions'). Se construye una sola vez por contenido y permite renderizar
+    en cualquier idioma disponible mediante simples consultas.
+    """
+    __slots__ = ('huella', 'locales', 'preguntas', '_por_id')
+
+    def __init__(self, huella, locales, preguntas):
+        self.huella = huella
+        self.locales = locales
+        self.preguntas = preguntas
+        self._por_id = {p.id: p for p in preguntas}
+
+    def __len__(self):
+        return len(self.preguntas)
+
+    def pregunta(self, id) -> Pregunta:
+        return self._por_id[id]
+
+    def columna(self, id) -> int:
+        """Columna (1-based) del CSV que corresponde a la pregunta `id`."""
+        return self._por_id[id].columna
+
+    def validar_locale(self, locale: str):
+        if locale not in self.locales:
+            raise ValueError(
+                f"Locale '{locale}' no disponible. Solo están: {self.locales}"
+            )
+
+
+def compilar_catalogo(json_data: dict, huella: str = None,
+                      mapa_respuestas=MAPA_RESPUESTAS_GENERICO) -> CatalogoPreguntas:
+    """Compila el JSON de preguntas (ya cargado) en un CatalogoPreguntas."""
+    locales = list(json_data.get("availableLocales", []))
+    preguntas = []
+    for columna, q in enumerate(json_data.get("questions", []), start=1):
+        opciones = [
+            Opcion(
+                id=opt.get("id"),
+                valor=opt.get("value"),
+                codigo=codificar_valor(opt.get("value"), mapa_respuestas),
+                textos={loc: texto.strip() for loc, texto in opt.get("optionTexts", {}).items()},
+            )
+            for opt in q.get("options", [])
+        ]
+        preguntas.append(Pregunta(
+            id=q.get("id"),
+            columna=columna,
+            textos={loc: texto.strip() for loc, texto in q.get("questionTexts", {}).items()},
+            opciones=opciones,
+        ))
+    return CatalogoPreguntas(huella, locales, preguntas)
+
+
+def _leer_bytes(source) -> bytes:
+    if hasattr(source, "read"):
+        source.seek(0)
+        contenido = source.read()
+        source.seek(0)
+        return contenido.encode("utf-8") if isinstance(contenido, str) else contenido
+    with open(source, "rb") as f:
+        return f.read()
+
+
+def cargar_catalogo(source, mapa_respuestas=MAPA_RESPUESTAS_GENERICO) -> CatalogoPreguntas:
+    """
+    Devuelve el catálogo compilado de un JSON de preguntas dado como ruta,
+    file-like (UploadedFile de Streamlit) o dict ya cargado.
+
+    El resultado se cachea por el hash SHA-256 del contenido: si el mismo JSON
+    vuelve a llegar (aunque sea otro fichero u otra subida), no se parsea ni
+    se compila de nuevo. Con un `utils.DatosMapeados` se reutiliza su hash y el
+    contenido solo se lee si el catálogo no está en caché.
+    """
+    contenido = None
+    if isinstance(source, dict):
+        contenido = json.dumps(source, sort_keys=True, ensure_ascii=False).encode("utf-8")
+        huella = hashlib.sha256(contenido).hexdigest()
+    elif hasattr(source, "huella"):
+        # Volcado proyectado en memoria (utils.DatosMapeados): el hash ya está calculado
+        huella = source.huella()
+    else:
+        contenido = _leer_bytes(source)
+        huella = hashlib.sha256(contenido).hexdigest()
+
+    clave = (huella, tuple(sorted(mapa_respuestas.items())))
+    if clave in _catalogos:
+        _catalogos.move_to_end(clave)
+        return _catalogos[clave]
+
+    if contenido is None:
+        contenido = _leer_bytes(source)
+    json_data = source if isinstance(source, dict) else json.loads(contenido)
+    catalogo = compilar_catalogo(json_data, clave[0], mapa_respuestas)
+    _catalogos[clave] = catalogo
+    if len(_catalogos) > MAX_CATALOGOS:
+        _catalogos.popitem(last=False)
+    return catalogo
@@ -0,0 +1,134 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+
+class Clasificador:
+    """
+    Clasificación por intervalos compilada a arrays ordenados.
+
+    Cada nivel ocupa el intervalo cerrado [inferior, superior]; los valores que no
+    caen en ningún intervalo (huecos entre rangos, fuera de escala o NaN) reciben el
+    código -1. Todos los valores se clasifican con un único `np.searchsorted`, sea
+    un número, una fila de dimensiones o una matriz empresas x dimensiones.
+
+    `escalas` ({dimensión: factor}) multiplica las columnas indicadas antes de
+    clasificar (p. ej. las consecuencias del CBB, de un solo ítem, se llevan a la
+    escala de las dimensiones de tres ítems).
+    """
+
+    def __init__(self, niveles, inferiores, superiores, escalas=None):
+        orden = np.argsort(np.asarray(inferiores, dtype=float), kind="stable")
+        self.niveles = np.array([niveles[i] for i in orden] + [None], dtype=object)
+        self.inferiores = np.asarray(inferiores, dtype=float)[orden]
+        self.superiores = np.asarray(superiores, dtype=float)[orden]
+        self.escalas = dict(escalas or {})
+
+    def escalar(self, valores):
+        """Aplica las escalas por dimensión a un DataFrame o Series (columnas/índice = dimensiones)."""
+        if not self.escalas or not isinstance(valores, (pd.DataFrame, pd.Series)):
+            return valores
+        etiquetas = valores.columns if isinstance(valores, pd.DataFrame) else valores.index
+        factores = np.array([self.escalas.get(d, 1) for d in etiquetas], dtype=float)
+        return valores * factores
+
+    def codigos(self, valores) -> np.ndarray:
+        """Código del nivel de cada valor (posición en `self.niveles`) o -1 si no clasifica."""
+        matriz = np.asarray(self.escalar(valores), dtype=float)
+        posicion = np.searchsorted(self.inferiores, matriz, side="right") - 1
+        dentro = (posicion >= 0) & (matriz <= self.superiores[np.clip(posicion, 0, None)])
+        return np.where(dentro, posicion, -1)
+
+    def clasificar(self, valores):
+        """
+        Nombre del nivel de cada valor (None si no clasifica), con la misma
+        forma que la entrada: escalar, array, Series o DataFrame.
+        """
+        etiquetas = self.niveles[self.codigos(valores)]
+        if isinstance(valores, pd.DataFrame):
+            return pd.DataFrame(etiquetas, index=valores.index, columns=valores.columns)
+        if isinstance(valores, pd.Series):
+            return pd.Series(etiquetas, index=valores.index, name=valores.name)
+        if isinstance(etiquetas, np.ndarray) and etiquetas.ndim == 0:
+            return etiquetas.item()
+        return etiquetas
+
+
+def clasificador_rangos(rangos: dict, escalas=None) -> Clasificador:
+    """
+    Compila los rangos de un JSON de medidas ({"rojo": [15, 54], "naranja": [55, 69], ...})
+    en un Clasificador.
+    """
+    return Clasificador(
+        list(rangos),
+        [inferior for inferior, _ in rangos.values()],
+        [superior for _, superior in rangos.values()],
+        escalas,
+    )
+
+
+class ReglasAlerta:
+    """
+    Reglas de alerta por dimensión: una dimensión está en alerta cuando su media
+    (escalada) supera `limite`. Si una empresa tiene menos de `minimo_alertas`
+    dimensiones en alerta, se toman en su lugar las `minimo_alertas` dimensiones
+    con mayor media, para que siempre haya medidas que proponer.
+    """
+
+    def __init__(self, limite, escalas=None, minimo_alertas=2):
+        self.limite = limite
+        self.minimo_alertas = minimo_alertas
+        # "> limite" es el intervalo cerrado [siguiente float tras el límite, +inf]
+        self.clasificador = Clasificador(["alerta"], [np.nextafter(float(limite), np.inf)], [np.inf], escalas)
+
+    def alertas(self, medias: pd.DataFrame) -> pd.DataFrame:
+        """
+        Matriz booleana empresas (o segmentos) x dimensiones con las dimensiones
+        en alerta de cada fila, ya aplicada la regla del mínimo de alertas.
+        """
+        escaladas = np.asarray(self.clasificador.escalar(medias), dtype=float)
+        marcadas = self.clasificador.codigos(medias) == 0
+
+        pocas = marcadas.sum(axis=1) < self.minimo_alertas
+        if pocas.any():
+            # Las NaN quedan al final del orden descendente y no se seleccionan
+            orden = np.argsort(np.where(np.isnan(escaladas), np.inf, -escaladas), axis=1, kind="stable")
+            mayores = np.zeros_like(marcadas)
+            np.put_along_axis(mayores, orden[:, :self.minimo_alertas], True, axis=1)
+            mayores &= ~np.isnan(escaladas)
+            marcadas = np.where(pocas[:, None], mayores, marcadas)
+
+        return pd.DataFrame(marcadas, index=medias.index, columns=medias.columns)
+
+    def dimensiones(self, medias: pd.Series) -> list[str]:
+        """
+        Dimensiones en alerta de una única empresa ({dimensión: media}), en el orden
+        de las columnas o, si se ha aplicado la regla del mínimo, de mayor a menor media.
+        """
+        fila = medias.to_frame().T
+        marcadas = self.alertas(fila).iloc[0]
+        dims = list(marcadas[marcadas].index)
+        if (self.clasificador.codigos(fila) == 0).sum() < self.minimo_alertas:
+            escaladas = self.clasificador.escalar(medias)
+            dims = list(escaladas[dims].sort_values(ascending=False, kind="stable").index)
+        return dims
+
+
+def cargar_reglas_alerta(ruta: str, limite=None) -> ReglasAlerta:
+    """
+    Lee las reglas de alerta de un JSON {"limite", "minimo_alertas", "escalas"}.
+    Si se indica `limite`, tiene prioridad sobre el del fichero.
+    """
+    configuracion = {}
+    if os.path.exists(ruta):
+        with open(ruta, "r", encoding="utf-8") as f:
+            configuracion = json.load(f)
+    else:
+        print(f"El fichero {ruta} no existe: se usan las reglas de alerta por defecto")
+    return ReglasAlerta(
+        limite if limite is not None else configuracion.get("limite", 10),
+        configuracion.get("escalas", {}),
+        configuracion.get("minimo_alertas", 2),
+    )
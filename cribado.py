@@ -0,0 +1,200 @@
+"""
+Cribado de alertas de toda la cartera de clientes sin generar documentos.
+
+Ejecuta solo las fases de lectura, puntuación y clasificación de los informes
+de Burnout o de satisfacción sobre muchos CSV en paralelo y produce una única
+tabla ordenada (primero las empresas con más riesgo) con la media de cada
+dimensión y su nivel de alerta.
+
+Los resultados se van escribiendo en `<salida>.parcial` a medida que termina
+cada empresa; al acabar se escribe la tabla ordenada en `<salida>` (.csv o .parquet).
+
+Uso
+---
+    python cribado.py burnout ./clientes/ --salida cribado_burnout.parquet --limite 10
+    python cribado.py satisfaccion a.csv b.csv --salida cribado_satisfaccion.csv
+"""
+import argparse
+import glob
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+
+from clasificacion import cargar_reglas_alerta, clasificador_rangos
+from estadisticas import describir
+from Generar_informe_Burnout import puntuar_burnout
+from Generar_informe_Satisfaccion import puntuar_satisfaccion
+from utils import EXTENSIONES_RESPUESTAS
+
+RUTA_ALERTAS_BURNOUT = os.path.join("Burnout", "alertas.json")
+RUTA_MEDIDAS_SATISFACCION = os.path.join("Satisfacción laboral", "medidas.json")
+
+
+def puntuar_empresa(tipo: str, csv: str) -> dict:
+    """Número de respuestas y media de cada dimensión de una empresa (un CSV)."""
+    puntuaciones = puntuar_burnout(csv) if tipo == "burnout" else puntuar_satisfaccion(csv)
+    medias = describir(puntuaciones)["mean"]
+    return {
+        "empresa": os.path.splitext(os.path.basename(csv))[0],
+        "fichero": csv,
+        "respuestas": len(puntuaciones),
+        **{f"MEDIA_{dim}": float(media) for dim, media in medias.items()},
+    }
+
+
+def cargar_clasificacion(tipo: str, limite=None):
+    """
+    Reglas con las que se clasifican las empresas: las `ReglasAlerta` de
+    Burnout/alertas.json (burnout) o el clasificador de los rangos de
+    medidas.json (satisfaccion).
+    """
+    if tipo == "burnout":
+        return cargar_reglas_alerta(RUTA_ALERTAS_BURNOUT, limite)
+    with open(RUTA_MEDIDAS_SATISFACCION, "r", encoding="utf-8") as f:
+        return clasificador_rangos(json.load(f)["rangos"])
+
+
+def clasificar(tipo: str, tabla: pd.DataFrame, limite=None, reglas=None) -> pd.DataFrame:
+    """
+    Añade a la tabla de medias (una fila por empresa) los niveles de alerta,
+    clasificando todas las empresas y dimensiones a la vez.
+
+    - burnout: ALERTA_<DIM> (media escalada > limite), N_ALERTAS, DIMENSIONES_ALERTA
+      y MAXIMO_ESCALADO (mayor media escalada), según Burnout/alertas.json.
+    - satisfaccion: NIVEL de la satisfacción general según los rangos de medidas.json.
+
+    `reglas` son las de `cargar_clasificacion` ya cargadas (por defecto, se cargan).
+    """
+    tabla = tabla.copy()
+    columnas = [c for c in tabla.columns if c.startswith("MEDIA_")]
+    medias = tabla[columnas].rename(columns=lambda c: c[len("MEDIA_"):])
+    reglas = reglas if reglas is not None else cargar_clasificacion(tipo, limite)
+
+    if tipo == "burnout":
+        alertas = pd.DataFrame(reglas.clasificador.codigos(medias) == 0,
+                               index=medias.index, columns=medias.columns)
+        for dim in alertas.columns:
+            tabla[f"ALERTA_{dim}"] = alertas[dim]
+        tabla["N_ALERTAS"] = alertas.sum(axis=1)
+        tabla["DIMENSIONES_ALERTA"] = alertas.apply(lambda fila: "; ".join(fila.index[fila]), axis=1)
+        tabla["MAXIMO_ESCALADO"] = reglas.clasificador.escalar(medias).max(axis=1)
+    else:
+        tabla["NIVEL"] = reglas.clasificar(medias["Satisfaccion_General"])
+    return tabla
+
+
+def ordenar(tipo: str, tabla: pd.DataFrame) -> pd.DataFrame:
+    """Ordena de mayor a menor riesgo."""
+    if tipo == "burnout":
+        return tabla.sort_values(["N_ALERTAS", "MAXIMO_ESCALADO"], ascending=False, kind="stable")
+    return tabla.sort_values("MEDIA_Satisfaccion_General", kind="stable")
+
+
+def guardar_tabla(tabla: pd.DataFrame, ruta: str):
+    if ruta.lower().endswith(".parquet"):
+        tabla.to_parquet(ruta, index=False)
+    else:
+        tabla.to_csv(ruta, index=False)
+
+
+class _EscritorParcial:
+    """Añade filas a un CSV o Parquet a medida que llegan."""
+
+    def __init__(self, ruta: str):
+        self.ruta = ruta
+        self.parquet = ".parquet" in ruta.lower()
+        self._escritor = None
+        self._cabecera = True
+
+    def escribir(self, filas: pd.DataFrame):
+        if self.parquet:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            lote = pa.Table.from_pandas(filas, preserve_index=False)
+            if self._escritor is None:
+                self._escritor = pq.ParquetWriter(self.ruta, lote.schema)
+            self._escritor.write_table(lote.cast(self._escritor.schema))
+        else:
+            filas.to_csv(self.ruta, mode="w" if self._cabecera else "a", header=self._cabecera, index=False)
+            self._cabecera = False
+
+    def cerrar(self):
+        if self._escritor is not None:
+            self._escritor.close()
+
+
+def ficheros_csv(entradas) -> list[str]:
+    """Expande carpetas (todos sus .csv y .xlsx) y comodines en una lista ordenada de ficheros."""
+    ficheros = []
+    for entrada in entradas:
+        if os.path.isdir(entrada):
+            for extension in EXTENSIONES_RESPUESTAS:
+                ficheros.extend(glob.glob(os.path.join(entrada, f"*{extension}")))
+        elif glob.has_magic(entrada):
+            ficheros.extend(glob.glob(entrada))
+        else:
+            ficheros.append(entrada)
+    return sorted(set(ficheros))
+
+
+def cribar(tipo: str, ficheros, salida: str = None, limite=None, procesos: int = None) -> pd.DataFrame:
+    """
+    Puntúa y clasifica en paralelo todos los `ficheros` y devuelve la tabla ordenada.
+    Si se indica `salida`, la tabla se va volcando en `<salida>.parcial` y al final
+    se guarda ordenada en `salida`.
+    """
+    if tipo not in ("burnout", "satisfaccion"):
+        raise ValueError(f"Tipo de informe '{tipo}' no reconocido para el cribado. Solo están: burnout, satisfaccion")
+
+    # Reglas y clasificadores se cargan una vez para todas las empresas
+    reglas = cargar_clasificacion(tipo, limite)
+    escritor = _EscritorParcial(salida + ".parcial") if salida else None
+    filas = []
+    inicio = time.perf_counter()
+    try:
+        with ProcessPoolExecutor(max_workers=procesos) as ejecutor:
+            futuros = {ejecutor.submit(puntuar_empresa, tipo, csv): csv for csv in ficheros}
+            for n, futuro in enumerate(as_completed(futuros), start=1):
+                csv = futuros[futuro]
+                try:
+                    fila = clasificar(tipo, pd.DataFrame([futuro.result()]), reglas=reglas)
+                except Exception as error:
+                    print(f"[{n}/{len(futuros)}] Error en {csv}: {error}")
+                    continue
+                filas.append(fila)
+                if escritor is not None:
+                    escritor.escribir(fila)
+                print(f"[{n}/{len(futuros)}] {fila['empresa'].iloc[0]}")
+    finally:
+        if escritor is not None:
+            escritor.cerrar()
+
+    tabla = ordenar(tipo, pd.concat(filas, ignore_index=True)) if filas else pd.DataFrame()
+    if salida:
+        guardar_tabla(tabla, salida)
+        if os.path.exists(salida + ".parcial"):
+            os.remove(salida + ".parcial")
+        print(f"{len(tabla)} empresas cribadas en {time.perf_counter() - inicio:.1f} s: {salida}")
+    return tabla
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cribado de alertas de muchas empresas sin generar informes Word.")
+    parser.add_argument("informe", choices=["burnout", "satisfaccion"])
+    parser.add_argument("entradas", nargs="+", help="CSV, carpetas o comodines")
+    parser.add_argument("--salida", default=None, help="Fichero de resultados (.csv o .parquet)")
+    parser.add_argument("--limite", type=float, default=None, help="Límite de alerta de Burnout (por defecto, el de alertas.json)")
+    parser.add_argument("--procesos", type=int, default=None, help="Número de procesos en paralelo")
+    args = parser.parse_args()
+
+    salida = args.salida or f"cribado_{args.informe}.csv"
+    tabla = cribar(args.informe, ficheros_csv(args.entradas), salida, args.limite, args.procesos)
+    if not tabla.empty:
+        print(tabla.head(10).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Puntuaciones por encuestado en formato Arrow (y Parquet).
+
+`respuestas_agrupadas` (la puntuación de cada persona en cada dimensión de
+Burnout, las tres de Satisfacción o cada pregunta de Genérico) se calcula para
+obtener los estadísticos del informe y después se descartaba. Aquí se expone
+como una tabla Arrow construida sin copias: cada columna de Arrow apunta al
+mismo buffer que el array de NumPy de la columna de pandas (o, en las columnas
+con respuestas vacías, a sus valores y su máscara), así que una tabla de un
+millón de filas se entrega sin convertir nada. Desde la tabla, los analistas
+pueden escribir Parquet, pasarla a Polars/DuckDB o leerla con pyarrow.
+
+Uso
+---
+    python encuestados.py burnout ACME.csv -o ACME_puntuaciones.parquet
+    python encuestados.py generico ACME.csv --json preguntas.json -o ACME_puntuaciones.parquet
+"""
+import argparse
+import io
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from aproximacion import puntuaciones
+from oleadas import fuente_respuestas
+
+
+def tabla_puntuaciones(puntuaciones_df: pd.DataFrame, informe: str = None) -> pa.Table:
+    """
+    Tabla Arrow con una fila por encuestado: la columna 'encuestado' (posición de
+    la fila en las respuestas leídas) y una columna por dimensión. Las columnas
+    numéricas contiguas comparten memoria con el DataFrame (las que son vistas con
+    saltos de una matriz por filas, como en Genérico, se copian una vez); los NaN
+    (o las celdas enmascaradas) quedan como nulos.
+    """
+    columnas = [pa.array(np.asarray(puntuaciones_df.index, dtype=np.int64))]
+    columnas += [pa.Array.from_pandas(puntuaciones_df[columna]) for columna in puntuaciones_df.columns]
+    nombres = ["encuestado", *(str(columna) for columna in puntuaciones_df.columns)]
+    metadatos = {"informe": informe} if informe else None
+    return pa.Table.from_arrays(columnas, names=nombres, metadata=metadatos)
+
+
+def puntuaciones_encuestados(informe: str, source, json_source=None) -> pa.Table:
+    """Lee las respuestas de `source` y devuelve sus puntuaciones por encuestado en Arrow."""
+    return tabla_puntuaciones(puntuaciones(informe, source, json_source), informe)
+
+
+def parquet_puntuaciones(tabla: pa.Table) -> bytes:
+    """La tabla de puntuaciones en Parquet, en memoria (p. ej. para descargarla)."""
+    buffer = io.BytesIO()
+    pq.write_table(tabla, buffer)
+    return buffer.getvalue()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Exporta las puntuaciones por encuestado a Parquet.")
+    parser.add_argument("informe", choices=["burnout", "satisfaccion", "generico"])
+    parser.add_argument("respuestas", nargs="+", help="Fichero(s) de respuestas (varias oleadas se unen)")
+    parser.add_argument("--json", default=None, help="JSON de preguntas (informes genéricos)")
+    parser.add_argument("-o", "--salida", default=None, help="Fichero Parquet de salida")
+    args = parser.parse_args()
+
+    tabla = puntuaciones_encuestados(args.informe, fuente_respuestas(args.respuestas), args.json)
+    if args.salida:
+        pq.write_table(tabla, args.salida)
+        print(f"{tabla.num_rows} encuestados y {tabla.num_columns - 1} puntuaciones en {args.salida}")
+    else:
+        print(tabla.to_string(preview_cols=8))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,301 @@
+import warnings
+
+import numpy as np
+import pandas as pd
+
+# Número máximo de celdas (remuestras x encuestados) que se materializan a la vez
+# al construir la matriz de índices del bootstrap.
+MAX_CELDAS_BOOTSTRAP = 4_000_000
+
+
+def matriz_numerica(datos) -> np.ndarray:
+    """
+    Convierte un DataFrame (o array) de respuestas en una matriz float 2D.
+    Los valores no numéricos y las celdas enmascaradas (enteros con máscara) se
+    convierten en NaN.
+    """
+    if isinstance(datos, pd.Series):
+        datos = datos.to_frame()
+    if isinstance(datos, pd.DataFrame):
+        datos = datos.apply(pd.to_numeric, errors="coerce")
+        return datos.to_numpy(dtype=float, na_value=np.nan)
+    matriz = np.asarray(datos, dtype=float)
+    return matriz.reshape(len(matriz), -1)
+
+
+def bootstrap_intervalos(datos, n_remuestras: int = 1000, nivel: float = 0.95,
+                         semilla=None, pesos=None) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Calcula intervalos de confianza percentil de la media de cada columna
+    mediante bootstrap vectorizado.
+
+    Parámetros
+    ----------
+    datos : pd.DataFrame | np.ndarray
+        Matriz (encuestados x dimensiones). Los NaN se ignoran columna a columna.
+    n_remuestras : int
+        Número de remuestras bootstrap.
+    nivel : float
+        Nivel de confianza del intervalo (0.95 → percentiles 2.5 y 97.5).
+    semilla : int | np.random.Generator | None
+        Semilla (o generador) para que el resultado sea reproducible.
+    pesos : np.ndarray | None
+        Peso de cada encuestado (ver ponderacion.py): las medias de cada remuestra
+        son medias ponderadas.
+
+    Proceso
+    -------
+    1. Se sortea una única matriz de índices (remuestras x encuestados).
+    2. Con `np.bincount` se transforma en una matriz de frecuencias de cada
+       encuestado en cada remuestra.
+    3. Las medias de todas las remuestras y dimensiones salen de un único producto
+       matricial frecuencias @ datos (sin bucles por dimensión ni por remuestra).
+       Si la matriz no cabe en MAX_CELDAS_BOOTSTRAP se procesa por bloques de remuestras.
+
+    Retorna
+    -------
+    tuple[np.ndarray, np.ndarray]
+        Límites inferior y superior del intervalo para cada columna.
+    """
+    matriz = matriz_numerica(datos)
+    n, d = matriz.shape
+    if n == 0 or n_remuestras <= 0:
+        vacio = np.full(d, np.nan)
+        return vacio, vacio.copy()
+
+    rng = np.random.default_rng(semilla)
+    validos = ~np.isnan(matriz)
+    valores = np.where(validos, matriz, 0.0)
+    validos = validos.astype(float)
+    if pesos is not None:
+        valores = valores * pesos[:, None]
+        validos = validos * pesos[:, None]
+
+    medias = np.empty((n_remuestras, d))
+    bloque = max(1, min(n_remuestras, MAX_CELDAS_BOOTSTRAP // n))
+    for inicio in range(0, n_remuestras, bloque):
+        b = min(bloque, n_remuestras - inicio)
+        indices = rng.integers(0, n, size=(b, n))
+        desplazados = indices + (np.arange(b) * n)[:, None]
+        frecuencias = np.bincount(desplazados.ravel(), minlength=b * n).reshape(b, n).astype(float)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            medias[inicio:inicio + b] = (frecuencias @ valores) / (frecuencias @ validos)
+
+    alfa = (1 - nivel) / 2
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        inferior, superior = np.nanquantile(medias, [alfa, 1 - alfa], axis=0)
+    return inferior, superior
+
+
+# Rango máximo (max - min) para el que se usa el histograma en lugar de ordenar.
+MAX_RANGO_HISTOGRAMA = 4096
+
+COLUMNAS_DESCRIPTIVAS = ['mean', 'std', 'min', 'max', 'p25', 'p75', 'count']
+
+
+def _varianza_ponderada(cuadrados, total, cuenta):
+    """
+    Varianza a partir de la suma (ponderada) de desviaciones al cuadrado: su media
+    ponderada por n / (n - 1), con n el número de respuestas y no la suma de pesos,
+    para que no dependa de la escala de los pesos (un segmento puede sumar menos
+    de 1). Sin pesos es la cuasivarianza de siempre.
+    """
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return cuadrados / (cuenta - 1) * (cuenta / total)
+
+
+def _escala_pesos(total, cuenta):
+    """
+    Factor que lleva los pesos de cada columna a media 1 entre sus respuestas, de
+    modo que la posición de los cuantiles (n - 1) * q tampoco depende de su escala.
+    """
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(total > 0, cuenta / total, 0.0)
+
+
+def _cuantil_histograma(acumulado, valores, posiciones):
+    """
+    Obtiene, para cada fila de `acumulado` (conteos acumulados por valor), el valor
+    que ocupa la posición (0-based) indicada en la muestra ordenada.
+    """
+    indices = (acumulado > posiciones[:, None]).argmax(axis=1)
+    return valores[indices]
+
+
+def _describir_histograma(matriz, validos, minimo, rango, pesos=None):
+    d = matriz.shape[1]
+    offsets = np.where(validos, matriz - minimo, 0).astype(np.int64)
+    columnas = np.broadcast_to(np.arange(d) * rango, matriz.shape)
+    # Con pesos, cada respuesta suma su peso en el histograma en lugar de 1
+    ponderaciones = np.broadcast_to(pesos[:, None], matriz.shape)[validos] if pesos is not None else None
+    conteos = np.bincount(
+        (offsets + columnas)[validos], weights=ponderaciones, minlength=d * rango
+    ).reshape(d, rango).astype(float)
+    if pesos is not None:
+        conteos *= _escala_pesos(conteos.sum(axis=1), validos.sum(axis=0))[:, None]
+
+    valores = minimo + np.arange(rango, dtype=float)
+    n = conteos.sum(axis=1)
+    suma = conteos @ valores
+    suma_cuadrados = conteos @ (valores ** 2)
+
+    cuenta = validos.sum(axis=0).astype(float) if pesos is not None else n
+    with np.errstate(invalid="ignore", divide="ignore"):
+        media = suma / n
+    varianza = _varianza_ponderada(suma_cuadrados - n * media ** 2, n, cuenta)
+    std = np.sqrt(np.clip(varianza, 0, None))
+    std[cuenta < 2] = np.nan
+
+    presentes = conteos > 0
+    minimos = np.where(n > 0, valores[presentes.argmax(axis=1)], np.nan)
+    maximos = np.where(n > 0, valores[rango - 1 - presentes[:, ::-1].argmax(axis=1)], np.nan)
+
+    acumulado = conteos.cumsum(axis=1)
+    cuantiles = []
+    for q in (0.25, 0.75):
+        # Misma interpolación lineal que pandas: posición h = (n - 1) * q
+        h = np.clip((n - 1) * q, 0, None)
+        bajo = np.floor(h)
+        v_bajo = _cuantil_histograma(acumulado, valores, bajo)
+        v_alto = _cuantil_histograma(acumulado, valores, np.minimum(bajo + 1, np.maximum(n - 1, 0)))
+        cuantil = v_bajo + (h - bajo) * (v_alto - v_bajo)
+        cuantiles.append(np.where(n > 0, cuantil, np.nan))
+
+    return media, std, minimos, maximos, cuantiles[0], cuantiles[1], cuenta
+
+
+def _describir_ponderado(matriz, validos, pesos):
+    n = validos.sum(axis=0).astype(float)
+    ponderaciones = np.where(validos, pesos[:, None], 0.0)
+    ponderaciones *= _escala_pesos(ponderaciones.sum(axis=0), n)
+    x = np.where(validos, matriz, 0.0)
+    total = ponderaciones.sum(axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        media = (ponderaciones * x).sum(axis=0) / total
+    varianza = _varianza_ponderada((ponderaciones * (x - media) ** 2).sum(axis=0), total, n)
+    std = np.where(n < 2, np.nan, np.sqrt(np.clip(varianza, 0, None)))
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        minimos = np.nanmin(matriz, axis=0)
+        maximos = np.nanmax(matriz, axis=0)
+
+    # Cuantiles sobre los pesos acumulados de cada columna ordenada (los NaN quedan al final)
+    orden = np.argsort(matriz, axis=0)
+    ordenados = np.take_along_axis(matriz, orden, axis=0)
+    acumulado = np.take_along_axis(ponderaciones, orden, axis=0).cumsum(axis=0)
+    ultimo = np.maximum(n.astype(int) - 1, 0)
+    cuantiles = []
+    for q in (0.25, 0.75):
+        h = np.clip((total - 1) * q, 0, None)
+        bajo = np.floor(h)
+        alto = np.minimum(bajo + 1, np.maximum(total - 1, 0))
+        v_bajo = ordenados[np.minimum((acumulado > bajo).argmax(axis=0), ultimo), np.arange(len(h))]
+        v_alto = ordenados[np.minimum((acumulado > alto).argmax(axis=0), ultimo), np.arange(len(h))]
+        cuantiles.append(np.where(n > 0, v_bajo + (h - bajo) * (v_alto - v_bajo), np.nan))
+    return media, std, minimos, maximos, cuantiles[0], cuantiles[1], n
+
+
+def _describir_general(matriz, validos):
+    n = validos.sum(axis=0).astype(float)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        media = np.nanmean(matriz, axis=0)
+        std = np.nanstd(matriz, axis=0, ddof=1)
+        minimos = np.nanmin(matriz, axis=0)
+        maximos = np.nanmax(matriz, axis=0)
+        p25, p75 = np.nanquantile(matriz, [0.25, 0.75], axis=0)
+    return media, std, minimos, maximos, p25, p75, n
+
+
+def describir(datos, pesos=None) -> pd.DataFrame:
+    """
+    Calcula de una vez media, desviación típica, mínimo, máximo, percentiles 25 y 75
+    y número de respuestas válidas de todas las columnas de `datos`.
+
+    Si todas las puntuaciones son enteras y su rango es acotado (lo habitual en
+    escalas Likert y sumas de ítems), se construye un histograma por dimensión con
+    un único `np.bincount` y todos los estadísticos (incluidos los cuantiles, a partir
+    de los conteos acumulados) salen de él en O(rango), sin ordenar los datos.
+    En otro caso se usan las reducciones vectorizadas de NumPy sobre la matriz completa.
+
+    Con `pesos` (uno por encuestado, ver ponderacion.py) la media, la desviación
+    típica y los percentiles son ponderados: en el histograma cada respuesta suma
+    su peso y, si no hay histograma, los percentiles salen de los pesos acumulados
+    de cada columna ordenada. 'count' sigue siendo el número de respuestas, y la
+    desviación típica se corrige con él (ver `_varianza_ponderada`).
+
+    Retorna
+    -------
+    pd.DataFrame
+        Índices: nombre de la dimensión (columna de entrada).
+        Columnas: COLUMNAS_DESCRIPTIVAS, sin redondear.
+    """
+    indice = datos.columns if isinstance(datos, pd.DataFrame) else None
+    if isinstance(datos, pd.Series):
+        indice = [datos.name]
+    matriz = matriz_numerica(datos)
+    validos = ~np.isnan(matriz)
+
+    resultado = None
+    if validos.any():
+        finitos = matriz[validos]
+        minimo, maximo = finitos.min(), finitos.max()
+        rango = int(maximo - minimo) + 1 if np.isfinite(maximo - minimo) else 0
+        if 0 < rango <= MAX_RANGO_HISTOGRAMA and np.all(finitos == np.floor(finitos)):
+            resultado = _describir_histograma(matriz, validos, minimo, rango, pesos)
+    if resultado is None:
+        resultado = _describir_general(matriz, validos) if pesos is None else \
+            _describir_ponderado(matriz, validos, pesos)
+
+    return pd.DataFrame(dict(zip(COLUMNAS_DESCRIPTIVAS, resultado)), index=indice)
+
+
+def conteos_ponderados(datos, inicio: int, fin: int, pesos=None) -> np.ndarray:
+    """
+    Matriz columnas x valores (de `inicio` a `fin` - 1) con las respuestas de cada
+    valor en cada columna de `datos` o, con `pesos`, la suma de los pesos de
+    quienes lo han elegido. Todas las columnas se cuentan con un único np.bincount.
+    """
+    matriz = matriz_numerica(datos)
+    d = matriz.shape[1]
+    rango = fin - inicio
+    validos = ~np.isnan(matriz) & (matriz >= inicio) & (matriz < fin)
+    codigos = (np.where(validos, matriz - inicio, 0).astype(np.int64) + np.arange(d) * rango)[validos]
+    ponderaciones = np.broadcast_to(pesos[:, None], matriz.shape)[validos] if pesos is not None else None
+    return np.bincount(codigos, weights=ponderaciones, minlength=d * rango).reshape(d, rango)
+
+
+def describir_segmentos(datos, segmentos, pesos=None) -> pd.DataFrame:
+    """
+    Media y desviación típica (ponderadas si se pasan `pesos`) y número de
+    respuestas de cada columna de `datos` en cada segmento (sede, departamento...).
+    Las sumas de todos los segmentos y columnas salen de tres np.bincount.
+
+    Retorna
+    -------
+    pd.DataFrame
+        Índices: (segmento, dimensión). Columnas: ['mean', 'std', 'count'].
+    """
+    columnas = list(datos.columns) if isinstance(datos, pd.DataFrame) else None
+    matriz = matriz_numerica(datos)
+    n, d = matriz.shape
+    codigos, niveles = pd.factorize(np.asarray(segmentos), sort=True)
+    s = len(niveles)
+    pesos = np.ones(n) if pesos is None else np.asarray(pesos, dtype=float)
+
+    validos = ~np.isnan(matriz) & (codigos >= 0)[:, None]
+    posiciones = (codigos[:, None] * d + np.arange(d))[validos]
+    ponderaciones = np.broadcast_to(pesos[:, None], matriz.shape)[validos]
+    x = matriz[validos]
+    total = np.bincount(posiciones, weights=ponderaciones, minlength=s * d)
+    suma = np.bincount(posiciones, weights=ponderaciones * x, minlength=s * d)
+    suma_cuadrados = np.bincount(posiciones, weights=ponderaciones * x ** 2, minlength=s * d)
+    cuenta = np.bincount(posiciones, minlength=s * d)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        media = suma / total
+    varianza = _varianza_ponderada(suma_cuadrados - total * media ** 2, total, cuenta)
+    std = np.where(cuenta < 2, np.nan, np.sqrt(np.clip(varianza, 0, None)))
+    indice = pd.MultiIndex.from_product([list(niveles), columnas or list(range(d))], names=["segmento", "dimension"])
+    return pd.DataFrame({"mean": media, "std": std, "count": cuenta}, index=indice)
@@ -0,0 +1,135 @@
+"""
+Respuestas vacías: almacenamiento compacto y puntuación de dimensiones.
+
+Las respuestas con alguna celda vacía se guardan como enteros con máscara
+(`Int8` de pandas: un array int8 con los valores y otro booleano con las
+vacías), en lugar de float con NaN u object. Al agrupar ítems en dimensiones,
+sumar sin más contaría las vacías como 0 y rebajaría la puntuación; cada
+dimensión aplica en su lugar una política de datos faltantes:
+
+- "prorrateo" (por defecto): media de los ítems respondidos por el número de
+  ítems de la dimensión, si se han respondido al menos `minimo` (por defecto, la
+  mitad redondeada hacia arriba); si no, la dimensión queda sin puntuar (NaN).
+- "completas": solo se puntúa si se han respondido todos los ítems (exclusión).
+- "ceros": las vacías cuentan como 0 (el comportamiento anterior).
+
+Todo se calcula de una vez sobre la matriz de valores y su máscara, sin bucles
+por encuestado. Sin celdas vacías el resultado es la suma entera de siempre.
+
+Ejemplo de uso
+--------------
+>>> politicas = {"FISICAS": {"politica": "completas"}, "TEDIO": {"politica": "prorrateo", "minimo": 2}}
+>>> puntuar_dimensiones(respuestas, {"TEDIO": ["P6", "P14", "P20"], "FISICAS": ["P13"]}, politicas)
+"""
+import math
+
+import numpy as np
+import pandas as pd
+
+POLITICAS = ("prorrateo", "completas", "ceros")
+
+
+class PoliticaFaltantes:
+    """Política de una dimensión ante ítems sin responder (ver el docstring del módulo)."""
+
+    def __init__(self, politica: str = "prorrateo", minimo: int = None):
+        if politica not in POLITICAS:
+            raise ValueError(f"Política de datos faltantes desconocida: {politica!r} (válidas: {', '.join(POLITICAS)})")
+        if minimo is not None and minimo < 1:
+            raise ValueError(f"El mínimo de ítems respondidos debe ser al menos 1 (es {minimo})")
+        self.politica = politica
+        self.minimo = minimo
+
+    def minimo_items(self, n_items: int) -> int:
+        """Ítems que hay que haber respondido para puntuar una dimensión de `n_items`."""
+        if self.politica == "completas":
+            return n_items
+        if self.politica == "ceros":
+            return 0
+        return min(self.minimo, n_items) if self.minimo is not None else math.ceil(n_items / 2)
+
+
+def politica_faltantes(especificacion=None) -> PoliticaFaltantes:
+    """
+    PoliticaFaltantes a partir de su nombre, de un dict {"politica", "minimo"}
+    (como en Dimensiones_CBB.json) o de None (la política por defecto).
+    """
+    if isinstance(especificacion, PoliticaFaltantes):
+        return especificacion
+    if especificacion is None:
+        return PoliticaFaltantes()
+    if isinstance(especificacion, str):
+        return PoliticaFaltantes(especificacion)
+    return PoliticaFaltantes(especificacion.get("politica", "prorrateo"), especificacion.get("minimo"))
+
+
+def enteros_enmascarados(valores: np.ndarray, indice, columnas) -> pd.DataFrame:
+    """
+    DataFrame de enteros con máscara (Int8, o Int16 si los valores no caben) a
+    partir de una matriz float con NaN en las celdas vacías. Los valores se
+    guardan por columnas, así que cada columna es un trozo contiguo de la matriz.
+    """
+    mascara = np.isnan(valores)
+    finitos = valores[~mascara]
+    tipo = np.int8 if finitos.size == 0 or (finitos.min() >= -128 and finitos.max() <= 127) else np.int16
+    datos = np.asfortranarray(np.where(mascara, 0, valores).astype(tipo))
+    mascara = np.asfortranarray(mascara)
+    return pd.DataFrame({columna: pd.arrays.IntegerArray(datos[:, j], mascara[:, j])
+                         for j, columna in enumerate(columnas)}, index=indice)
+
+
+def puntuar_dimension(valores: np.ndarray, mascara: np.ndarray, politica: PoliticaFaltantes) -> np.ndarray:
+    """
+    Puntuación por encuestado de una dimensión a partir de sus ítems (`valores`,
+    encuestados x ítems, con 0 en las celdas vacías) y de la `mascara` de vacías.
+    """
+    suma = valores.sum(axis=1)
+    if not mascara.any():
+        return suma
+    n_items = valores.shape[1]
+    respondidas = n_items - mascara.sum(axis=1)
+    if politica.politica == "ceros":
+        return suma.astype(float)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        puntuacion = suma * n_items / respondidas if politica.politica == "prorrateo" else suma.astype(float)
+    return np.where(respondidas >= politica.minimo_items(n_items), puntuacion, np.nan)
+
+
+def puntuar_dimensiones(respuestas: pd.DataFrame, dimensiones: dict, politicas=None) -> pd.DataFrame:
+    """
+    Puntuación de cada encuestado en cada dimensión.
+
+    Parámetros
+    ----------
+    respuestas : pd.DataFrame
+        Valores numéricos de las respuestas (enteros, con máscara o float con NaN).
+    dimensiones : dict
+        {dimensión: [columnas de sus ítems]}, en el orden de salida.
+    politicas : dict | None
+        {dimensión: política} (ver `politica_faltantes`); las que no aparecen usan
+        la política por defecto.
+
+    Las dimensiones sin vacías salen como enteros; las demás, como float con NaN
+    en los encuestados que no se pueden puntuar. Si alguna puntuación se ha
+    prorrateado o descartado se avisa por pantalla.
+    """
+    politicas = politicas or {}
+    mascara = respuestas.isna().to_numpy()
+    valores = respuestas.to_numpy(dtype=np.int64, na_value=0)
+    posiciones = {columna: j for j, columna in enumerate(respuestas.columns)}
+
+    puntuaciones, prorrateadas, sin_puntuar = {}, 0, 0
+    for dimension, columnas in dimensiones.items():
+        cols = [posiciones[columna] for columna in columnas]
+        politica = politica_faltantes(politicas.get(dimension))
+        puntuacion = puntuar_dimension(valores[:, cols], mascara[:, cols], politica)
+        if politica.politica != "ceros":
+            incompletas = mascara[:, cols].any(axis=1)
+            sin_puntuar += int(np.isnan(puntuacion[incompletas]).sum()) if incompletas.any() else 0
+            prorrateadas += int((~np.isnan(puntuacion[incompletas])).sum()) \
+                if politica.politica == "prorrateo" and incompletas.any() else 0
+        puntuaciones[dimension] = puntuacion
+
+    if prorrateadas or sin_puntuar:
+        print(f"Respuestas vacías: {prorrateadas} puntuaciones prorrateadas y {sin_puntuar} sin puntuar")
+    return pd.DataFrame(puntuaciones, index=respuestas.index)
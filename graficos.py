@@ -0,0 +1,215 @@
+import re
+from xml.sax.saxutils import escape
+
+import pandas as pd
+from docx.opc.constants import CONTENT_TYPE as CT
+from docx.opc.constants import RELATIONSHIP_TYPE as RT
+from docx.opc.part import Part
+from docx.oxml import OxmlElement, parse_xml
+from docx.oxml.ns import nsdecls, qn
+
+# Tamaño por defecto de cada gráfico (EMU: 1 cm = 360000)
+ANCHO_GRAFICO = 5_760_000
+ALTO_GRAFICO = 2_880_000
+
+# ---------------------------------------------------------------------------
+# Plantillas precompiladas de las partes DrawingML. Solo se rellenan los huecos
+# variables (título, series, tipo de agrupación); el resto del XML es fijo.
+# ---------------------------------------------------------------------------
+_PLANTILLA_GRAFICO = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<c:chartSpace xmlns:c="http://schemas.openxmlformats.org/drawingml/2006/chart"'
+    ' xmlns:a="http://schemas.openxmlformats.org/drawingml/2006/main"'
+    ' xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<c:roundedCorners val="0"/>'
+    '<c:chart>'
+    '<c:title><c:tx><c:rich><a:bodyPr/><a:p><a:pPr><a:defRPr sz="1100" b="1"/></a:pPr>'
+    '<a:r><a:rPr lang="es-ES" sz="1100" b="1"/><a:t>{titulo}</a:t></a:r></a:p></c:rich></c:tx>'
+    '<c:overlay val="0"/></c:title>'
+    '<c:autoTitleDeleted val="0"/>'
+    '<c:plotArea><c:layout/>'
+    '<c:barChart><c:barDir val="{direccion}"/><c:grouping val="{agrupacion}"/><c:varyColors val="0"/>'
+    '{series}'
+    '<c:dLbls><c:showLegendKey val="0"/><c:showVal val="{etiquetas}"/><c:showCatName val="0"/>'
+    '<c:showSerName val="0"/><c:showPercent val="0"/><c:showBubbleSize val="0"/></c:dLbls>'
+    '<c:gapWidth val="60"/>{solapamiento}'
+    '<c:axId val="50010001"/><c:axId val="50010002"/></c:barChart>'
+    '<c:catAx><c:axId val="50010001"/><c:scaling><c:orientation val="{orientacion}"/></c:scaling>'
+    '<c:delete val="0"/><c:axPos val="{pos_categorias}"/><c:numFmt formatCode="General" sourceLinked="0"/>'
+    '<c:majorTickMark val="none"/><c:minorTickMark val="none"/><c:tickLblPos val="nextTo"/>'
+    '<c:crossAx val="50010002"/><c:crosses val="autoZero"/><c:auto val="1"/><c:lblAlgn val="ctr"/>'
+    '<c:lblOffset val="100"/><c:noMultiLvlLbl val="0"/></c:catAx>'
+    '<c:valAx><c:axId val="50010002"/><c:scaling><c:orientation val="minMax"/></c:scaling>'
+    '<c:delete val="0"/><c:axPos val="{pos_valores}"/><c:majorGridlines/>'
+    '<c:numFmt formatCode="General" sourceLinked="0"/><c:majorTickMark val="none"/>'
+    '<c:minorTickMark val="none"/><c:tickLblPos val="nextTo"/><c:crossAx val="50010001"/>'
+    '<c:crosses val="autoZero"/><c:crossBetween val="between"/></c:valAx>'
+    '</c:plotArea>'
+    '{leyenda}'
+    '<c:plotVisOnly val="1"/><c:dispBlanksAs val="gap"/>'
+    '</c:chart>'
+    '</c:chartSpace>'
+)
+
+_PLANTILLA_SERIE = (
+    '<c:ser><c:idx val="{idx}"/><c:order val="{idx}"/><c:tx><c:v>{nombre}</c:v></c:tx>'
+    '<c:invertIfNegative val="0"/>'
+    '<c:cat><c:strLit><c:ptCount val="{n}"/>{categorias}</c:strLit></c:cat>'
+    '<c:val><c:numLit><c:formatCode>General</c:formatCode><c:ptCount val="{n}"/>{valores}</c:numLit></c:val>'
+    '</c:ser>'
+)
+
+_PLANTILLA_PUNTO = '<c:pt idx="{0}"><c:v>{1}</c:v></c:pt>'
+
+_LEYENDA = '<c:legend><c:legendPos val="b"/><c:overlay val="0"/></c:legend>'
+
+_PLANTILLA_INLINE = (
+    '<w:r %s><w:drawing><wp:inline distT="0" distB="0" distL="0" distR="0">'
+    '<wp:extent cx="{ancho}" cy="{alto}"/><wp:effectExtent l="0" t="0" r="0" b="0"/>'
+    '<wp:docPr id="{id}" name="Gráfico {id}"/><wp:cNvGraphicFramePr/>'
+    '<a:graphic><a:graphicData uri="http://schemas.openxmlformats.org/drawingml/2006/chart">'
+    '<c:chart r:id="{rid}"/></a:graphicData></a:graphic>'
+    '</wp:inline></w:drawing></w:r>'
+) % nsdecls('w', 'wp', 'a', 'c', 'r')
+
+
+def _puntos(valores) -> str:
+    # Los valores None (p. ej. medias sin datos) se omiten: el punto queda vacío
+    return ''.join(_PLANTILLA_PUNTO.format(i, v) for i, v in enumerate(valores) if v is not None)
+
+
+def xml_grafico_barras(titulo: str, categorias, series: dict, apilado=False, horizontal=False) -> bytes:
+    """
+    Construye el XML de una parte de gráfico de barras (DrawingML) a partir de
+    las plantillas precompiladas.
+
+    Parámetros
+    ----------
+    titulo : str
+        Título del gráfico.
+    categorias : list
+        Etiquetas del eje de categorías.
+    series : dict
+        {nombre_serie: lista de valores}, un valor por categoría.
+    apilado : bool
+        Si es True las series se apilan (barras apiladas).
+    horizontal : bool
+        Barras horizontales (útil cuando hay muchas categorías o etiquetas largas).
+
+    Los datos se guardan como literales (strLit/numLit), por lo que no hace falta
+    incrustar ninguna hoja de cálculo en el documento.
+    """
+    categorias_xml = _puntos(escape(str(c)) for c in categorias)
+    n = len(categorias)
+    series_xml = ''.join(
+        _PLANTILLA_SERIE.format(
+            idx=i,
+            nombre=escape(str(nombre)),
+            n=n,
+            categorias=categorias_xml,
+            valores=_puntos(None if pd.isna(v) else float(v) for v in valores),
+        )
+        for i, (nombre, valores) in enumerate(series.items())
+    )
+    xml = _PLANTILLA_GRAFICO.format(
+        titulo=escape(str(titulo)),
+        direccion='bar' if horizontal else 'col',
+        agrupacion='stacked' if apilado else 'clustered',
+        series=series_xml,
+        etiquetas=0 if apilado else 1,
+        solapamiento='<c:overlap val="100"/>' if apilado else '',
+        # En barras horizontales se invierte el eje para que la primera categoría quede arriba
+        orientacion='maxMin' if horizontal else 'minMax',
+        pos_categorias='l' if horizontal else 'b',
+        pos_valores='b' if horizontal else 'l',
+        leyenda=_LEYENDA if len(series) > 1 else '',
+    )
+    return xml.encode('utf-8')
+
+
+def conteos_a_matriz(conteo_respuestas: dict) -> pd.DataFrame:
+    """
+    Convierte el diccionario {'PREGUNTA_X_Y': conteo} de `obtenerRespuestas`
+    en una matriz con una fila por pregunta (X) y una columna por valor (Y).
+    """
+    patron = re.compile(r'PREGUNTA_(\d+)_(\d+)')
+    filas = {}
+    for clave, conteo in conteo_respuestas.items():
+        encaje = patron.fullmatch(clave)
+        if encaje:
+            pregunta, valor = map(int, encaje.groups())
+            filas.setdefault(pregunta, {})[valor] = int(conteo)
+    return pd.DataFrame.from_dict(filas, orient='index').sort_index().sort_index(axis=1).fillna(0).astype(int)
+
+
+def graficos_por_pregunta(matriz: pd.DataFrame, titulos=None, etiquetas=None) -> list[bytes]:
+    """
+    Un gráfico de barras por pregunta con la distribución de respuestas.
+
+    `titulos` (lista, una por fila) y `etiquetas` ({valor: texto}) son opcionales.
+    """
+    graficos = []
+    for posicion, (pregunta, fila) in enumerate(matriz.iterrows()):
+        titulo = titulos[posicion] if titulos else f"Pregunta {pregunta}"
+        categorias = [etiquetas.get(v, v) if etiquetas else v for v in fila.index]
+        graficos.append(xml_grafico_barras(titulo, categorias, {"Respuestas": fila.tolist()}))
+    return graficos
+
+
+def grafico_distribucion(matriz: pd.DataFrame, titulo="Distribución de respuestas por pregunta",
+                         etiquetas=None) -> bytes:
+    """Gráfico de barras apiladas con la distribución de respuestas de todas las preguntas."""
+    series = {
+        (etiquetas.get(valor, valor) if etiquetas else valor): matriz[valor].tolist()
+        for valor in matriz.columns
+    }
+    return xml_grafico_barras(titulo, [f"P{p}" for p in matriz.index], series, apilado=True)
+
+
+def grafico_dimensiones(medias: dict, titulo="Puntuación media por dimensión") -> bytes:
+    """Gráfico de barras horizontales con la media de cada dimensión ({nombre: media})."""
+    return xml_grafico_barras(titulo, list(medias), {"Media": list(medias.values())}, horizontal=True)
+
+
+def _siguiente_id_dibujo(doc) -> int:
+    ids = [int(e.get('id')) for e in doc.element.iter(qn('wp:docPr')) if str(e.get('id', '')).isdigit()]
+    return max(ids, default=0) + 1
+
+
+def insertar_grafico(doc, xml_grafico: bytes, despues_de, ancho=ANCHO_GRAFICO, alto=ALTO_GRAFICO):
+    """
+    Añade la parte del gráfico al paquete, la relaciona con el documento y coloca
+    un párrafo con el gráfico (inline) justo después del elemento `despues_de`.
+    Devuelve el nuevo elemento <w:p>.
+    """
+    paquete = doc.part.package
+    nombre_parte = paquete.next_partname('/word/charts/chart%d.xml')
+    parte = Part(nombre_parte, CT.DML_CHART, xml_grafico, paquete)
+    rid = doc.part.relate_to(parte, RT.CHART)
+
+    parrafo = OxmlElement('w:p')
+    parrafo.append(parse_xml(_PLANTILLA_INLINE.format(
+        ancho=ancho, alto=alto, id=_siguiente_id_dibujo(doc), rid=rid
+    )))
+    despues_de.addnext(parrafo)
+    return parrafo
+
+
+def insertar_graficos(doc, graficos: list[bytes], marcador='GRAFICOS'):
+    """
+    Inserta una lista de gráficos en el párrafo del marcador `marcador` o,
+    si la plantilla no lo tiene, al final del documento.
+    """
+    ancla = None
+    for bookmark in doc.element.body.iter(qn('w:bookmarkStart')):
+        if bookmark.get(qn('w:name')) == marcador:
+            ancla = bookmark
+            while ancla is not None and ancla.tag != qn('w:p'):
+                ancla = ancla.getparent()
+            break
+    if ancla is None:
+        print(f"Marcador '{marcador}' no encontrado: los gráficos se añaden al final del documento")
+        ancla = doc.element.body.add_p()
+
+    for xml_grafico in graficos:
+        ancla = insertar_grafico(doc, xml_grafico, ancla)
@@ -0,0 +1,205 @@
+"""
+Detección automática del cuestionario (instrumento) de un fichero de respuestas
+a partir de su fila de cabecera, antes de leer el resto del fichero.
+
+Cada cabecera se normaliza (minúsculas, espacios, solo los primeros
+LONGITUD_CLAVE caracteres de cada columna, porque la plataforma recorta los
+encabezados largos) y se resume en una huella. La detección prueba, por orden:
+
+1. huella: la cabecera completa está en el índice (cabeceras ya vistas en
+   informes generados o registradas a mano, y las preguntas de los JSON de
+   Genérico). Una consulta a un diccionario.
+2. preguntas: al menos MIN_COINCIDENCIA de las preguntas de un JSON de Genérico
+   aparecen entre las columnas (admite columnas extra, como la marca temporal).
+   Una consulta por columna.
+3. columnas: el número de columnas es el de un cuestionario fijo (21 ítems del
+   CBB, 15 de la NTP 394). Es solo orientativo.
+
+Con las dos primeras el resultado es fiable y `comprobar_instrumento` rechaza el
+fichero si se pide otro informe; con la tercera solo se avisa.
+
+Uso
+---
+    python instrumentos.py detectar ACME.csv otra.xlsx
+    python instrumentos.py registrar burnout ACME.csv
+"""
+import argparse
+import glob
+import hashlib
+import json
+import os
+import re
+import unicodedata
+from functools import lru_cache
+
+from catalogo_preguntas import cargar_catalogo
+from utils import guardar_atomico, leer_cabecera
+
+# Índice de cabeceras conocidas (se puede cambiar con la variable de entorno INSTRUMENTOS_INDICE)
+RUTA_INDICE = os.environ.get("INSTRUMENTOS_INDICE", ".indice_instrumentos.json")
+
+# JSON de preguntas de Genérico que se indexan al arrancar
+CATALOGOS_GENERICOS = os.path.join("Generico", "*.json")
+
+# Número de columnas de los cuestionarios fijos
+COLUMNAS_INSTRUMENTO = {"burnout": 21, "satisfaccion": 15}
+
+# Caracteres de cada encabezado que se comparan
+LONGITUD_CLAVE = 25
+
+# Fracción mínima de preguntas de un JSON de Genérico presentes en la cabecera
+MIN_COINCIDENCIA = 0.8
+
+NOMBRES_INSTRUMENTO = {"burnout": "Burnout (CBB)", "satisfaccion": "Satisfacción laboral (NTP 394)",
+                       "generico": "Genérico"}
+
+
+def clave_columna(texto) -> str:
+    """Encabezado normalizado y recortado a LONGITUD_CLAVE caracteres."""
+    texto = unicodedata.normalize("NFKC", str(texto)).replace("’", "'").lower()
+    return re.sub(r"\s+", " ", texto).strip()[:LONGITUD_CLAVE]
+
+
+def huella_cabecera(columnas) -> str:
+    """Huella de una cabecera completa (las columnas, en orden)."""
+    return hashlib.sha256("\x1f".join(clave_columna(c) for c in columnas).encode("utf-8")).hexdigest()
+
+
+class Deteccion:
+    """Cuestionario detectado: tipo de informe, método y, en Genérico, el JSON de preguntas."""
+    __slots__ = ("informe", "metodo", "json_source")
+
+    def __init__(self, informe, metodo, json_source=None):
+        self.informe = informe
+        self.metodo = metodo
+        self.json_source = json_source
+
+    @property
+    def fiable(self) -> bool:
+        return self.metodo != "columnas"
+
+    def __str__(self):
+        texto = NOMBRES_INSTRUMENTO.get(self.informe, self.informe)
+        if self.json_source:
+            texto += f" ({os.path.basename(str(self.json_source))})"
+        return texto if self.fiable else f"{texto}, por el número de columnas"
+
+    def __repr__(self):
+        return f"Deteccion(informe={self.informe!r}, metodo={self.metodo!r}, json_source={self.json_source!r})"
+
+
+class RegistroInstrumentos:
+    """
+    Índice de huellas de cabecera → cuestionario.
+
+    Las cabeceras registradas con `registrar` se guardan en `ruta`; las de los JSON
+    de Genérico se indexan al crear el registro (y con `registrar_catalogo`).
+    """
+
+    def __init__(self, ruta: str = RUTA_INDICE, catalogos: str = CATALOGOS_GENERICOS):
+        self.ruta = ruta
+        self.cabeceras = {}
+        self.preguntas = {}   # clave de columna → {json_source}
+        self._n_preguntas = {}
+        if ruta and os.path.exists(ruta):
+            with open(ruta, "r", encoding="utf-8") as f:
+                self.cabeceras = json.load(f).get("cabeceras", {})
+        self._aprendidas = set(self.cabeceras)
+        for json_source in sorted(glob.glob(catalogos)) if catalogos else []:
+            try:
+                self.registrar_catalogo(json_source)
+            except (ValueError, KeyError, OSError) as error:
+                print(f"No se pudo indexar el JSON de preguntas {json_source}: {error}")
+
+    def registrar(self, informe: str, columnas, json_source=None, guardar: bool = True):
+        """Añade al índice la cabecera de un fichero del cuestionario `informe`."""
+        huella = huella_cabecera(columnas)
+        entrada = {"informe": informe}
+        if json_source is not None:
+            entrada["json_source"] = str(json_source)
+        if self.cabeceras.get(huella) == entrada:
+            return
+        self.cabeceras[huella] = entrada
+        self._aprendidas.add(huella)
+        if guardar and self.ruta:
+            aprendidas = {h: self.cabeceras[h] for h in sorted(self._aprendidas)}
+            guardar_atomico(self.ruta, json.dumps({"cabeceras": aprendidas}, ensure_ascii=False,
+                                                  indent=2).encode("utf-8"))
+
+    def registrar_catalogo(self, json_source, nombre=None):
+        """Indexa las preguntas de un JSON de Genérico (en todos sus idiomas)."""
+        catalogo = cargar_catalogo(json_source)
+        nombre = nombre or (json_source if isinstance(json_source, str) else getattr(json_source, "name", "JSON"))
+        for locale in catalogo.locales:
+            textos = [p.textos.get(locale, "") for p in catalogo.preguntas]
+            self.cabeceras.setdefault(huella_cabecera(textos), {"informe": "generico", "json_source": nombre})
+            for texto in textos:
+                self.preguntas.setdefault(clave_columna(texto), set()).add(nombre)
+        self._n_preguntas[nombre] = len(catalogo.preguntas)
+
+    def detectar(self, columnas):
+        """Deteccion del cuestionario de una cabecera, o None si no se reconoce."""
+        entrada = self.cabeceras.get(huella_cabecera(columnas))
+        if entrada is not None:
+            return Deteccion(entrada["informe"], "huella", entrada.get("json_source"))
+
+        votos = {}
+        for clave in {clave_columna(c) for c in columnas}:
+            for nombre in self.preguntas.get(clave, ()):
+                votos[nombre] = votos.get(nombre, 0) + 1
+        if votos:
+            nombre, n = max(votos.items(), key=lambda par: (par[1] / self._n_preguntas[par[0]], par[0]))
+            if n >= MIN_COINCIDENCIA * self._n_preguntas[nombre]:
+                return Deteccion("generico", "preguntas", nombre)
+
+        for informe, n_columnas in COLUMNAS_INSTRUMENTO.items():
+            if len(columnas) == n_columnas:
+                return Deteccion(informe, "columnas")
+        return None
+
+    def detectar_fuente(self, source):
+        """Deteccion del cuestionario de un fichero de respuestas leyendo solo su cabecera."""
+        return self.detectar(leer_cabecera(source))
+
+
+@lru_cache(maxsize=1)
+def registro_instrumentos() -> RegistroInstrumentos:
+    """Registro compartido del proceso (se crea una sola vez)."""
+    return RegistroInstrumentos()
+
+
+def comprobar_instrumento(informe: str, source, registro: RegistroInstrumentos = None):
+    """
+    Lanza ValueError si la cabecera de `source` corresponde con seguridad a otro
+    cuestionario distinto de `informe`. Devuelve la Deteccion (o None).
+    """
+    deteccion = (registro or registro_instrumentos()).detectar_fuente(source)
+    if deteccion is not None and deteccion.fiable and deteccion.informe != informe:
+        raise ValueError(f"El fichero de respuestas es de {deteccion}, no de "
+                         f"{NOMBRES_INSTRUMENTO.get(informe, informe)}: elige el informe correcto")
+    return deteccion
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Detecta el cuestionario de ficheros de respuestas por su cabecera.")
+    subparsers = parser.add_subparsers(dest="orden", required=True)
+    detectar = subparsers.add_parser("detectar", help="Muestra el cuestionario de cada fichero")
+    detectar.add_argument("ficheros", nargs="+")
+    registrar = subparsers.add_parser("registrar", help="Añade la cabecera de los ficheros al índice")
+    registrar.add_argument("informe", choices=sorted(NOMBRES_INSTRUMENTO))
+    registrar.add_argument("ficheros", nargs="+")
+    registrar.add_argument("--json", default=None, help="JSON de preguntas (informes genéricos)")
+    args = parser.parse_args()
+
+    registro = registro_instrumentos()
+    for fichero in args.ficheros:
+        if args.orden == "registrar":
+            registro.registrar(args.informe, leer_cabecera(fichero), args.json)
+            print(f"{fichero}: registrado como {NOMBRES_INSTRUMENTO[args.informe]}")
+        else:
+            deteccion = registro.detectar_fuente(fichero)
+            print(f"{fichero}: {deteccion or 'cuestionario desconocido'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,252 @@
+"""
+Lectura en streaming de las exportaciones .xlsx de la plataforma de encuestas.
+
+Un .xlsx es un zip con XML: el XML de la hoja se descomprime por trozos y se
+pasa a un parser de expat que entrega las etiquetas según las lee, sin cargar el
+modelo de objetos del libro ni construir ningún árbol. Los textos se resuelven
+contra la tabla de cadenas compartidas (sharedStrings.xml). Las filas se
+acumulan en bloques de BLOQUE_FILAS que se convierten enseguida en columnas de
+pandas, de modo que la memoria intermedia no crece con el número de filas.
+
+El resultado es el mismo DataFrame que daría el CSV equivalente (cabecera en la
+primera fila, números como int64/float64, celdas vacías como NaN), así que pasa
+por las mismas fases de validación y agregación.
+"""
+import posixpath
+import re
+import zipfile
+from xml.etree.ElementTree import XMLParser, iterparse
+
+import numpy as np
+import pandas as pd
+
+# Firma de los ficheros zip (y por tanto de los .xlsx)
+FIRMA_ZIP = b"PK\x03\x04"
+
+# Filas que se acumulan antes de convertirlas en columnas de pandas
+BLOQUE_FILAS = 10_000
+
+# Bytes del XML de la hoja que se descomprimen y analizan de cada vez
+BLOQUE_XML = 1 << 20
+
+_NS = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+_NS_REL = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+_NS_PAQUETE = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+_COLUMNA = re.compile(r"[A-Z]+")
+_ROW, _C, _V, _T, _RPH = (f"{_NS}{etiqueta}" for etiqueta in ("row", "c", "v", "t", "rPh"))
+
+
+def es_xlsx(source) -> bool:
+    """Indica si una ruta o file-like (posicionable) contiene un zip, es decir, un .xlsx."""
+    if hasattr(source, "read"):
+        posicion = source.tell()
+        firma = source.read(len(FIRMA_ZIP))
+        source.seek(posicion)
+    else:
+        with open(source, "rb") as f:
+            firma = f.read(len(FIRMA_ZIP))
+    return firma == FIRMA_ZIP
+
+
+def _indice_columna(referencia: str) -> int:
+    """'A1' → 0, 'AB12' → 27."""
+    indice = 0
+    for letra in _COLUMNA.match(referencia).group():
+        indice = indice * 26 + ord(letra) - 64
+    return indice - 1
+
+
+def _texto(elemento) -> str:
+    """Texto de un <si> o <is>, uniendo los tramos con formato y sin la guía fonética."""
+    if (t := elemento.find(f"{_NS}t")) is not None:
+        return t.text or ""
+    return "".join(r.findtext(f"{_NS}t", "") for r in elemento.iterfind(f"{_NS}r"))
+
+
+def _cadenas_compartidas(libro: zipfile.ZipFile) -> list[str]:
+    if "xl/sharedStrings.xml" not in libro.namelist():
+        return []
+    cadenas = []
+    with libro.open("xl/sharedStrings.xml") as f:
+        for _, elemento in iterparse(f):
+            if elemento.tag == f"{_NS}si":
+                cadenas.append(_texto(elemento))
+                elemento.clear()
+    return cadenas
+
+
+def _ruta_hoja(libro: zipfile.ZipFile, hoja=None) -> str:
+    """Ruta dentro del zip de la hoja `hoja` (nombre o posición; por defecto, la primera)."""
+    with libro.open("xl/workbook.xml") as f:
+        hojas = [(h.get("name"), h.get(f"{_NS_REL}id")) for _, h in iterparse(f) if h.tag == f"{_NS}sheet"]
+    with libro.open("xl/_rels/workbook.xml.rels") as f:
+        destinos = {r.get("Id"): r.get("Target") for _, r in iterparse(f) if r.tag == f"{_NS_PAQUETE}Relationship"}
+
+    if isinstance(hoja, str):
+        elegidas = [rid for nombre, rid in hojas if nombre == hoja]
+        if not elegidas:
+            raise ValueError(f"La hoja '{hoja}' no existe. Solo están: {[nombre for nombre, _ in hojas]}")
+        rid = elegidas[0]
+    else:
+        rid = hojas[hoja or 0][1]
+
+    destino = destinos[rid]
+    return destino.lstrip("/") if destino.startswith("/") else posixpath.normpath(posixpath.join("xl", destino))
+
+
+class _LectorHoja:
+    """
+    Destino del parser XML de una hoja: recibe las etiquetas según se leen (sin
+    construir ningún árbol) y va dejando en `filas` cada fila completa como
+    {columna: valor}, con valores str, int, float, bool o None.
+    """
+
+    def __init__(self, cadenas):
+        self.cadenas = cadenas
+        self.filas = []
+        self._fila = None
+        self._tipo = None
+        self._columna = 0
+        self._texto = None
+        self._capturando = False
+        self._fonetica = False
+        self._indices = {}
+
+    def start(self, etiqueta, atributos):
+        if etiqueta == _C:
+            referencia = atributos.get("r")
+            self._tipo = atributos.get("t", "n")
+            self._columna = self._indice(referencia) if referencia else len(self._fila)
+            self._texto = None
+        elif etiqueta == _V or etiqueta == _T:
+            if self._texto is None:
+                self._texto = []
+            self._capturando = True
+        elif etiqueta == _RPH:
+            self._fonetica = True
+        elif etiqueta == _ROW:
+            self._fila = {}
+
+    def data(self, texto):
+        if self._capturando and not self._fonetica:
+            self._texto.append(texto)
+
+    def end(self, etiqueta):
+        if etiqueta == _C:
+            self._fila[self._columna] = self._valor()
+            self._texto = None
+        elif etiqueta == _V or etiqueta == _T:
+            self._capturando = False
+        elif etiqueta == _RPH:
+            self._fonetica = False  # la guía fonética no forma parte del texto
+        elif etiqueta == _ROW:
+            self.filas.append(self._fila)
+
+    def close(self):
+        pass
+
+    def _indice(self, referencia: str) -> int:
+        """'A1' → 0, 'AB12' → 27 (las letras de cada columna se convierten una sola vez)."""
+        letras = referencia.rstrip("0123456789")
+        if letras not in self._indices:
+            self._indices[letras] = _indice_columna(letras)
+        return self._indices[letras]
+
+    def _valor(self):
+        if self._texto is None or self._tipo == "e":
+            return None
+        texto = "".join(self._texto)
+        if self._tipo == "s":
+            return self.cadenas[int(texto)]
+        if self._tipo == "n":
+            numero = float(texto)
+            return int(numero) if numero.is_integer() else numero
+        if self._tipo == "b":
+            return texto == "1"
+        return texto  # "str" (resultado de fórmula) o "inlineStr"
+
+
+def _bloque(filas, columnas) -> pd.DataFrame:
+    """Convierte un bloque de filas en columnas con el mismo tipo que daría read_csv."""
+    bloque = pd.DataFrame(filas, columns=columnas, dtype=object)
+    for columna in bloque.columns:
+        valores = bloque[columna]
+        tipo = pd.api.types.infer_dtype(valores, skipna=True)
+        if tipo in ("integer", "floating", "mixed-integer-float", "empty"):
+            bloque[columna] = pd.to_numeric(valores)
+        elif tipo == "string":
+            bloque[columna] = valores.where(valores.notna(), np.nan)
+        else:
+            # Mezcla de textos y números: numérica solo si todos los textos lo son
+            numerica = pd.to_numeric(valores, errors="coerce")
+            bloque[columna] = numerica if numerica.notna().sum() == valores.notna().sum() \
+                else valores.where(valores.notna(), np.nan)
+    return bloque
+
+
+def _cabecera(valores) -> list[str]:
+    """Nombres de columna como los de read_csv: vacías → 'Unnamed: i', repetidas → 'x.1'."""
+    nombres, vistos = [], {}
+    for i, valor in enumerate(valores):
+        nombre = f"Unnamed: {i}" if valor is None or valor == "" else str(valor)
+        if nombre in vistos:
+            vistos[nombre] += 1
+            nombre = f"{nombre}.{vistos[nombre]}"
+        else:
+            vistos[nombre] = 0
+        nombres.append(nombre)
+    return nombres
+
+
+def leer_xlsx(source, hoja=None, bloque_filas: int = BLOQUE_FILAS, max_filas: int = None) -> pd.DataFrame:
+    """
+    Lee una hoja de un .xlsx (ruta o file-like posicionable) como un DataFrame.
+
+    Parámetros
+    ----------
+    hoja : str | int | None
+        Nombre o posición de la hoja; por defecto, la primera del libro.
+    bloque_filas : int
+        Filas que se acumulan antes de convertirlas en columnas de pandas.
+    max_filas : int | None
+        Si se indica, se deja de leer la hoja tras esas filas de respuestas
+        (con 0 solo se lee la cabecera).
+    """
+    with zipfile.ZipFile(source) as libro:
+        cadenas = _cadenas_compartidas(libro)
+        ruta = _ruta_hoja(libro, hoja)
+
+        lector = _LectorHoja(cadenas)
+        parser = XMLParser(target=lector)
+        columnas = None
+        filas, bloques = [], []
+        with libro.open(ruta) as f:
+            while True:
+                trozo = f.read(BLOQUE_XML)
+                if trozo:
+                    parser.feed(trozo)
+                else:
+                    parser.close()
+
+                # Las filas completas pasan a listas de valores y, por bloques, a pandas
+                for fila in lector.filas:
+                    if columnas is None:
+                        ancho = max(fila, default=-1) + 1
+                        columnas = _cabecera([fila.get(i) for i in range(ancho)])
+                    elif any(valor is not None for valor in fila.values()):  # read_csv salta las líneas en blanco
+                        filas.append([fila.get(i) for i in range(len(columnas))])
+                lector.filas.clear()
+                if max_filas is not None and columnas is not None and len(filas) >= max_filas:
+                    filas = filas[:max_filas]
+                    break
+                if len(filas) >= bloque_filas:
+                    bloques.append(_bloque(filas, columnas))
+                    filas = []
+                if not trozo:
+                    break
+
+    if columnas is None:
+        raise ValueError("La hoja del Excel está vacía")
+    if filas or not bloques:
+        bloques.append(_bloque(filas, columnas))
+    return pd.concat(bloques, ignore_index=True) if len(bloques) > 1 else bloques[0]
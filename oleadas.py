@@ -0,0 +1,141 @@
+"""
+Unión de varias exportaciones (oleadas) de respuestas de una misma empresa.
+
+Cuando la plataforma divide una exportación en varios ficheros, o se vuelve a
+exportar con solape, `seleccionar_csv` solo tomaba el más reciente y se perdían
+respuestas (o se contaban dos veces si se juntaban a mano). `Oleadas` agrupa
+todos los ficheros en una única fuente de respuestas que los generadores leen
+igual que un CSV:
+
+- Las columnas se alinean por nombre (o por posición si solo cambian los
+  encabezados) en el orden del primer fichero.
+- Los envíos duplicados se detectan con un hash por fila (`hash_pandas_object`,
+  vectorizado) y solo se conserva la primera aparición, en el orden de los
+  ficheros (del más antiguo al más reciente).
+- Los ficheros se leen y se concatenan una sola vez, cuando un generador pide
+  las respuestas, y los duplicados se descartan con una única selección.
+"""
+import glob
+import hashlib
+import os
+
+import numpy as np
+import pandas as pd
+
+from utils import EXTENSIONES_RESPUESTAS, leer_cabecera, leer_csv
+
+
+def ficheros_respuestas(entrada) -> list:
+    """
+    Lista de ficheros de respuestas de una entrada: un fichero, una carpeta (todos
+    sus .csv y .xlsx), un comodín o una lista de ellos. Las carpetas y comodines
+    se ordenan por fecha de modificación, del más antiguo al más reciente.
+    """
+    if isinstance(entrada, (list, tuple)):
+        return [fichero for parte in entrada for fichero in ficheros_respuestas(parte)]
+    if not isinstance(entrada, (str, os.PathLike)):
+        return [entrada]
+    if os.path.isdir(entrada):
+        encontrados = [ruta for extension in EXTENSIONES_RESPUESTAS
+                       for ruta in glob.glob(os.path.join(entrada, f"*{extension}"))]
+    elif glob.has_magic(entrada):
+        encontrados = glob.glob(entrada)
+    else:
+        return [entrada]
+    return sorted(encontrados, key=lambda ruta: (os.path.getmtime(ruta), ruta))
+
+
+def fuente_respuestas(entrada):
+    """
+    Fuente de respuestas para los generadores: la propia entrada si es un único
+    fichero o file-like, o unas `Oleadas` si son varios (lista, carpeta o comodín).
+    """
+    ficheros = ficheros_respuestas(entrada)
+    if not ficheros:
+        raise ValueError(f"No se encontró ningún fichero de respuestas en {entrada}")
+    return ficheros[0] if len(ficheros) == 1 else Oleadas(ficheros)
+
+
+def _alinear(partes: list) -> list:
+    """Reordena las columnas de cada parte según las de la primera."""
+    columnas = list(partes[0].columns)
+    alineadas = [partes[0]]
+    for i, parte in enumerate(partes[1:], start=2):
+        if list(parte.columns) == columnas:
+            alineadas.append(parte)
+        elif set(parte.columns) == set(columnas):
+            alineadas.append(parte[columnas])
+        elif parte.shape[1] == len(columnas):
+            print(f"La oleada {i} tiene otros encabezados pero las mismas columnas: se alinea por posición")
+            alineadas.append(parte.set_axis(columnas, axis=1))
+        else:
+            faltan = [c for c in columnas if c not in parte.columns]
+            sobran = [c for c in parte.columns if c not in columnas]
+            raise ValueError(f"Las columnas de la oleada {i} no coinciden con las de la primera "
+                             f"(faltan {faltan}, sobran {sobran})")
+    return alineadas
+
+
+def envios_duplicados(respuestas: pd.DataFrame, longitudes, claves=None) -> np.ndarray:
+    """
+    Máscara de las filas de `respuestas` (las partes ya concatenadas, de
+    `longitudes` filas cada una) que repiten un envío de una parte anterior.
+
+    Sin `claves`, un envío es la fila completa: dentro de un mismo fichero dos filas
+    iguales son dos personas distintas, así que la k-ésima aparición de una fila en
+    un fichero solo es duplicada si un fichero anterior ya la tenía k veces. Con
+    `claves` (columnas que identifican el envío, p. ej. un id o la marca temporal)
+    se descarta cualquier repetición de esas columnas.
+    """
+    # El hash se calcula sobre las partes ya concatenadas para que todas compartan
+    # tipos (un 3 leído como entero en una oleada y como 3.0 en otra es el mismo envío)
+    hashes = pd.util.hash_pandas_object(respuestas if claves is None else respuestas[list(claves)],
+                                        index=False).to_numpy()
+    if claves is not None:
+        return pd.Series(hashes).duplicated().to_numpy()
+
+    origen = np.repeat(np.arange(len(longitudes)), longitudes)
+    aparicion = pd.Series(hashes).groupby([hashes, origen]).cumcount().to_numpy()
+    return pd.DataFrame({"hash": hashes, "aparicion": aparicion}).duplicated().to_numpy()
+
+
+class Oleadas:
+    """
+    Varias exportaciones de respuestas de una empresa vistas como una sola fuente.
+
+    Ejemplo de uso
+    --------------
+    >>> fuente = Oleadas(["ACME_enero.csv", "ACME_febrero.xlsx"])
+    >>> docx_bytes = generar_informe_burnout(fuente, "ACME", 50)
+    """
+
+    def __init__(self, fuentes, claves=None):
+        self.fuentes = list(fuentes)
+        self.claves = claves
+        self.duplicados = None
+        self._respuestas = {}
+
+    def huella(self) -> str:
+        """Hash de todas las fuentes, en orden (para el almacén de informes)."""
+        from cache_informes import hash_fuente  # cache_informes depende de trabajos, que usa este módulo
+        h = hashlib.sha256(repr(self.claves).encode("utf-8"))
+        for fuente in self.fuentes:
+            h.update(hash_fuente(fuente).encode("ascii"))
+        return h.hexdigest()
+
+    def cabecera(self, sep=None) -> list:
+        """Columnas de la primera oleada (a las que se alinean las demás)."""
+        return leer_cabecera(self.fuentes[0], sep)
+
+    def leer_csv(self, sep=None) -> pd.DataFrame:
+        """Respuestas unidas y sin envíos duplicados (se calculan una vez por separador)."""
+        if sep not in self._respuestas:
+            partes = _alinear([leer_csv(fuente, sep) for fuente in self.fuentes])
+            respuestas = pd.concat(partes, ignore_index=True, copy=False)
+            duplicados = envios_duplicados(respuestas, [len(parte) for parte in partes], self.claves)
+            if duplicados.any():
+                respuestas = respuestas.loc[~duplicados].reset_index(drop=True)
+                print(f"{int(duplicados.sum())} envíos duplicados descartados al unir {len(partes)} oleadas")
+            self.duplicados = int(duplicados.sum())
+            self._respuestas[sep] = respuestas
+        return self._respuestas[sep]
@@ -0,0 +1,336 @@
+"""
+Plan de lectura y validación de un fichero de respuestas según su tamaño.
+
+Antes de leer nada se inspecciona el fichero: tamaño en bytes, filas estimadas a
+partir de una muestra de las primeras líneas (bytes y memoria por fila, tiempo
+de lectura), número de columnas y memoria disponible. La muestra solo se lee si
+el tamaño en bytes no basta para decidir. Con eso se elige cómo leerlo y
+decodificarlo:
+
+- memoria: lectura completa con pandas y validación de todo el DataFrame de una
+  vez. Es el camino rápido para los ficheros habituales (y el único para .xlsx,
+  que ya se leen en streaming, varias oleadas y subidas que no están en disco).
+- bloques: lectura por bloques de filas (`read_csv(chunksize=...)`); cada bloque
+  se valida y solo se conservan sus valores numéricos, de modo que los textos
+  del fichero nunca están en memoria a la vez. Para ficheros que no caben.
+- paralelo: las columnas se reparten entre varios procesos, que leen y
+  decodifican cada uno su grupo de columnas. Para cuestionarios Genérico anchos
+  en máquinas con varios núcleos.
+
+Los tres modos dan la misma `Validacion` (mismos valores, mismo índice, mismo
+diagnóstico). El plan elegido y su coste estimado quedan en `Validacion.plan` y
+en `Validacion.resumen()`; el script los muestra sin leer los ficheros.
+
+Uso
+---
+    python planificador.py ACME.csv
+"""
+import argparse
+import io
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from lectura_xlsx import FIRMA_ZIP
+from utils import DatosMapeados, leer_cabecera, leer_csv
+from validacion import (MAX_CUARENTENA, Validacion, comprobar_columnas, componer_validacion,
+                        diagnostico_columnas, evaluar_respuestas, validar_respuestas)
+
+MODOS = ("memoria", "bloques", "paralelo")
+
+# Muestra del principio del fichero con la que se estiman filas, memoria y tiempo
+MUESTRA_FILAS = 2000
+MUESTRA_BYTES = 4 << 20
+
+# Fracción de la memoria disponible que puede ocupar la lectura completa
+FRACCION_MEMORIA = 0.25
+
+# Memoria que se supone disponible si el sistema no la indica
+MEMORIA_POR_DEFECTO = 2 << 30
+
+# Copias del fichero en memoria durante la validación completa (DataFrame leído,
+# matriz de objetos que se factoriza y valores numéricos)
+FACTOR_VALIDACION = 2.5
+
+# Cota de la memoria que ocupa en pandas cada byte del CSV (textos cortos como
+# objetos de Python); por debajo de ella no hace falta muestrear el fichero
+MEMORIA_POR_BYTE = 40
+
+# Memoria objetivo de cada bloque de filas en el modo por bloques
+BYTES_BLOQUE = 64 << 20
+
+# Umbrales del modo paralelo: columnas y bytes mínimos y columnas por proceso
+MIN_COLUMNAS_PARALELO = 40
+MIN_BYTES_PARALELO = 64 << 20
+COLUMNAS_POR_PROCESO = 10
+MAX_PROCESOS = 8
+
+
+def memoria_disponible() -> int:
+    """Bytes de memoria disponibles (MemAvailable en Linux; si no, páginas libres)."""
+    try:
+        with open("/proc/meminfo", "r", encoding="ascii") as f:
+            for linea in f:
+                if linea.startswith("MemAvailable:"):
+                    return int(linea.split()[1]) * 1024
+    except OSError:
+        pass
+    try:
+        return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+    except (ValueError, OSError, AttributeError):
+        return MEMORIA_POR_DEFECTO
+
+
+def procesadores() -> int:
+    """Núcleos que puede usar este proceso."""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def _tamano(n_bytes) -> str:
+    for unidad in ("B", "KB", "MB", "GB"):
+        if n_bytes < 1024 or unidad == "GB":
+            return f"{n_bytes:.0f} {unidad}" if unidad == "B" else f"{n_bytes:.1f} {unidad}"
+        n_bytes /= 1024
+
+
+class Plan:
+    """
+    Modo de lectura elegido para un fichero de respuestas y su coste estimado.
+
+    - modo: 'memoria', 'bloques' o 'paralelo'.
+    - bytes, filas_estimadas, columnas: tamaño del fichero (None si no se ha inspeccionado).
+    - memoria_estimada: bytes que ocuparía la lectura y validación completa.
+    - memoria_disponible: bytes disponibles al planificar.
+    - segundos_estimados: tiempo estimado de lectura.
+    - bloque_filas: filas por bloque (modo 'bloques').
+    - procesos: procesos que decodifican columnas (modo 'paralelo').
+    - motivo: por qué se ha elegido el modo.
+    """
+
+    def __init__(self, modo, bytes=None, filas_estimadas=None, columnas=None, memoria_estimada=None,
+                 memoria_disponible=None, segundos_estimados=None, bloque_filas=None, procesos=1,
+                 motivo="", ruta=None, sep=None):
+        if modo not in MODOS:
+            raise ValueError(f"Modo de lectura desconocido: {modo}. Modos: {MODOS}")
+        self.modo = modo
+        self.bytes = bytes
+        self.filas_estimadas = filas_estimadas
+        self.columnas = columnas
+        self.memoria_estimada = memoria_estimada
+        self.memoria_disponible = memoria_disponible
+        self.segundos_estimados = segundos_estimados
+        self.bloque_filas = bloque_filas
+        self.procesos = procesos
+        self.motivo = motivo
+        self.ruta = ruta
+        self.sep = sep
+
+    def __str__(self):
+        modo = {"memoria": "en memoria",
+                "bloques": f"por bloques de {self.bloque_filas} filas",
+                "paralelo": f"en paralelo, columnas repartidas en {self.procesos} procesos"}[self.modo]
+        detalles = []
+        if self.bytes is not None:
+            filas = f", ~{self.filas_estimadas} filas" if self.filas_estimadas is not None else ""
+            detalles.append(f"{_tamano(self.bytes)}{filas}, {self.columnas} columnas")
+        if self.memoria_estimada is not None:
+            detalles.append(f"memoria estimada {_tamano(self.memoria_estimada)} de "
+                            f"{_tamano(self.memoria_disponible)} disponibles")
+        if self.segundos_estimados is not None:
+            detalles.append(f"lectura ~{self.segundos_estimados:.1f} s")
+        if self.motivo:
+            detalles.append(self.motivo)
+        return f"Plan de lectura: {modo}" + (f" ({'; '.join(detalles)})" if detalles else "")
+
+    def __repr__(self):
+        return f"Plan(modo={self.modo!r}, bytes={self.bytes!r}, filas_estimadas={self.filas_estimadas!r})"
+
+
+def ruta_csv(source):
+    """Ruta en disco de `source` si es un CSV de un único fichero; si no, None."""
+    if isinstance(source, (str, os.PathLike)):
+        ruta = os.fspath(source)
+    elif isinstance(source, DatosMapeados):
+        ruta = source.ruta
+    else:
+        return None
+    with open(ruta, "rb") as f:
+        return None if f.read(len(FIRMA_ZIP)) == FIRMA_ZIP else ruta
+
+
+def _muestra(ruta: str, sep: str):
+    """(bytes por fila, memoria por fila, segundos por fila) de las primeras MUESTRA_FILAS filas."""
+    with open(ruta, "rb") as f:
+        prefijo = f.read(MUESTRA_BYTES)
+    lineas = prefijo.split(b"\n", MUESTRA_FILAS + 1)
+    if len(lineas) > MUESTRA_FILAS + 1:
+        prefijo = b"\n".join(lineas[:MUESTRA_FILAS + 1]) + b"\n"
+    elif not prefijo.endswith(b"\n") and len(lineas) > 1 and len(prefijo) == MUESTRA_BYTES:
+        prefijo = prefijo[:prefijo.rfind(b"\n") + 1]  # última línea cortada
+
+    inicio = time.perf_counter()
+    muestra = pd.read_csv(io.BytesIO(prefijo), sep=sep)
+    segundos = time.perf_counter() - inicio
+    filas = max(len(muestra), 1)
+    cabecera = len(lineas[0]) + 1
+    return ((len(prefijo) - cabecera) / filas, muestra.memory_usage(deep=True).sum() / filas,
+            segundos / filas)
+
+
+def planificar(source, sep=None, modo: str = None) -> Plan:
+    """
+    Elige el modo de lectura de `source` (ruta, volcado o cualquier fuente que
+    acepte `leer_csv`). Con `modo` se fuerza uno concreto, pero se estiman igual
+    su tamaño y su coste.
+
+    Si el tamaño en bytes basta para saber que cabe en memoria (y no es candidato
+    al modo paralelo), no se lee la muestra: el coste es una cota y las filas
+    quedan sin estimar.
+    """
+    ruta = ruta_csv(source)
+    if ruta is None:
+        if modo not in (None, "memoria"):
+            raise ValueError(f"El modo '{modo}' solo admite un CSV en disco")
+        return Plan("memoria", motivo="no es un único CSV en disco")
+
+    datos = source if isinstance(source, DatosMapeados) else DatosMapeados(ruta)
+    try:
+        sep = sep or datos.separador()
+        n_bytes = len(datos)
+        columnas = len(datos.cabecera(sep))
+    finally:
+        if datos is not source:
+            datos.close()
+    disponible = memoria_disponible()
+    nucleos = procesadores()
+    cota = int(n_bytes * MEMORIA_POR_BYTE * FACTOR_VALIDACION)
+    paralelo = columnas >= MIN_COLUMNAS_PARALELO and n_bytes >= MIN_BYTES_PARALELO and nucleos > 1
+    if modo in (None, "memoria") and cota <= FRACCION_MEMORIA * disponible and not paralelo:
+        return Plan("memoria", n_bytes, None, columnas, cota, disponible,
+                    motivo="cabe en memoria por su tamaño" if modo is None else "modo indicado",
+                    ruta=ruta, sep=sep)
+
+    bytes_fila, memoria_fila, segundos_fila = _muestra(ruta, sep)
+    filas = int(n_bytes / bytes_fila) if bytes_fila > 0 else 0
+    memoria = int(memoria_fila * filas * FACTOR_VALIDACION)
+
+    if modo is None:
+        if memoria > FRACCION_MEMORIA * disponible:
+            modo, motivo = "bloques", "no cabe holgadamente en memoria"
+        elif paralelo:
+            modo, motivo = "paralelo", "fichero grande y ancho"
+        else:
+            modo, motivo = "memoria", ""
+    else:
+        motivo = "modo indicado"
+
+    return Plan(modo, n_bytes, filas, columnas, memoria, disponible, segundos_fila * filas,
+                bloque_filas=max(1000, int(BYTES_BLOQUE / max(memoria_fila, 1))),
+                procesos=max(2, min(nucleos, MAX_PROCESOS, -(-columnas // COLUMNAS_POR_PROCESO))),
+                motivo=motivo, ruta=ruta, sep=sep)
+
+
+def _evaluar_columnas(ruta, sep, posiciones, decodificar, minimo, maximo):
+    """Lee y evalúa solo las columnas `posiciones` del CSV (se ejecuta en otro proceso)."""
+    parte = pd.read_csv(ruta, sep=sep, usecols=posiciones)
+    return evaluar_respuestas(parte, list(parte.columns), decodificar, minimo, maximo)
+
+
+def _leer_bloques(plan, posiciones, columnas, decodificar, minimo, maximo):
+    valores, indices, malas, cuarentena = [], [], [], []
+    vacias = np.zeros(len(columnas), dtype=int)
+    invalidas = np.zeros(len(columnas), dtype=int)
+    ejemplos = [{} for _ in columnas]
+    for bloque in pd.read_csv(plan.ruta, sep=plan.sep, usecols=posiciones, chunksize=plan.bloque_filas):
+        bloque = bloque[columnas]
+        evaluacion = evaluar_respuestas(bloque, columnas, decodificar, minimo, maximo)
+        valores.append(evaluacion.valores[~evaluacion.malas])
+        indices.append(bloque.index[~evaluacion.malas])
+        malas.append(evaluacion.malas)
+        if evaluacion.malas.any():
+            cuarentena.append(bloque[evaluacion.malas])
+        vacias += evaluacion.vacias
+        invalidas += evaluacion.invalidas
+        for total, cuenta in zip(ejemplos, evaluacion.ejemplos):
+            for valor, veces in cuenta.items():
+                total[valor] = total.get(valor, 0) + veces
+
+    valores = np.vstack(valores) if valores else np.empty((0, len(columnas)))
+    indice = indices[0].append(indices[1:]) if indices else pd.RangeIndex(0)
+    cuarentena = pd.concat(cuarentena) if cuarentena else pd.DataFrame(columns=columnas)
+    return (valores, indice, np.concatenate(malas) if malas else np.zeros(0, dtype=bool), cuarentena,
+            diagnostico_columnas(columnas, vacias, invalidas, ejemplos))
+
+
+def _leer_paralelo(plan, posiciones, columnas, decodificar, minimo, maximo):
+    # Cada proceso recibe columnas consecutivas; los resultados llegan en el orden del fichero
+    grupos = [list(grupo) for grupo in np.array_split(sorted(posiciones), min(plan.procesos, len(posiciones)))]
+    with ProcessPoolExecutor(max_workers=len(grupos)) as ejecutor:
+        partes = list(ejecutor.map(_evaluar_columnas, [plan.ruta] * len(grupos), [plan.sep] * len(grupos), grupos,
+                                   [decodificar] * len(grupos), [minimo] * len(grupos), [maximo] * len(grupos)))
+    seleccion = np.argsort(np.argsort(posiciones))  # orden del fichero → orden de `columnas`
+    valores = np.hstack([parte.valores for parte in partes])[:, seleccion]
+    malas = np.logical_or.reduce([parte.malas for parte in partes])
+    vacias = np.concatenate([parte.vacias for parte in partes])[seleccion]
+    invalidas = np.concatenate([parte.invalidas for parte in partes])[seleccion]
+    ejemplos = [cuenta for parte in partes for cuenta in parte.ejemplos]
+
+    # Solo se vuelven a leer (con sus textos) las filas que quedan en cuarentena
+    if malas.any():
+        lineas_malas = set(np.flatnonzero(malas) + 1)
+        cuarentena = pd.read_csv(plan.ruta, sep=plan.sep, usecols=posiciones,
+                                 skiprows=lambda i: i > 0 and i not in lineas_malas)[columnas]
+        cuarentena.index = np.flatnonzero(malas)
+    else:
+        cuarentena = pd.DataFrame(columns=columnas)
+    return (valores[~malas], pd.RangeIndex(len(malas))[~malas], malas, cuarentena,
+            diagnostico_columnas(columnas, vacias, invalidas, [ejemplos[i] for i in seleccion]))
+
+
+def leer_respuestas(source, decodificar, minimo: int, maximo: int, sep=None, columnas=None,
+                    n_columnas: int = None, max_cuarentena: float = MAX_CUARENTENA,
+                    plan: Plan = None, excluir=()) -> Validacion:
+    """
+    Lee y valida las respuestas de `source` con el modo de `plan` (por defecto,
+    el que elija `planificar`). Mismos parámetros y resultado que
+    `validacion.validar_respuestas`, más la fuente, su separador y `excluir`:
+    columnas que no son respuestas (p. ej. las de la ponderación) y no se validan.
+
+    En los modos 'bloques' y 'paralelo' solo se leen las columnas validadas,
+    `Validacion.respuestas` es None y la cuarentena contiene solo esas columnas.
+    """
+    plan = plan or planificar(source, sep)
+    if plan.modo == "memoria":
+        respuestas = leer_csv(source, sep)
+        if excluir:
+            columnas = [c for c in (respuestas.columns if columnas is None else columnas) if c not in excluir]
+        return validar_respuestas(respuestas, decodificar, minimo, maximo, columnas,
+                                  n_columnas, max_cuarentena, plan=plan)
+
+    cabecera = leer_cabecera(plan.ruta, plan.sep)
+    comprobar_columnas(len(cabecera), n_columnas)
+    columnas = [c for c in (cabecera if columnas is None else columnas) if c not in excluir]
+    posiciones = [cabecera.index(columna) for columna in columnas]
+    leer = _leer_bloques if plan.modo == "bloques" else _leer_paralelo
+    valores, indice, malas, cuarentena, diagnostico = leer(plan, posiciones, columnas, decodificar, minimo, maximo)
+    return componer_validacion(valores, indice, columnas, malas, cuarentena, diagnostico,
+                               max_cuarentena=max_cuarentena, plan=plan)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Muestra el plan de lectura de ficheros de respuestas.")
+    parser.add_argument("ficheros", nargs="+")
+    parser.add_argument("--sep", default=None, help="Separador del CSV (por defecto, se detecta)")
+    args = parser.parse_args()
+    for fichero in args.ficheros:
+        print(f"{fichero}: {planificar(fichero, args.sep)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+"""
+Ponderación de las respuestas de una encuesta.
+
+Cuando unas sedes o departamentos contestan en mucha mayor proporción que otros,
+los conteos y las medias sin ponderar describen a quien ha contestado y no a la
+plantilla. Cada encuestado recibe entonces un peso, indicado en el parámetro
+`ponderacion` de los generadores:
+
+- {"columna": "Peso"}: los pesos están en una columna del CSV de respuestas (con
+  "segmento" además, esa columna tampoco se valida como respuesta).
+- {"segmento": "Sede", "poblacion": {...} o ruta}: postestratificación. El peso
+  de cada encuestado es la proporción de su segmento en la plantilla entre la
+  proporción en la muestra; la plantilla es un dict {segmento: personas} o un
+  CSV/JSON con esos datos (ver `cargar_poblacion`).
+
+Las columnas de la ponderación no se validan como respuestas. Los pesos se
+normalizan a media 1, así que los conteos ponderados siguen sumando el número de
+respuestas. Se aplican sin bucles por encuestado: los conteos con un np.bincount
+ponderado (`estadisticas.conteos_ponderados`) y los estadísticos con
+`estadisticas.describir(pesos=...)`, el bootstrap y `describir_segmentos`.
+
+Uso
+---
+    python ponderacion.py burnout ACME.csv --columna Peso
+    python ponderacion.py satisfaccion ACME.csv --segmento Sede --poblacion plantilla.csv
+"""
+import argparse
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from estadisticas import describir, describir_segmentos
+
+
+def columnas_ponderacion(ponderacion) -> list:
+    """Columnas del CSV que usa la ponderación (y que no son respuestas)."""
+    if not ponderacion:
+        return []
+    return [ponderacion[clave] for clave in ("columna", "segmento") if ponderacion.get(clave)]
+
+
+def clave_ponderacion(ponderacion) -> str:
+    """Texto que identifica una ponderación (clave de proveedores y cachés)."""
+    return json.dumps(ponderacion, sort_keys=True, ensure_ascii=False, default=str)
+
+
+def cargar_poblacion(source) -> dict:
+    """
+    {segmento: personas} de la plantilla: un dict, un JSON con ese dict o un CSV
+    (ruta o fichero subido) cuya primera columna es el segmento y la segunda el
+    número de personas.
+    """
+    if isinstance(source, dict):
+        return {str(segmento): float(personas) for segmento, personas in source.items()}
+    nombre = getattr(source, "name", source)
+    if isinstance(nombre, str) and nombre.lower().endswith(".json"):
+        if hasattr(source, "read"):
+            return cargar_poblacion(json.load(source))
+        with open(source, "r", encoding="utf-8") as f:
+            return cargar_poblacion(json.load(f))
+    tabla = pd.read_csv(source, sep=None, engine="python")
+    if tabla.shape[1] < 2:
+        raise ValueError("La tabla de plantilla debe tener dos columnas: segmento y número de personas")
+    return dict(zip(tabla.iloc[:, 0].astype(str), pd.to_numeric(tabla.iloc[:, 1], errors="raise").astype(float)))
+
+
+def normalizar_pesos(pesos) -> np.ndarray:
+    """Pesos a media 1. Lanza ValueError si alguno falta, no es finito o no es positivo."""
+    pesos = pd.to_numeric(pd.Series(np.asarray(pesos)), errors="coerce").to_numpy(dtype=float)
+    malos = ~np.isfinite(pesos) | (pesos <= 0)
+    if malos.any():
+        raise ValueError(f"{int(malos.sum())} pesos vacíos, no numéricos o no positivos en la columna de pesos")
+    return pesos / pesos.mean() if len(pesos) else pesos
+
+
+def pesos_postestratificacion(segmentos, poblacion: dict) -> np.ndarray:
+    """
+    Peso de cada encuestado: proporción de su segmento en la plantilla (`poblacion`,
+    {segmento: personas}) entre su proporción en la muestra, normalizado a media 1.
+    Los segmentos de la plantilla sin ninguna respuesta no se pueden representar y
+    la proporción se calcula sobre los demás.
+    """
+    codigos, niveles = pd.factorize(pd.Series(np.asarray(segmentos, dtype=object)).astype(str))
+    desconocidos = [nivel for nivel in niveles if nivel not in poblacion]
+    if desconocidos:
+        raise ValueError(f"Segmentos sin personas en la tabla de plantilla: {', '.join(desconocidos)}")
+    sin_respuestas = sorted(set(poblacion) - set(niveles))
+    if sin_respuestas:
+        print(f"Segmentos de la plantilla sin respuestas (no se ponderan): {', '.join(sin_respuestas)}")
+
+    personas = np.array([poblacion[nivel] for nivel in niveles], dtype=float)
+    if (personas <= 0).any():
+        raise ValueError("El número de personas de cada segmento debe ser positivo")
+    muestra = np.bincount(codigos, minlength=len(niveles))
+    return normalizar_pesos((personas / personas.sum() * len(codigos) / muestra)[codigos])
+
+
+def leer_auxiliares(validacion, columnas) -> pd.DataFrame:
+    """
+    Columnas `columnas` del CSV (textos originales) de las filas válidas de
+    `validacion`, en su mismo orden. Si el fichero se ha leído por bloques o por
+    columnas, se vuelven a leer solo esas columnas.
+    """
+    if validacion.respuestas is not None:
+        respuestas = validacion.respuestas
+    elif validacion.plan is not None and validacion.plan.ruta is not None:
+        respuestas = pd.read_csv(validacion.plan.ruta, sep=validacion.plan.sep,
+                                 usecols=lambda columna: columna in columnas)
+        respuestas = respuestas.iloc[validacion.valores.index]
+    else:
+        raise ValueError("No se pueden leer las columnas de la ponderación de esta fuente")
+    faltan = [columna for columna in columnas if columna not in respuestas.columns]
+    if faltan:
+        raise ValueError(f"El CSV no tiene las columnas de la ponderación: {', '.join(faltan)}")
+    return respuestas[columnas]
+
+
+def pesos_encuestados(validacion, ponderacion) -> np.ndarray:
+    """Peso (media 1) de cada fila de `validacion.valores`, o None si no hay ponderación."""
+    if not ponderacion:
+        return None
+    if ponderacion.get("columna"):
+        return normalizar_pesos(leer_auxiliares(validacion, [ponderacion["columna"]]).iloc[:, 0])
+    if ponderacion.get("segmento") and ponderacion.get("poblacion") is not None:
+        segmentos = leer_auxiliares(validacion, [ponderacion["segmento"]]).iloc[:, 0]
+        return pesos_postestratificacion(segmentos, cargar_poblacion(ponderacion["poblacion"]))
+    raise ValueError("La ponderación necesita 'columna' o 'segmento' y 'poblacion'")
+
+
+def tamano_efectivo(pesos) -> float:
+    """Tamaño muestral efectivo de Kish, (suma de pesos)² / suma de pesos²."""
+    pesos = np.asarray(pesos, dtype=float)
+    return float(pesos.sum() ** 2 / (pesos ** 2).sum()) if len(pesos) else 0.0
+
+
+def main():
+    from Generar_informe_Burnout import agrupar_dimensiones as agrupar_burnout, leer_respuestas_cbb
+    from Generar_informe_Generico import leer_respuestas_generico
+    from Generar_informe_Satisfaccion import agrupar_dimensiones as agrupar_satisfaccion, \
+        leer_respuestas_satisfaccion
+    from catalogo_preguntas import cargar_catalogo
+
+    parser = argparse.ArgumentParser(description="Muestra los pesos y las puntuaciones ponderadas por segmento.")
+    parser.add_argument("informe", choices=["burnout", "satisfaccion", "generico"])
+    parser.add_argument("respuestas", help="Fichero de respuestas")
+    parser.add_argument("--json", default=None, help="JSON de preguntas (informes genéricos)")
+    parser.add_argument("--columna", default=None, help="Columna del CSV con el peso de cada encuestado")
+    parser.add_argument("--segmento", default=None, help="Columna del CSV con el segmento (sede, departamento...)")
+    parser.add_argument("--poblacion", default=None, help="CSV o JSON con las personas de cada segmento")
+    args = parser.parse_args()
+
+    ponderacion = {"columna": args.columna} if args.columna else \
+        {"segmento": args.segmento, "poblacion": args.poblacion} if args.segmento and args.poblacion else None
+    excluir = [columna for columna in (args.columna, args.segmento) if columna]
+    if args.informe == "burnout":
+        with open(os.path.join("Burnout", "Dimensiones_CBB.json"), "r", encoding="utf-8") as f:
+            config = json.load(f)
+        validacion = leer_respuestas_cbb(args.respuestas, config, excluir=excluir)
+        puntuaciones = agrupar_burnout(validacion.valores, config)
+    elif args.informe == "satisfaccion":
+        validacion = leer_respuestas_satisfaccion(args.respuestas, excluir=excluir)
+        puntuaciones = agrupar_satisfaccion(validacion.valores)
+    else:
+        validacion = leer_respuestas_generico(args.respuestas, cargar_catalogo(args.json))
+        puntuaciones = validacion.valores
+
+    pesos = pesos_encuestados(validacion, ponderacion)
+    if pesos is not None:
+        print(f"{len(pesos)} respuestas; pesos entre {pesos.min():.2f} y {pesos.max():.2f}; "
+              f"tamaño efectivo {tamano_efectivo(pesos):.0f}")
+    if args.segmento:
+        segmentos = leer_auxiliares(validacion, [args.segmento]).iloc[:, 0].astype(str)
+        print(describir_segmentos(puntuaciones, segmentos, pesos).round(2).to_string())
+    else:
+        print(describir(puntuaciones, pesos)[["mean", "std", "count"]].round(2).to_string())
+
+
+if __name__ == "__main__":
+    main()
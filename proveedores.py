@@ -0,0 +1,147 @@
+import os
+import re
+from functools import lru_cache
+
+from docx import Document
+from docx.oxml.ns import qn
+
+
+@lru_cache(maxsize=32)
+def _marcadores_cacheados(ruta: str, mtime: float) -> frozenset:
+    doc = Document(ruta)
+    return frozenset(
+        elemento.get(qn('w:name'))
+        for elemento in doc.element.iter(qn('w:bookmarkStart'))
+    )
+
+
+def marcadores_plantilla(plantilla) -> frozenset:
+    """
+    Devuelve el conjunto de nombres de marcador que contiene una plantilla Word.
+
+    Acepta una ruta (el resultado se cachea mientras el fichero no cambie)
+    o un docx.Document ya abierto.
+    """
+    if isinstance(plantilla, (str, os.PathLike)):
+        return _marcadores_cacheados(str(plantilla), os.path.getmtime(plantilla))
+    return frozenset(
+        elemento.get(qn('w:name'))
+        for elemento in plantilla.element.iter(qn('w:bookmarkStart'))
+    )
+
+
+class RegistroProveedores:
+    """
+    Registro de proveedores de datos con nombre y memoizados, para calcular
+    únicamente lo que la plantilla necesita.
+
+    Cada proveedor es una función `funcion(registro)` que devuelve su resultado.
+    Los proveedores que generan marcadores declaran un patrón (expresión regular)
+    con los nombres de marcador que producen y devuelven un dict {marcador: valor};
+    los proveedores intermedios (respuestas convertidas, estadísticas...) no
+    declaran patrón y solo se calculan si otro proveedor los pide con `obtener`.
+
+    Ejemplo de uso
+    --------------
+    >>> registro = RegistroProveedores()
+    >>> registro.registrar('estadisticas', lambda r: calcularValores(datos))
+    >>> registro.registrar('calculos', lambda r: df_a_reemplazos(r.obtener('estadisticas')),
+    ...                    patron=r'(MEDIA|STD)_\\w+')
+    >>> reemplazos = registro.resolver(marcadores_plantilla('plantilla.docx'))
+
+    El registro anota qué proveedores pide cada uno al calcularse. Si se vuelve a
+    registrar un proveedor con otra `clave` (los parámetros de los que depende),
+    se descartan su resultado y los de todos los que lo usaron, y el resto se
+    conserva: un registro que se reutiliza entre ejecuciones solo recalcula lo
+    que depende de los parámetros que han cambiado.
+
+    Del mismo modo, anota las consultas `necesita` de cada proveedor: si
+    `resolver` recibe otros marcadores y alguna respuesta cambia, se descarta el
+    resultado de ese proveedor (y de quienes lo usaron).
+    """
+
+    def __init__(self):
+        self._proveedores = {}
+        self._patrones = {}
+        self._resultados = {}
+        self._claves = {}
+        self._dependientes = {}
+        self._consultas = {}
+        self._calculando = []
+        self.solicitados = frozenset()
+
+    def registrar(self, nombre: str, funcion, patron: str = None, clave=None):
+        """
+        Registra (o sustituye) el proveedor `nombre`. Si ya estaba registrado con la
+        misma `clave` (distinta de None), se conserva su resultado.
+        """
+        if patron is not None:
+            self._patrones[nombre] = re.compile(patron)
+        if clave is not None and nombre in self._proveedores and self._claves.get(nombre) == clave:
+            return
+        self._proveedores[nombre] = funcion
+        self._claves[nombre] = clave
+        self.invalidar(nombre)
+
+    def invalidar(self, nombre: str):
+        """Descarta el resultado de `nombre` y el de los proveedores que lo han usado."""
+        self._resultados.pop(nombre, None)
+        self._consultas.pop(nombre, None)
+        for dependiente in self._dependientes.pop(nombre, ()):
+            self.invalidar(dependiente)
+
+    def obtener(self, nombre: str):
+        """Devuelve el resultado del proveedor, calculándolo solo la primera vez."""
+        if self._calculando:
+            self._dependientes.setdefault(nombre, set()).add(self._calculando[-1])
+        if nombre not in self._resultados:
+            self._calculando.append(nombre)
+            try:
+                self._resultados[nombre] = self._proveedores[nombre](self)
+            finally:
+                self._calculando.pop()
+        return self._resultados[nombre]
+
+    def __contains__(self, nombre: str) -> bool:
+        """Indica si hay un proveedor registrado con ese nombre."""
+        return nombre in self._proveedores
+
+    def calculados(self) -> list[str]:
+        """Nombres de los proveedores que se han llegado a ejecutar."""
+        return list(self._resultados)
+
+    def necesita(self, patron: str) -> bool:
+        """Indica si alguno de los marcadores solicitados encaja con `patron`."""
+        respuesta = self._encaja(patron, self.solicitados)
+        if self._calculando:
+            self._consultas.setdefault(self._calculando[-1], {})[patron] = respuesta
+        return respuesta
+
+    @staticmethod
+    def _encaja(patron: str, marcadores) -> bool:
+        expresion = re.compile(patron)
+        return any(expresion.fullmatch(m) for m in marcadores)
+
+    def resolver(self, marcadores) -> dict:
+        """
+        Calcula únicamente los proveedores cuyos patrones encajan con algún
+        marcador de `marcadores` y devuelve {marcador: valor} solo para
+        los marcadores solicitados que se han podido resolver.
+        """
+        solicitados = frozenset(marcadores)
+        if solicitados != self.solicitados:
+            # Los proveedores que preguntaron por marcadores que ahora cambian
+            for nombre, consultas in list(self._consultas.items()):
+                if any(self._encaja(patron, solicitados) != respuesta for patron, respuesta in consultas.items()):
+                    self.invalidar(nombre)
+        self.solicitados = solicitados
+        reemplazos = {}
+        for nombre, patron in self._patrones.items():
+            propios = [m for m in self.solicitados if patron.fullmatch(m)]
+            if not propios:
+                continue
+            valores = self.obtener(nombre)
+            for marcador in propios:
+                if marcador in valores:
+                    reemplazos[marcador] = valores[marcador]
+        return reemplazos
@@ -0,0 +1,245 @@
+"""
+Reconstrucción incremental de informes: regenera solo los informes cuyas
+entradas han cambiado desde la última vez, al estilo de `make`.
+
+Para cada informe generado se guarda en un manifiesto el hash de todo aquello
+de lo que depende: el CSV, la plantilla, la configuración (Dimensiones_CBB.json,
+informacion_prl.json, JSON de preguntas...), el catálogo de medidas, el código
+del generador y los parámetros. Al reconstruir se recalculan esos hashes y solo
+se regeneran, en paralelo, los informes que no existen o cuyas huellas difieren.
+
+Uso
+---
+    python reconstruccion.py informes.json [--procesos N] [--forzar] [--simular] [--resultados]
+
+Lista de informes (JSON)
+------------------------
+{
+    "manifiesto": ".manifiesto_informes.json",
+    "trabajos": [
+        {"informe": "burnout", "csv": "./Burnout/Respuestas/ACME.csv", "empresa": "ACME",
+         "invitados": 50, "parametros": {"limite": 10},
+         "salida": "./Burnout/Informes generados/Informe_Burnout_ACME.docx"},
+        ...
+    ]
+}
+Con `"resultados": true` en un trabajo (o --resultados para todos) se escriben
+además, junto al .docx, sus resultados en JSON y Parquet (ver resultados.py).
+'csv' puede ser también una lista, carpeta o comodín con varias oleadas (ver oleadas.py).
+Si un trabajo no indica 'salida', se usa `trabajos.ruta_salida` en la carpeta del CSV.
+"""
+import argparse
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from cache_informes import CacheInformes
+from oleadas import ficheros_respuestas
+from resultados import EXTENSIONES_RESULTADOS
+from trabajos import ejecutar_trabajo, ficheros_configuracion, guardar_atomico, ruta_salida, tipo_informe
+
+
+def leer_lista(ruta: str) -> dict:
+    with open(ruta, "r", encoding="utf-8") as f:
+        lista = json.load(f)
+
+    trabajos = []
+    for trabajo in lista.get("trabajos", []):
+        tipo_informe(trabajo["informe"])
+        trabajo = dict(trabajo)
+        ficheros = ficheros_respuestas(trabajo["csv"])
+        carpeta = trabajo["csv"] if isinstance(trabajo["csv"], str) and os.path.isdir(trabajo["csv"]) \
+            else os.path.dirname(ficheros[0] if ficheros else "")
+        trabajo.setdefault("salida", ruta_salida(trabajo, carpeta))
+        trabajos.append(trabajo)
+
+    base = os.path.dirname(os.path.abspath(ruta))
+    return {
+        "manifiesto": os.path.join(base, lista.get("manifiesto", ".manifiesto_informes.json")),
+        "trabajos": trabajos,
+    }
+
+
+class Manifiesto:
+    """
+    Manifiesto de reconstrucción guardado en JSON:
+
+    {
+        "informes": {salida: {dependencia: hash}},
+        "ficheros": {ruta: [tamaño, mtime_ns, hash]}
+    }
+
+    'ficheros' evita volver a leer un fichero cuyo tamaño y fecha no han cambiado
+    desde que se calculó su hash (p. ej. CSV grandes o plantillas compartidas).
+    """
+
+    def __init__(self, ruta: str):
+        self.ruta = ruta
+        datos = {}
+        if os.path.exists(ruta):
+            with open(ruta, "r", encoding="utf-8") as f:
+                datos = json.load(f)
+        self.informes = datos.get("informes", {})
+        self.ficheros = datos.get("ficheros", {})
+
+    def hash_fichero(self, ruta: str) -> str:
+        info = os.stat(ruta)
+        guardado = self.ficheros.get(ruta)
+        if guardado and guardado[0] == info.st_size and guardado[1] == info.st_mtime_ns:
+            return guardado[2]
+
+        h = hashlib.sha256()
+        with open(ruta, "rb") as f:
+            for trozo in iter(lambda: f.read(1 << 20), b""):
+                h.update(trozo)
+        self.ficheros[ruta] = [info.st_size, info.st_mtime_ns, h.hexdigest()]
+        return h.hexdigest()
+
+    def guardar(self):
+        datos = {"informes": self.informes, "ficheros": self.ficheros}
+        guardar_atomico(self.ruta, json.dumps(datos, ensure_ascii=False, indent=2).encode("utf-8"))
+
+
+def ficheros_dependencia(trabajo: dict) -> list[str]:
+    """
+    Ficheros de los que depende un trabajo (CSV o todas sus oleadas, código,
+    plantilla, configuración y medidas).
+    """
+    ficheros = [*ficheros_respuestas(trabajo["csv"]), *ficheros_configuracion(trabajo["informe"])]
+    json_source = trabajo.get("parametros", {}).get("json_source")
+    if json_source:
+        ficheros.append(json_source)
+    return ficheros
+
+
+def huellas_trabajo(trabajo: dict, manifiesto: Manifiesto) -> dict:
+    """
+    {dependencia: hash} de un trabajo. Los ficheros que faltan se anotan como
+    'ausente' (el informe se reconstruirá cuando aparezcan).
+    """
+    huellas = {}
+    for ruta in ficheros_dependencia(trabajo):
+        huellas[ruta] = manifiesto.hash_fichero(ruta) if os.path.exists(ruta) else "ausente"
+
+    parametros = {k: v for k, v in trabajo.items() if k not in ("csv", "salida")}
+    huellas["parametros"] = hashlib.sha256(
+        json.dumps(parametros, sort_keys=True, ensure_ascii=False, default=str).encode("utf-8")
+    ).hexdigest()
+    return huellas
+
+
+def salidas_trabajo(trabajo: dict) -> list[str]:
+    """Ficheros que escribe un trabajo: el .docx y, si los pide, sus resultados (.json y .parquet)."""
+    salidas = [trabajo["salida"]]
+    if trabajo.get("resultados"):
+        base = os.path.splitext(trabajo["salida"])[0]
+        salidas += [base + extension for extension in EXTENSIONES_RESULTADOS]
+    return salidas
+
+
+def obsoletos(trabajos: list, manifiesto: Manifiesto, forzar: bool = False) -> list[tuple]:
+    """
+    Devuelve [(trabajo, huellas)] de los informes que hay que regenerar:
+    los que no existen en disco (o les faltan los resultados pedidos) y aquellos
+    cuyas huellas no coinciden con las registradas en el manifiesto.
+    """
+    pendientes = []
+    for trabajo in trabajos:
+        huellas = huellas_trabajo(trabajo, manifiesto)
+        if forzar or not all(os.path.exists(salida) for salida in salidas_trabajo(trabajo)) \
+                or manifiesto.informes.get(trabajo["salida"]) != huellas:
+            pendientes.append((trabajo, huellas))
+    return pendientes
+
+
+def _construir(trabajo: dict, usar_cache: bool = True) -> float:
+    inicio = time.perf_counter()
+    cache = CacheInformes() if usar_cache else None
+    if trabajo.get("resultados"):
+        datos, resultados = ejecutar_trabajo(trabajo, cache, resultados=True)
+        resultados.guardar(os.path.splitext(trabajo["salida"])[0])
+    else:
+        datos = ejecutar_trabajo(trabajo, cache)
+    guardar_atomico(trabajo["salida"], datos)
+    return time.perf_counter() - inicio
+
+
+def reconstruir(trabajos: list, ruta_manifiesto: str, procesos: int = None,
+                forzar: bool = False, simular: bool = False, usar_cache: bool = True) -> dict:
+    """
+    Regenera en paralelo (un proceso por núcleo, o `procesos`) los informes obsoletos
+    y actualiza el manifiesto con las huellas de los que se han generado bien.
+    Con `usar_cache` los informes idénticos se toman del almacén `cache_informes`.
+
+    Retorna
+    -------
+    dict
+        {'generados': [salida], 'omitidos': [salida], 'errores': {salida: mensaje}}
+    """
+    manifiesto = Manifiesto(ruta_manifiesto)
+    pendientes = obsoletos(trabajos, manifiesto, forzar)
+    salidas_pendientes = {trabajo["salida"] for trabajo, _ in pendientes}
+    resultado = {
+        "generados": [],
+        "omitidos": [t["salida"] for t in trabajos if t["salida"] not in salidas_pendientes],
+        "errores": {},
+    }
+
+    if simular or not pendientes:
+        resultado["generados"] = sorted(salidas_pendientes) if simular else []
+        manifiesto.guardar()
+        return resultado
+
+    with ProcessPoolExecutor(max_workers=procesos) as ejecutor:
+        futuros = {ejecutor.submit(_construir, trabajo, usar_cache): (trabajo, huellas) for trabajo, huellas in pendientes}
+        for futuro in as_completed(futuros):
+            trabajo, huellas = futuros[futuro]
+            try:
+                segundos = futuro.result()
+            except Exception as error:
+                resultado["errores"][trabajo["salida"]] = str(error)
+                print(f"Error al generar {trabajo['salida']}: {error}")
+                continue
+            manifiesto.informes[trabajo["salida"]] = huellas
+            resultado["generados"].append(trabajo["salida"])
+            print(f"Generado en {segundos:.1f} s: {trabajo['salida']}")
+
+    manifiesto.guardar()
+    return resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Regenera solo los informes cuyas entradas han cambiado.")
+    parser.add_argument("lista", help="JSON con la lista de informes")
+    parser.add_argument("--procesos", type=int, default=None, help="Número de procesos en paralelo")
+    parser.add_argument("--forzar", action="store_true", help="Regenerar todos los informes")
+    parser.add_argument("--simular", action="store_true", help="Mostrar qué se regeneraría sin hacerlo")
+    parser.add_argument("--sin-cache", action="store_true", help="No usar el almacén de informes ya generados")
+    parser.add_argument("--resultados", action="store_true",
+                        help="Escribir también los resultados de cada informe en JSON y Parquet")
+    parser.add_argument("--semilla", type=int, default=None,
+                        help="Semilla para los trabajos que no la indiquen en sus parámetros "
+                             "(por defecto se deriva de las entradas de cada informe)")
+    args = parser.parse_args()
+
+    lista = leer_lista(args.lista)
+    if args.resultados:
+        for trabajo in lista["trabajos"]:
+            trabajo.setdefault("resultados", True)
+    if args.semilla is not None:
+        for trabajo in lista["trabajos"]:
+            trabajo.setdefault("parametros", {}).setdefault("semilla", args.semilla)
+    resultado = reconstruir(lista["trabajos"], lista["manifiesto"], args.procesos, args.forzar, args.simular,
+                            usar_cache=not args.sin_cache)
+
+    verbo = "Se regenerarían" if args.simular else "Regenerados"
+    print(f"{verbo}: {len(resultado['generados'])} | Al día: {len(resultado['omitidos'])} "
+          f"| Errores: {len(resultado['errores'])}")
+    for salida in resultado["generados"] if args.simular else []:
+        print(f"  {salida}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+"""
+Resultados de un informe en formato legible por máquina, junto al .docx.
+
+Para que las herramientas de BI no tengan que volver a calcularlo todo a partir
+del CSV, cada generador puede devolver, además del documento, un `Resultados`
+montado con lo que ya tiene en memoria (estadísticos por dimensión, matriz de
+conteos, alertas o nivel de riesgo, medidas propuestas y participación), sin
+repetir ningún cálculo. Se exporta como:
+
+- JSON (`a_json`), con la estructura de `Resultados.datos`;
+- Arrow IPC (`a_arrow`) o Parquet (`a_parquet`): una única tabla en formato
+  largo con el esquema fijo ESQUEMA, el mismo para todos los tipos de informe y
+  todas las empresas, de modo que se pueden concatenar sin transformaciones.
+
+Esquema de la tabla (versión VERSION_ESQUEMA)
+---------------------------------------------
+informe   string   burnout | satisfaccion | generico
+empresa   string
+seccion   string   participacion | dimensiones | conteos | alertas | medidas
+elemento  string   dimensión, pregunta o número de medida ('' en participación)
+campo     string   estadístico (mean, std, p25...), valor de respuesta (conteos),
+                   'alerta', 'nivel', 'medida', 'invitados'...
+valor     double   valor numérico (nulo en los campos de texto)
+texto     string   nombre de la dimensión, etiqueta de la respuesta, nivel o
+                   medida (nulo si no tiene)
+
+Ejemplo de uso
+--------------
+>>> docx_bytes, resultados = generar_informe_burnout("ACME.csv", "ACME", 50, resultados=True)
+>>> resultados.guardar("Informe_Burnout_ACME")   # .json y .parquet
+"""
+import io
+import json
+import math
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from utils import guardar_atomico
+
+VERSION_ESQUEMA = 1
+
+ESQUEMA = pa.schema(
+    [
+        ("informe", pa.string()),
+        ("empresa", pa.string()),
+        ("seccion", pa.string()),
+        ("elemento", pa.string()),
+        ("campo", pa.string()),
+        ("valor", pa.float64()),
+        ("texto", pa.string()),
+    ],
+    metadata={"version_esquema": str(VERSION_ESQUEMA)},
+)
+
+# Extensiones de los ficheros que escribe `Resultados.guardar`
+EXTENSIONES_RESULTADOS = (".json", ".parquet")
+
+
+def _numero(valor):
+    """float nativo (o None si es NaN) para el JSON."""
+    if valor is None:
+        return None
+    valor = float(valor)
+    return None if math.isnan(valor) else valor
+
+
+def conteos_matriz(matriz, titulos=None, etiquetas=None) -> list[dict]:
+    """
+    Registros {pregunta, valor, etiqueta, respuestas} de la matriz pregunta x valor
+    de `graficos.conteos_a_matriz`.
+    """
+    titulos = titulos if titulos else [str(p) for p in matriz.index]
+    valores = [int(v) for v in matriz.columns]
+    return [
+        {"pregunta": str(titulo), "valor": valor, "etiqueta": etiquetas.get(valor) if etiquetas else None,
+         "respuestas": int(cuenta)}
+        for titulo, fila in zip(titulos, matriz.to_numpy().tolist())
+        for valor, cuenta in zip(valores, fila)
+    ]
+
+
+def montar_resultados(informe: str, empresa, invitados, porcentaje, n_respuestas: int, n_cuarentena: int,
+                      estadisticas, conteos: list, nombres=None, alertas=None, nivel=None, medidas=()) -> "Resultados":
+    """
+    Resultados a partir de los datos ya calculados por un generador.
+
+    `estadisticas` es el DataFrame dimensión x estadístico de `calcularValores` /
+    `describir`; `conteos`, los registros de `conteos_matriz`; `alertas`, las
+    dimensiones en alerta (Burnout) y `nivel`, el nivel de riesgo (Satisfacción).
+    """
+    dimensiones = []
+    for dimension, fila in estadisticas.iterrows():
+        registro = {"dimension": str(dimension), "nombre": (nombres or {}).get(dimension, str(dimension))}
+        registro.update({str(campo): _numero(valor) for campo, valor in fila.items()})
+        dimensiones.append(registro)
+    return Resultados({
+        "version_esquema": VERSION_ESQUEMA,
+        "informe": informe,
+        "empresa": str(empresa),
+        "participacion": {"invitados": int(invitados), "respuestas": int(n_respuestas),
+                          "cuarentena": int(n_cuarentena), "porcentaje": _numero(porcentaje)},
+        "dimensiones": dimensiones,
+        "conteos": conteos,
+        "alertas": None if alertas is None else [str(d) for d in alertas],
+        "nivel": nivel,
+        "medidas": [str(m) for m in medidas if m],
+    })
+
+
+class Resultados:
+    """
+    Resultados de un informe. `datos` es el dict que se exporta como JSON:
+
+    {
+        "version_esquema": 1, "informe": str, "empresa": str,
+        "participacion": {"invitados", "respuestas", "cuarentena", "porcentaje"},
+        "dimensiones": [{"dimension", "nombre", "mean", "std", "p25", "p75", ...}],
+        "conteos": [{"pregunta", "valor", "etiqueta", "respuestas"}],
+        "alertas": [dimensión] | None, "nivel": str | None, "medidas": [str]
+    }
+    """
+
+    def __init__(self, datos: dict):
+        self.datos = datos
+
+    @classmethod
+    def desde_json(cls, contenido) -> "Resultados":
+        return cls(json.loads(contenido))
+
+    def a_json(self) -> bytes:
+        return json.dumps(self.datos, ensure_ascii=False, indent=2).encode("utf-8")
+
+    def tabla(self) -> pa.Table:
+        """Tabla Arrow en formato largo con el esquema ESQUEMA."""
+        datos = self.datos
+        filas = []
+        for campo, valor in datos["participacion"].items():
+            filas.append(("participacion", "", campo, valor, None))
+        for dimension in datos["dimensiones"]:
+            filas.append(("dimensiones", dimension["dimension"], "nombre", None, dimension["nombre"]))
+            filas.extend(("dimensiones", dimension["dimension"], campo, valor, None)
+                         for campo, valor in dimension.items() if campo not in ("dimension", "nombre"))
+        filas.extend(("conteos", c["pregunta"], str(c["valor"]), c["respuestas"], c["etiqueta"])
+                     for c in datos["conteos"])
+        if datos["alertas"] is not None:
+            en_alerta = set(datos["alertas"])
+            filas.extend(("alertas", d["dimension"], "alerta", float(d["dimension"] in en_alerta), None)
+                         for d in datos["dimensiones"])
+        if datos["nivel"] is not None:
+            filas.append(("alertas", "", "nivel", None, datos["nivel"]))
+        filas.extend(("medidas", str(i), "medida", None, medida) for i, medida in enumerate(datos["medidas"], start=1))
+
+        seccion, elemento, campo, valor, texto = zip(*filas) if filas else ((),) * 5
+        return pa.table({
+            "informe": [datos["informe"]] * len(filas),
+            "empresa": [datos["empresa"]] * len(filas),
+            "seccion": seccion,
+            "elemento": elemento,
+            "campo": campo,
+            "valor": [None if v is None else float(v) for v in valor],
+            "texto": texto,
+        }, schema=ESQUEMA)
+
+    def a_arrow(self) -> bytes:
+        """Tabla en formato Arrow IPC (fichero)."""
+        tabla = self.tabla()
+        sumidero = pa.BufferOutputStream()
+        with pa.ipc.new_file(sumidero, tabla.schema) as escritor:
+            escritor.write_table(tabla)
+        return sumidero.getvalue().to_pybytes()
+
+    def a_parquet(self) -> bytes:
+        buffer = io.BytesIO()
+        pq.write_table(self.tabla(), buffer)
+        return buffer.getvalue()
+
+    def guardar(self, base: str) -> list[str]:
+        """Escribe `base`.json y `base`.parquet (de forma atómica) y devuelve sus rutas."""
+        rutas = []
+        for extension, contenido in zip(EXTENSIONES_RESULTADOS, (self.a_json(), self.a_parquet())):
+            guardar_atomico(base + extension, contenido)
+            rutas.append(base + extension)
+        return rutas
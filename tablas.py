@@ -0,0 +1,239 @@
+from copy import deepcopy
+
+from docx.oxml import OxmlElement
+from docx.oxml.ns import qn
+
+# Ancho total por defecto (twips) de las tablas creadas desde cero: 16 cm
+ANCHO_TABLA = 9072
+
+
+def tablas_marcadas(doc, prefijo='TABLA_') -> dict:
+    """
+    Devuelve {nombre_marcador: <w:tbl>} para cada marcador cuyo nombre empieza
+    por `prefijo` y que está dentro de una tabla de la plantilla.
+    """
+    tablas = {}
+    for bookmark in doc.element.body.iter(qn('w:bookmarkStart')):
+        nombre = bookmark.get(qn('w:name'), '')
+        if not nombre.startswith(prefijo):
+            continue
+        tabla = bookmark.getparent()
+        while tabla is not None and tabla.tag != qn('w:tbl'):
+            tabla = tabla.getparent()
+        if tabla is not None:
+            tablas[nombre] = tabla
+    return tablas
+
+
+def _limpiar_celda(tc):
+    """Deja la celda con un único párrafo y un único run vacío, conservando los formatos."""
+    parrafos = tc.findall(qn('w:p'))
+    if not parrafos:
+        parrafos = [OxmlElement('w:p')]
+        tc.append(parrafos[0])
+    parrafo = parrafos[0]
+    for sobrante in parrafos[1:]:
+        tc.remove(sobrante)
+
+    run_original = parrafo.find('.//' + qn('w:r'))
+    formato = run_original.find(qn('w:rPr')) if run_original is not None else None
+    for hijo in list(parrafo):
+        if hijo.tag != qn('w:pPr'):
+            parrafo.remove(hijo)
+
+    run = OxmlElement('w:r')
+    if formato is not None:
+        run.append(deepcopy(formato))
+    texto = OxmlElement('w:t')
+    texto.set(qn('xml:space'), 'preserve')
+    run.append(texto)
+    parrafo.append(run)
+
+
+def _ajustar_columnas(tabla, filas_prototipo, n_columnas, ancho_primera=2):
+    """
+    Adapta la rejilla de la tabla y las filas prototipo a `n_columnas`,
+    clonando la última celda o eliminando las sobrantes. La primera columna
+    (la del texto de la pregunta o dimensión) recibe `ancho_primera` partes del ancho.
+    """
+    rejilla = tabla.find(qn('w:tblGrid'))
+    columnas = rejilla.findall(qn('w:gridCol')) if rejilla is not None else []
+    ancho_total = sum(int(c.get(qn('w:w'), 0)) for c in columnas) or ANCHO_TABLA
+
+    partes = ancho_primera + n_columnas - 1 if n_columnas > 1 else 1
+    anchos = [ancho_total * ancho_primera // partes] + [ancho_total // partes] * (n_columnas - 1)
+    if n_columnas == 1:
+        anchos = [ancho_total]
+
+    if rejilla is None:
+        rejilla = OxmlElement('w:tblGrid')
+        tabla.find(qn('w:tblPr')).addnext(rejilla)
+    for columna in columnas:
+        rejilla.remove(columna)
+    for ancho in anchos:
+        columna = OxmlElement('w:gridCol')
+        columna.set(qn('w:w'), str(ancho))
+        rejilla.append(columna)
+
+    for fila in filas_prototipo:
+        celdas = fila.findall(qn('w:tc'))
+        while len(celdas) < n_columnas:
+            nueva = deepcopy(celdas[-1])
+            celdas[-1].addnext(nueva)
+            celdas.append(nueva)
+        for sobrante in celdas[n_columnas:]:
+            fila.remove(sobrante)
+        for celda, ancho in zip(celdas, anchos):
+            propiedades = celda.find(qn('w:tcPr'))
+            if propiedades is None:
+                propiedades = OxmlElement('w:tcPr')
+                celda.insert(0, propiedades)
+            ancho_celda = propiedades.find(qn('w:tcW'))
+            if ancho_celda is None:
+                ancho_celda = OxmlElement('w:tcW')
+                propiedades.insert(0, ancho_celda)
+            ancho_celda.set(qn('w:w'), str(ancho))
+            ancho_celda.set(qn('w:type'), 'dxa')
+            _limpiar_celda(celda)
+
+
+def formatear_celda(valor) -> str:
+    """Texto de un valor de tabla: los float con 2 decimales y los NaN o None vacíos."""
+    if valor is None:
+        return ""
+    if isinstance(valor, float):
+        return "" if valor != valor else f"{valor:.2f}"
+    return str(valor)
+
+
+def rellenar_tabla(tabla, cabecera, filas):
+    """
+    Escribe una matriz completa en una tabla Word en una sola operación.
+
+    La primera fila de la tabla actúa como prototipo de cabecera y la segunda
+    (o la primera, si solo hay una) como prototipo de fila de datos. Ambas se
+    adaptan al número de columnas de `cabecera`; después se clona el prototipo
+    de datos una vez por fila de `filas`, conservando estilos, bordes y formato
+    de texto de la plantilla.
+
+    Parámetros
+    ----------
+    tabla : lxml element <w:tbl>
+        Tabla de la plantilla (ver `tablas_marcadas`).
+    cabecera : list[str]
+        Títulos de las columnas.
+    filas : iterable[list]
+        Valores de cada fila; los float se muestran con 2 decimales.
+    """
+    filas_tabla = tabla.findall(qn('w:tr'))
+    prototipo_cabecera = filas_tabla[0]
+    prototipo_datos = deepcopy(filas_tabla[1] if len(filas_tabla) > 1 else filas_tabla[0])
+    for fila in filas_tabla[1:]:
+        tabla.remove(fila)
+
+    # Los marcadores de la plantilla no deben duplicarse al clonar filas
+    for fila in (prototipo_cabecera, prototipo_datos):
+        for etiqueta in ('w:bookmarkStart', 'w:bookmarkEnd'):
+            for bookmark in fila.findall('.//' + qn(etiqueta)):
+                bookmark.getparent().remove(bookmark)
+
+    _ajustar_columnas(tabla, [prototipo_cabecera, prototipo_datos], len(cabecera))
+
+    for texto, valor in zip(prototipo_cabecera.iter(qn('w:t')), cabecera):
+        texto.text = formatear_celda(valor)
+
+    ultima = prototipo_cabecera
+    for valores in filas:
+        nueva = deepcopy(prototipo_datos)
+        for texto, valor in zip(nueva.iter(qn('w:t')), valores):
+            texto.text = formatear_celda(valor)
+        ultima.addnext(nueva)
+        ultima = nueva
+
+
+def crear_tabla(doc, despues_de, cabecera, filas):
+    """
+    Crea una tabla con bordes simples justo después del elemento `despues_de`
+    (p. ej. el párrafo ancla de una plantilla sin tabla) y la rellena con
+    `rellenar_tabla`. Devuelve el elemento <w:tbl>.
+    """
+    tabla = doc.add_table(rows=2, cols=1)._tbl
+    propiedades = tabla.find(qn('w:tblPr'))
+    bordes = OxmlElement('w:tblBorders')
+    for lado in ('top', 'left', 'bottom', 'right', 'insideH', 'insideV'):
+        borde = OxmlElement(f'w:{lado}')
+        borde.set(qn('w:val'), 'single')
+        borde.set(qn('w:sz'), '4')
+        borde.set(qn('w:color'), 'A6A6A6')
+        bordes.append(borde)
+    propiedades.append(bordes)
+
+    # Cabecera en negrita
+    cabecera_celda = tabla.find(qn('w:tr')).find(qn('w:tc'))
+    parrafo = cabecera_celda.find(qn('w:p'))
+    run = OxmlElement('w:r')
+    formato = OxmlElement('w:rPr')
+    formato.append(OxmlElement('w:b'))
+    run.append(formato)
+    parrafo.append(run)
+
+    rejilla = tabla.find(qn('w:tblGrid'))
+    for columna in rejilla.findall(qn('w:gridCol')):
+        columna.set(qn('w:w'), str(ANCHO_TABLA))
+
+    despues_de.addnext(tabla)
+    rellenar_tabla(tabla, cabecera, filas)
+    return tabla
+
+
+def rellenar_tablas(doc, proveedores: dict) -> list[str]:
+    """
+    Rellena las tablas marcadas de la plantilla.
+
+    `proveedores` asocia cada nombre de marcador (p. ej. 'TABLA_RESPUESTAS') con
+    una función sin argumentos que devuelve (cabecera, filas). Solo se llaman las
+    funciones de las tablas presentes en la plantilla. Devuelve los nombres rellenados.
+    """
+    rellenadas = []
+    for nombre, tabla in tablas_marcadas(doc).items():
+        if nombre in proveedores:
+            cabecera, filas = proveedores[nombre]()
+            rellenar_tabla(tabla, cabecera, filas)
+            rellenadas.append(nombre)
+    return rellenadas
+
+
+def tabla_conteos(matriz, titulos=None, etiquetas=None, porcentajes=False):
+    """
+    Prepara (cabecera, filas) a partir de la matriz pregunta x valor de
+    `graficos.conteos_a_matriz`. Con `porcentajes=True` cada celda es el
+    porcentaje de respuestas de la fila.
+    """
+    valores = matriz.to_numpy(dtype=float)
+    if porcentajes:
+        totales = valores.sum(axis=1, keepdims=True)
+        totales[totales == 0] = 1
+        valores = valores / totales * 100
+    else:
+        valores = valores.astype(int)
+
+    cabecera = ["Pregunta"] + [str(etiquetas.get(v, v)) if etiquetas else str(v) for v in matriz.columns]
+    nombres = titulos if titulos else [str(p) for p in matriz.index]
+    filas = [[nombre, *fila] for nombre, fila in zip(nombres, valores.tolist())]
+    return cabecera, filas
+
+
+def tabla_estadisticas(estadisticas, nombres=None):
+    """
+    Prepara (cabecera, filas) con los descriptivos de cada dimensión a partir del
+    DataFrame de `estadisticas.describir` / `calcularValores`.
+    """
+    campos = [("Media", "mean"), ("Desv. típica", "std"), ("P25", "p25"), ("P75", "p75")]
+    if "ic_inf" in estadisticas.columns:
+        campos += [("IC 95 % inf.", "ic_inf"), ("IC 95 % sup.", "ic_sup")]
+    cabecera = ["Dimensión"] + [titulo for titulo, _ in campos]
+    filas = [
+        [nombres.get(dim, dim) if nombres else dim, *(float(fila[campo]) for _, campo in campos)]
+        for dim, fila in estadisticas.iterrows()
+    ]
+    return cabecera, filas
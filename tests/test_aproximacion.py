@@ -0,0 +1,79 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from aproximacion import estimar, muestras_reservorio
+
+FILAS = 100
+TAMANO = 20
+BLOQUE = 15
+
+
+@pytest.fixture
+def csv_filas(tmp_path):
+    ruta = tmp_path / "respuestas.csv"
+    pd.DataFrame({"fila": np.arange(FILAS), "doble": np.arange(FILAS) * 2}).to_csv(ruta, index=False)
+    return str(ruta)
+
+
+def reservorio_secuencial(semilla):
+    """Algoritmo R fila a fila, con los mismos sorteos que la versión vectorizada por bloques."""
+    rng = np.random.default_rng(semilla)
+    reservorio, vistas = [], 0
+    for inicio in range(0, FILAS, BLOQUE):
+        filas = list(range(inicio, min(inicio + BLOQUE, FILAS)))
+        faltan = TAMANO - len(reservorio)
+        if faltan > 0:
+            reservorio += filas[:faltan]
+            vistas += len(filas[:faltan])
+            filas = filas[faltan:]
+        if filas:
+            huecos = rng.integers(0, vistas + np.arange(1, len(filas) + 1))
+            for fila, hueco in zip(filas, huecos):
+                if hueco < TAMANO:
+                    reservorio[hueco] = fila
+            vistas += len(filas)
+    return reservorio
+
+
+def test_tamano_y_filas_leidas(csv_filas):
+    vistas_previas = 0
+    for muestra, vistas in muestras_reservorio(csv_filas, TAMANO, sep=",", bloque_filas=BLOQUE):
+        assert vistas == min(vistas_previas + BLOQUE, FILAS)
+        assert len(muestra) == min(TAMANO, vistas)
+        # Filas completas y distintas, todas entre las ya leídas
+        assert muestra["fila"].is_unique and muestra["fila"].max() < vistas
+        assert (muestra["doble"] == muestra["fila"] * 2).all()
+        vistas_previas = vistas
+    assert vistas == FILAS
+
+
+@pytest.mark.parametrize("semilla", [0, 1, 2, 3])
+def test_igual_que_algoritmo_r_secuencial(csv_filas, semilla):
+    *_, (muestra, _) = muestras_reservorio(csv_filas, TAMANO, sep=",", semilla=semilla, bloque_filas=BLOQUE)
+    assert list(muestra["fila"]) == reservorio_secuencial(semilla)
+
+
+def test_muestra_uniforme(csv_filas):
+    repeticiones = 300
+    veces = np.zeros(FILAS)
+    for semilla in range(repeticiones):
+        *_, (muestra, _) = muestras_reservorio(csv_filas, TAMANO, sep=",", semilla=semilla, bloque_filas=BLOQUE)
+        veces[muestra["fila"].to_numpy()] += 1
+    # Cada fila entra con probabilidad TAMANO / FILAS, lea en el bloque que lea
+    esperado = repeticiones * TAMANO / FILAS
+    desviacion = np.sqrt(repeticiones * TAMANO / FILAS * (1 - TAMANO / FILAS))
+    assert np.all(np.abs(veces - esperado) < 5 * desviacion)
+    assert abs(veces[:TAMANO].mean() - veces[-TAMANO:].mean()) < 2 * desviacion
+
+
+def test_estimacion_exacta_sin_margen():
+    puntuaciones = pd.DataFrame({"Satisfaccion_General": [50, 60, 70, 80],
+                                 "Satisfaccion_Intrinseca": [20, 25, 30, 35],
+                                 "Satisfaccion_Extrinseca": [30, 35, 40, 45]})
+    exacta = estimar("satisfaccion", puntuaciones)
+    assert exacta.exacta
+    assert (exacta.margenes == 0).all()
+    assert exacta.medias["Satisfaccion_General"] == 65.0
+    muestra = estimar("satisfaccion", puntuaciones, n_total=400)
+    assert not muestra.exacta and (muestra.margenes > 0).all()
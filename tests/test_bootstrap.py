@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import estadisticas
+from estadisticas import bootstrap_intervalos
+
+
+def bootstrap_bucle(matriz, n_remuestras, semilla, bloque):
+    """Bootstrap de referencia: una remuestra de filas cada vez, con los mismos sorteos."""
+    rng = np.random.default_rng(semilla)
+    n = len(matriz)
+    medias = []
+    for inicio in range(0, n_remuestras, bloque):
+        for indices in rng.integers(0, n, size=(min(bloque, n_remuestras - inicio), n)):
+            medias.append(np.nanmean(matriz[indices], axis=0))
+    return np.nanquantile(np.array(medias), [0.025, 0.975], axis=0)
+
+
+@pytest.fixture
+def respuestas():
+    rng = np.random.default_rng(1)
+    matriz = rng.integers(1, 6, size=(60, 4)).astype(float)
+    matriz[rng.random(matriz.shape) < 0.1] = np.nan
+    return matriz
+
+
+@pytest.mark.parametrize("max_celdas", [estadisticas.MAX_CELDAS_BOOTSTRAP, 600])
+def test_bincount_igual_que_bucle(respuestas, monkeypatch, max_celdas):
+    monkeypatch.setattr(estadisticas, "MAX_CELDAS_BOOTSTRAP", max_celdas)
+    bloque = max(1, min(500, max_celdas // len(respuestas)))
+    inferior, superior = bootstrap_intervalos(respuestas, n_remuestras=500, semilla=7)
+    esperado = bootstrap_bucle(respuestas, 500, 7, bloque)
+    np.testing.assert_allclose(inferior, esperado[0])
+    np.testing.assert_allclose(superior, esperado[1])
+
+
+def test_reproducible_con_semilla(respuestas):
+    a = bootstrap_intervalos(pd.DataFrame(respuestas), n_remuestras=200, semilla=3)
+    b = bootstrap_intervalos(pd.DataFrame(respuestas), n_remuestras=200, semilla=3)
+    np.testing.assert_array_equal(a, b)
+
+
+def test_intervalo_contiene_la_media(respuestas):
+    inferior, superior = bootstrap_intervalos(respuestas, n_remuestras=300, semilla=0)
+    medias = np.nanmean(respuestas, axis=0)
+    assert np.all(inferior <= medias) and np.all(medias <= superior)
+
+
+def test_pesos_unitarios_igual_que_sin_pesos(respuestas):
+    sin_pesos = bootstrap_intervalos(respuestas, n_remuestras=200, semilla=5)
+    con_pesos = bootstrap_intervalos(respuestas, n_remuestras=200, semilla=5, pesos=np.ones(len(respuestas)))
+    np.testing.assert_allclose(sin_pesos, con_pesos)
+
+
+def test_sin_filas():
+    inferior, superior = bootstrap_intervalos(pd.DataFrame(columns=["A", "B"], dtype=float), n_remuestras=100)
+    assert np.isnan(inferior).all() and np.isnan(superior).all()
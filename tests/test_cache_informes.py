@@ -0,0 +1,81 @@
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import trabajos
+from cache_informes import CacheInformes, clave_informe
+from Generar_informe_Satisfaccion import MAPA_RESPUESTAS_SATISFACCION
+
+
+@pytest.fixture
+def csv_satisfaccion(tmp_path):
+    rng = np.random.default_rng(35)
+    textos = np.array(list(MAPA_RESPUESTAS_SATISFACCION), dtype=object)[rng.integers(0, 7, size=(20, 15))]
+    ruta = tmp_path / "ACME.csv"
+    pd.DataFrame(textos, columns=[f"S{i} satisf" for i in range(1, 16)]).to_csv(ruta, index=False)
+    return str(ruta)
+
+
+@pytest.fixture
+def generaciones(monkeypatch):
+    llamadas = []
+    original = trabajos.INFORMES["satisfaccion"]["generador"]
+    monkeypatch.setitem(trabajos.INFORMES["satisfaccion"], "generador",
+                        lambda **argumentos: llamadas.append(argumentos) or original(**argumentos))
+    return llamadas
+
+
+def test_acierto_y_fallo(csv_satisfaccion, tmp_path, generaciones):
+    cache = CacheInformes(str(tmp_path / "cache"))
+    argumentos = dict(csv_source=csv_satisfaccion, empresa="ACME", invitados=30)
+    primero = cache.generar("satisfaccion", **argumentos)
+    assert cache.generar("satisfaccion", **argumentos) == primero
+    assert len(generaciones) == 1
+
+    # El CSV se identifica por su contenido, no por su ruta
+    copia = str(tmp_path / "copia.csv")
+    shutil.copy(csv_satisfaccion, copia)
+    assert cache.generar("satisfaccion", **dict(argumentos, csv_source=copia)) == primero
+    assert len(generaciones) == 1
+
+    # Otro parámetro u otro contenido: otra clave
+    cache.generar("satisfaccion", **dict(argumentos, num_medidas=5))
+    assert len(generaciones) == 2
+    with open(copia, "a", encoding="utf-8") as f:
+        f.write(",".join(["Satisfecho"] * 15) + "\n")
+    cache.generar("satisfaccion", **dict(argumentos, csv_source=copia))
+    assert len(generaciones) == 3
+
+
+def test_resultados_en_el_almacen(csv_satisfaccion, tmp_path, generaciones):
+    cache = CacheInformes(str(tmp_path / "cache"))
+    argumentos = dict(csv_source=csv_satisfaccion, empresa="ACME", invitados=30)
+    docx = cache.generar("satisfaccion", **argumentos)
+    # Estaba el .docx pero no sus resultados: se vuelve a generar una vez
+    datos, resultados = cache.generar_resultados("satisfaccion", **argumentos)
+    assert datos == docx and len(generaciones) == 2
+    datos, guardados = cache.generar_resultados("satisfaccion", **argumentos)
+    assert datos == docx and guardados.datos == resultados.datos and len(generaciones) == 2
+
+
+def test_clave_incluye_la_semilla(csv_satisfaccion):
+    argumentos = dict(csv_source=csv_satisfaccion, empresa="ACME", invitados=30)
+    assert clave_informe("satisfaccion", **argumentos) == clave_informe("satisfaccion", **argumentos)
+    assert clave_informe("satisfaccion", **argumentos) != clave_informe("satisfaccion", semilla=1, **argumentos)
+
+
+def test_recorte_lru(tmp_path):
+    cache = CacheInformes(str(tmp_path / "cache"), max_bytes=250)
+    for i, clave in enumerate(["aa1", "bb2", "cc3"]):
+        cache.guardar(clave, b"x" * 100)
+        ruta = cache._ruta(clave)
+        os.utime(ruta, (1000 + i, 1000 + i))
+    # Se ha recortado al guardar el tercero: fuera el usado hace más tiempo
+    assert cache.obtener("aa1") is None
+    assert cache.obtener("bb2") is not None  # acierto: pasa a ser el más reciente
+    cache.guardar("dd4", b"x" * 100)
+    assert cache.obtener("cc3") is None
+    assert cache.obtener("bb2") == cache.obtener("dd4") == b"x" * 100
@@ -0,0 +1,69 @@
+import io
+import json
+
+import pytest
+
+import catalogo_preguntas
+from catalogo_preguntas import cargar_catalogo, codificar_valor
+from Generar_informe_Generico import load_questions
+
+CATALOGO = {
+    "id": 1, "availableLocales": ["es", "ca"],
+    "questions": [
+        {"id": 10, "questionTexts": {"es": " 1. ¿Conoces el protocolo? ", "ca": "1. Coneixes el protocol?"},
+         "options": [{"id": 101, "value": "Sí", "optionTexts": {"es": "Sí", "ca": "Sí"}},
+                     {"id": 102, "value": "No", "optionTexts": {"es": "No", "ca": "No"}}]},
+        {"id": 20, "questionTexts": {"es": "2. Valora el ambiente", "ca": "2. Valora l'ambient"},
+         "options": [{"id": 201 + v, "value": str(v), "optionTexts": {"es": str(v), "ca": str(v)}}
+                     for v in range(11)]},
+    ],
+}
+
+
+@pytest.fixture
+def ruta_json(tmp_path):
+    ruta = tmp_path / "preguntas.json"
+    ruta.write_text(json.dumps(CATALOGO, ensure_ascii=False), encoding="utf-8")
+    return str(ruta)
+
+
+def test_compilado(ruta_json):
+    catalogo = cargar_catalogo(ruta_json)
+    assert catalogo.locales == ["es", "ca"] and len(catalogo) == 2
+    assert catalogo.columna(20) == 2
+    pregunta = catalogo.pregunta(10)
+    assert pregunta.textos["es"] == "1. ¿Conoces el protocolo?"
+    # Índice por id de opción y por valor original
+    assert pregunta.codigos[101] == pregunta.codigos["Sí"] == 10
+    assert pregunta.codigos[102] == 0
+    assert catalogo.pregunta(20).codigos[208] == 7
+    with pytest.raises(ValueError):
+        catalogo.validar_locale("en")
+
+
+def test_codificar_valor():
+    assert [codificar_valor(v) for v in ("Sí", " si ", "NO", "7", "a")] == [10, 10, 0, 7, None]
+
+
+def test_cache_por_contenido(ruta_json, tmp_path, monkeypatch):
+    compilaciones = []
+    original = catalogo_preguntas.compilar_catalogo
+    monkeypatch.setattr(catalogo_preguntas, "compilar_catalogo", lambda *a: compilaciones.append(1) or original(*a))
+    monkeypatch.setattr(catalogo_preguntas, "_catalogos", type(catalogo_preguntas._catalogos)())
+
+    catalogo = cargar_catalogo(ruta_json)
+    copia = tmp_path / "copia.json"
+    copia.write_bytes(open(ruta_json, "rb").read())
+    # Mismo contenido por otra ruta o como subida: mismo catálogo, sin volver a compilar
+    assert cargar_catalogo(str(copia)) is catalogo
+    assert cargar_catalogo(io.BytesIO(copia.read_bytes())) is catalogo
+    assert len(compilaciones) == 1
+    otro = dict(CATALOGO, availableLocales=["es"])
+    assert cargar_catalogo(otro) is not catalogo and len(compilaciones) == 2
+
+
+def test_load_questions():
+    preguntas = load_questions(CATALOGO, "ca")
+    assert preguntas[0] == {"text": "1. Coneixes el protocol?",
+                            "options": [{"text": "Sí", "value": "Sí"}, {"text": "No", "value": "No"}]}
+    assert len(preguntas[1]["options"]) == 11
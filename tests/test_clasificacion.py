@@ -0,0 +1,61 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from clasificacion import cargar_reglas_alerta, clasificador_rangos
+
+DIMENSIONES_CBB = ["CARACTERISTICAS_TAREA", "ORGANIZACION", "TEDIO", "CANSANCIO_EMOCIONAL", "DESPERSONALIZACION",
+                   "REALIZACION_PERSONAL", "FISICAS", "SOCIALES", "PSICOLOGICAS"]
+
+
+@pytest.fixture
+def rangos():
+    with open("Satisfacción laboral/medidas.json", "r", encoding="utf-8") as f:
+        return json.load(f)["rangos"]
+
+
+def nivel_bucle(media, rangos):
+    """Clasificación anterior de escogerMedidas (Satisfacción): una comparación por nivel."""
+    for nivel in ("rojo", "naranja", "amarillo", "verde"):
+        if rangos[nivel][0] <= media <= rangos[nivel][1]:
+            return nivel
+    return None
+
+
+def alertas_bucle(medias: pd.Series, limite):
+    """Selección anterior de escogerMedidas (Burnout): media escalada > límite o, si hay menos de 2, las 2 mayores."""
+    corregidas = medias.copy()
+    corregidas[["FISICAS", "SOCIALES", "PSICOLOGICAS"]] *= 3
+    dims = list(corregidas[corregidas > limite].index)
+    if len(dims) < 2:
+        dims = corregidas.nlargest(2).index.tolist()
+    return dims
+
+
+def test_niveles_igual_que_bucle(rangos):
+    medias = np.concatenate([np.arange(0, 111, 0.5), [54.5, 69.99, 84.01, np.nan]])
+    clasificador = clasificador_rangos(rangos)
+    assert [clasificador.clasificar(m) for m in medias] == [nivel_bucle(m, rangos) for m in medias]
+    # Vectorizado: la misma clasificación para todo el array de una vez
+    assert list(clasificador.clasificar(medias)) == [nivel_bucle(m, rangos) for m in medias]
+
+
+@pytest.mark.parametrize("limite", [4, 7, 10, 13])
+def test_alertas_igual_que_bucle(limite):
+    reglas = cargar_reglas_alerta("Burnout/alertas.json", limite)
+    rng = np.random.default_rng(limite)
+    for _ in range(200):
+        medias = pd.Series(rng.uniform(3, 15, len(DIMENSIONES_CBB)).round(2), index=DIMENSIONES_CBB)
+        medias[["FISICAS", "SOCIALES", "PSICOLOGICAS"]] /= 3
+        assert reglas.dimensiones(medias) == alertas_bucle(medias, limite)
+
+
+def test_alertas_por_empresa_igual_que_por_fila():
+    reglas = cargar_reglas_alerta("Burnout/alertas.json", 10)
+    rng = np.random.default_rng(0)
+    medias = pd.DataFrame(rng.uniform(3, 15, (50, len(DIMENSIONES_CBB))), columns=DIMENSIONES_CBB)
+    matriz = reglas.alertas(medias)
+    for i, fila in medias.iterrows():
+        assert sorted(matriz.columns[matriz.loc[i]]) == sorted(reglas.dimensiones(fila))
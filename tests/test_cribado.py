@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import cribado
+from cribado import cargar_clasificacion, clasificar, cribar
+from Generar_informe_Satisfaccion import MAPA_RESPUESTAS_SATISFACCION
+
+DIMENSIONES_CBB = ["CARACTERISTICAS_TAREA", "ORGANIZACION", "TEDIO", "CANSANCIO_EMOCIONAL", "DESPERSONALIZACION",
+                   "REALIZACION_PERSONAL", "FISICAS", "SOCIALES", "PSICOLOGICAS"]
+
+
+@pytest.fixture
+def empresas(tmp_path):
+    rng = np.random.default_rng(38)
+    textos = np.array(list(MAPA_RESPUESTAS_SATISFACCION), dtype=object)
+    rutas = []
+    for i in range(5):
+        # Cada empresa con respuestas más altas que la anterior
+        codigos = np.clip(rng.integers(0, 4, size=(25, 15)) + i, 0, 6)
+        ruta = tmp_path / f"empresa{i}.csv"
+        pd.DataFrame(textos[codigos], columns=[f"S{j} satisf" for j in range(1, 16)]).to_csv(ruta, index=False)
+        rutas.append(str(ruta))
+    return rutas
+
+
+def test_cribado_satisfaccion(empresas, tmp_path, monkeypatch):
+    cargas = []
+    original = cribado.cargar_clasificacion
+    monkeypatch.setattr(cribado, "cargar_clasificacion", lambda *a: cargas.append(a) or original(*a))
+    salida = str(tmp_path / "cribado.csv")
+    tabla = cribar("satisfaccion", empresas, salida, procesos=2)
+
+    assert len(cargas) == 1
+    assert list(tabla["empresa"]) == [f"empresa{i}" for i in range(5)]
+    # Misma clasificación que la de toda la tabla de una vez
+    pd.testing.assert_frame_equal(tabla, clasificar("satisfaccion", tabla.drop(columns="NIVEL")))
+    pd.testing.assert_frame_equal(pd.read_csv(salida), tabla.reset_index(drop=True), check_dtype=False)
+
+
+@pytest.mark.parametrize("limite", [None, 7])
+def test_clasificar_por_empresa_igual_que_en_lote(limite):
+    rng = np.random.default_rng(0)
+    tabla = pd.DataFrame(rng.uniform(1, 15, (20, len(DIMENSIONES_CBB))),
+                         columns=[f"MEDIA_{d}" for d in DIMENSIONES_CBB])
+    tabla.insert(0, "empresa", [f"e{i}" for i in range(20)])
+    reglas = cargar_clasificacion("burnout", limite)
+    por_empresa = pd.concat([clasificar("burnout", tabla.iloc[[i]], reglas=reglas) for i in range(20)])
+    pd.testing.assert_frame_equal(por_empresa, clasificar("burnout", tabla, limite))
@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from estadisticas import MAX_RANGO_HISTOGRAMA, describir
+
+CAMPOS = {"mean": "mean", "std": "std", "min": "min", "max": "max", "p25": "25%", "p75": "75%", "count": "count"}
+
+
+def comparar_con_describe(datos):
+    esperado = datos.astype(float).describe().T.rename(columns={v: k for k, v in CAMPOS.items()})
+    obtenido = describir(datos)
+    assert list(obtenido.index) == list(datos.columns)
+    pd.testing.assert_frame_equal(obtenido[list(CAMPOS)], esperado[list(CAMPOS)], check_names=False)
+
+
+@pytest.fixture
+def rng():
+    return np.random.default_rng(2024)
+
+
+def test_likert_por_histograma(rng):
+    datos = pd.DataFrame(rng.integers(1, 6, size=(97, 5)), columns=list("ABCDE"))
+    comparar_con_describe(datos)
+
+
+def test_likert_con_vacias(rng):
+    matriz = rng.integers(1, 8, size=(50, 3)).astype(float)
+    matriz[rng.random(matriz.shape) < 0.2] = np.nan
+    comparar_con_describe(pd.DataFrame(matriz, columns=["X", "Y", "Z"]))
+
+
+def test_enteros_con_mascara(rng):
+    matriz = rng.integers(0, 11, size=(40, 2))
+    datos = pd.DataFrame(matriz, columns=["P1", "P2"]).astype("Int8")
+    datos.iloc[[3, 7, 11], 0] = pd.NA
+    comparar_con_describe(datos)
+
+
+def test_decimales_sin_histograma(rng):
+    comparar_con_describe(pd.DataFrame(rng.normal(50, 10, size=(80, 3)), columns=["a", "b", "c"]))
+
+
+def test_rango_grande_sin_histograma(rng):
+    datos = pd.DataFrame(rng.integers(0, 10 * MAX_RANGO_HISTOGRAMA, size=(60, 2)), columns=["a", "b"])
+    comparar_con_describe(datos)
+
+
+@pytest.mark.parametrize("n", [1, 2, 3, 4, 5])
+def test_cuantiles_con_pocas_respuestas(n):
+    datos = pd.DataFrame({"A": [5, 1, 4, 2, 3][:n], "B": [2, 2, 9, 9, 9][:n]})
+    comparar_con_describe(datos)
+
+
+def test_columna_vacia():
+    datos = pd.DataFrame({"A": [1.0, 2.0, 3.0], "B": [np.nan] * 3})
+    obtenido = describir(datos)
+    assert obtenido.loc["B", "count"] == 0
+    assert obtenido.loc["B", ["mean", "std", "p25", "p75"]].isna().all()
+    assert obtenido.loc["A", "mean"] == 2.0
@@ -0,0 +1,47 @@
+import io
+import zipfile
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from Generar_informe_Satisfaccion import MAPA_RESPUESTAS_SATISFACCION, generar_informe_satisfaccion
+from utils import FECHA_ZIP, huella_respuestas, semilla_derivada
+
+
+@pytest.fixture
+def csv_satisfaccion(tmp_path):
+    rng = np.random.default_rng(36)
+    textos = np.array(list(MAPA_RESPUESTAS_SATISFACCION), dtype=object)[rng.integers(0, 7, size=(25, 15))]
+    ruta = tmp_path / "ACME.csv"
+    pd.DataFrame(textos, columns=[f"S{i} satisf" for i in range(1, 16)]).to_csv(ruta, index=False)
+    return str(ruta)
+
+
+def test_semilla_derivada():
+    respuestas = pd.DataFrame({"a": [1, 2, 3], "b": [4, 5, 6]})
+    semilla = semilla_derivada(respuestas, "ACME", 30)
+    assert semilla == semilla_derivada(respuestas.copy(), "ACME", 30)
+    assert semilla == semilla_derivada(huella_respuestas(respuestas), "ACME", 30)
+    assert semilla != semilla_derivada(respuestas, "ACME", 31)
+    assert semilla != semilla_derivada(respuestas.assign(b=[4, 5, 7]), "ACME", 30)
+
+
+def test_mismas_entradas_mismo_docx(csv_satisfaccion):
+    argumentos = dict(empresa="ACME", invitados=30, intervalos_confianza=True, n_remuestras=200, resultados=True)
+    docx, resultados = generar_informe_satisfaccion(csv_satisfaccion, **argumentos)
+    otro, otros = generar_informe_satisfaccion(csv_satisfaccion, **argumentos)
+    assert docx == otro and resultados.datos == otros.datos
+    with zipfile.ZipFile(io.BytesIO(docx)) as zf:
+        assert {info.date_time for info in zf.infolist()} == {FECHA_ZIP}
+
+
+def test_la_semilla_decide_las_medidas(csv_satisfaccion):
+    medidas = {
+        semilla: tuple(generar_informe_satisfaccion(csv_satisfaccion, "ACME", 30, semilla=semilla,
+                                                    resultados=True)[1].datos["medidas"])
+        for semilla in range(6)
+    }
+    assert medidas[3] == tuple(generar_informe_satisfaccion(csv_satisfaccion, "ACME", 30, semilla=3,
+                                                            resultados=True)[1].datos["medidas"])
+    assert len(set(medidas.values())) > 1
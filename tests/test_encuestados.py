@@ -0,0 +1,50 @@
+import io
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+import pytest
+
+from aproximacion import puntuaciones
+from encuestados import parquet_puntuaciones, puntuaciones_encuestados, tabla_puntuaciones
+from faltantes import enteros_enmascarados
+from Generar_informe_Satisfaccion import MAPA_RESPUESTAS_SATISFACCION
+
+
+@pytest.fixture
+def csv_satisfaccion(tmp_path):
+    rng = np.random.default_rng(48)
+    textos = np.array(list(MAPA_RESPUESTAS_SATISFACCION), dtype=object)[rng.integers(0, 7, size=(40, 15))]
+    ruta = tmp_path / "ACME.csv"
+    pd.DataFrame(textos, columns=[f"S{i} satisf" for i in range(1, 16)]).to_csv(ruta, index=False)
+    return str(ruta)
+
+
+def test_sin_copias_en_las_columnas_contiguas():
+    datos = pd.DataFrame({"A": np.arange(1000, dtype=np.int64), "B": np.linspace(0, 1, 1000)})
+    tabla = tabla_puntuaciones(datos, "satisfaccion")
+    assert tabla.column_names == ["encuestado", "A", "B"]
+    assert tabla.schema.metadata == {b"informe": b"satisfaccion"}
+    for columna in ("A", "B"):
+        buffer = tabla.column(columna).chunk(0).buffers()[1]
+        assert buffer.address == datos[columna].to_numpy().__array_interface__["data"][0]
+
+
+def test_vacias_como_nulos():
+    valores = np.array([[1.0, np.nan], [np.nan, 3.0], [2.0, 4.0]])
+    enmascaradas = enteros_enmascarados(valores, pd.RangeIndex(3), ["A", "B"])
+    decimales = pd.DataFrame(valores, columns=["A", "B"])
+    for datos in (enmascaradas, decimales):
+        tabla = tabla_puntuaciones(datos)
+        assert tabla.column("A").to_pylist() == [1, None, 2]
+        assert tabla.column("B").null_count == 1 and tabla.schema.metadata is None
+
+
+def test_parquet_igual_que_las_puntuaciones_del_informe(csv_satisfaccion):
+    esperado = puntuaciones("satisfaccion", csv_satisfaccion)
+    tabla = puntuaciones_encuestados("satisfaccion", csv_satisfaccion)
+    leida = pq.read_table(io.BytesIO(parquet_puntuaciones(tabla)))
+    assert leida.equals(tabla)
+    obtenido = leida.to_pandas().set_index("encuestado")
+    assert list(obtenido.index) == list(esperado.index)
+    pd.testing.assert_frame_equal(obtenido, esperado, check_names=False, check_dtype=False)
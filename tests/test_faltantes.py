@@ -0,0 +1,72 @@
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from faltantes import PoliticaFaltantes, enteros_enmascarados, puntuar_dimensiones
+
+DIMENSIONES = {"A": ["P1", "P2", "P3"], "B": ["P4", "P5"], "C": ["P6"]}
+
+
+@pytest.fixture
+def valores():
+    rng = np.random.default_rng(49)
+    matriz = rng.integers(1, 6, size=(200, 6)).astype(float)
+    matriz[rng.random(matriz.shape) < 0.15] = np.nan
+    return matriz
+
+
+@pytest.fixture
+def respuestas(valores):
+    return enteros_enmascarados(valores, pd.RangeIndex(len(valores)), [f"P{i}" for i in range(1, 7)])
+
+
+def referencia(respuestas, politica, minimo=None):
+    """Puntuación con operaciones de pandas, dimensión a dimensión."""
+    salida = {}
+    for dimension, columnas in DIMENSIONES.items():
+        items = respuestas[columnas].astype(float)
+        respondidas = items.notna().sum(axis=1)
+        if politica == "ceros":
+            salida[dimension] = items.fillna(0).sum(axis=1)
+        elif politica == "completas":
+            salida[dimension] = items.sum(axis=1).where(respondidas == len(columnas))
+        else:
+            necesarias = min(minimo, len(columnas)) if minimo else math.ceil(len(columnas) / 2)
+            salida[dimension] = (items.mean(axis=1) * len(columnas)).where(respondidas >= necesarias)
+    return pd.DataFrame(salida)
+
+
+def test_enteros_enmascarados(valores, respuestas):
+    assert all(str(tipo) == "Int8" for tipo in respuestas.dtypes)
+    np.testing.assert_array_equal(respuestas.isna().to_numpy(), np.isnan(valores))
+    np.testing.assert_array_equal(respuestas.to_numpy(dtype=float, na_value=np.nan), valores)
+
+
+def test_enteros_grandes_en_int16():
+    datos = enteros_enmascarados(np.array([[1.0, 300.0], [np.nan, 2.0]]), pd.RangeIndex(2), ["a", "b"])
+    assert all(str(tipo) == "Int16" for tipo in datos.dtypes)
+    assert datos.loc[0, "b"] == 300 and pd.isna(datos.loc[1, "a"])
+
+
+@pytest.mark.parametrize("politica,minimo", [("prorrateo", None), ("prorrateo", 1), ("completas", None),
+                                             ("ceros", None)])
+def test_igual_que_pandas(respuestas, politica, minimo):
+    politicas = {dim: {"politica": politica, "minimo": minimo} for dim in DIMENSIONES}
+    obtenido = puntuar_dimensiones(respuestas, DIMENSIONES, politicas)
+    pd.testing.assert_frame_equal(obtenido.astype(float), referencia(respuestas, politica, minimo))
+
+
+def test_sin_vacias_es_la_suma_entera():
+    rng = np.random.default_rng(0)
+    respuestas = pd.DataFrame(rng.integers(1, 6, size=(30, 6)), columns=[f"P{i}" for i in range(1, 7)])
+    obtenido = puntuar_dimensiones(respuestas, DIMENSIONES)
+    esperado = pd.DataFrame({dim: respuestas[cols].sum(axis=1) for dim, cols in DIMENSIONES.items()})
+    pd.testing.assert_frame_equal(obtenido, esperado)
+    assert all(np.issubdtype(tipo, np.integer) for tipo in obtenido.dtypes)
+
+
+def test_politica_desconocida():
+    with pytest.raises(ValueError):
+        PoliticaFaltantes("media")
@@ -0,0 +1,57 @@
+import io
+import json
+
+from docx import Document
+
+import Generar_informe_Generico
+from Generar_informe_Generico import calcular_generico, generar_informe_generico, generar_informes_generico
+
+
+def test_cuenta_las_respuestas_no(tmp_path):
+    catalogo = {
+        "id": 1, "titles": {"es": "Prueba"}, "descriptions": {"es": "Prueba"}, "availableLocales": ["es"],
+        "questions": [{"id": 1, "questionTexts": {"es": "1. ¿Conoces el protocolo?"}, "options": [
+            {"id": 1, "value": "Sí", "optionTexts": {"es": "Sí"}},
+            {"id": 2, "value": "No", "optionTexts": {"es": "No"}},
+        ]}],
+    }
+    ruta_json = tmp_path / "preguntas.json"
+    ruta_json.write_text(json.dumps(catalogo), encoding="utf-8")
+    ruta_csv = tmp_path / "respuestas.csv"
+    ruta_csv.write_text("1. ¿Conoces el protocolo?\nSí\nNo\nNo\nsi\nNo\n", encoding="utf-8")
+
+    calculo = calcular_generico(str(ruta_csv), str(ruta_json))
+    assert calculo["secciones"][0]["conteos"] == [2, 3]
+    assert calculo["secciones"][0]["stats"]["mean"] == 4.0
+
+
+def test_varios_idiomas_con_un_solo_calculo(tmp_path, monkeypatch):
+    catalogo = {
+        "id": 2, "availableLocales": ["es", "ca"],
+        "questions": [
+            {"id": 1, "questionTexts": {"es": "1. ¿Conoces el protocolo?", "ca": "1. Coneixes el protocol?"},
+             "options": [{"id": 1, "value": "Sí", "optionTexts": {"es": "Sí", "ca": "Sí"}},
+                         {"id": 2, "value": "No", "optionTexts": {"es": "No", "ca": "No"}}]},
+            {"id": 2, "questionTexts": {"es": "2. Valora el ambiente", "ca": "2. Valora l'ambient"},
+             "options": [{"id": 10 + v, "value": str(v), "optionTexts": {"es": str(v), "ca": str(v)}}
+                         for v in range(11)]},
+        ],
+    }
+    ruta_json = tmp_path / "preguntas.json"
+    ruta_json.write_text(json.dumps(catalogo), encoding="utf-8")
+    ruta_csv = tmp_path / "respuestas.csv"
+    ruta_csv.write_text("1. ¿Conoces el protocolo?;2. Valora el ambiente\nSí;7\nNo;4\nSí;9\n", encoding="utf-8")
+
+    lecturas = []
+    original = Generar_informe_Generico.leer_respuestas_generico
+    monkeypatch.setattr(Generar_informe_Generico, "leer_respuestas_generico",
+                        lambda *a, **k: lecturas.append(1) or original(*a, **k))
+    informes = generar_informes_generico(str(ruta_csv), str(ruta_json), "ACME", "Clima", 5)
+
+    assert list(informes) == ["es", "ca"] and len(lecturas) == 1
+    for locale, texto in (("es", "Valora el ambiente"), ("ca", "Valora l'ambient")):
+        parrafos = "\n".join(p.text for p in Document(io.BytesIO(informes[locale])).paragraphs)
+        assert texto in parrafos
+        # El mismo .docx que el informe de un solo idioma
+        assert informes[locale] == generar_informe_generico(str(ruta_csv), str(ruta_json), "ACME", "Clima", 5,
+                                                            locale=locale)
@@ -0,0 +1,94 @@
+import json
+
+import pytest
+
+from instrumentos import RegistroInstrumentos, clave_columna, comprobar_instrumento, huella_cabecera
+
+CATALOGO = {
+    "id": 1, "availableLocales": ["es", "ca"],
+    "questions": [
+        {"id": i,
+         "questionTexts": {"es": f"{i}. Valora el aspecto {i} del clima", "ca": f"{i}. Valora l'aspecte {i} del clima"},
+         "options": [{"id": 10 * i + v, "value": str(v), "optionTexts": {"es": str(v), "ca": str(v)}}
+                     for v in range(11)]}
+        for i in range(1, 6)
+    ],
+}
+
+COLUMNAS_SATISFACCION = [f"S{i} satisf" for i in range(1, 16)]
+
+
+@pytest.fixture
+def catalogos(tmp_path):
+    carpeta = tmp_path / "Generico"
+    carpeta.mkdir()
+    (carpeta / "clima.json").write_text(json.dumps(CATALOGO, ensure_ascii=False), encoding="utf-8")
+    return str(carpeta / "*.json")
+
+
+@pytest.fixture
+def registro(tmp_path, catalogos):
+    return RegistroInstrumentos(str(tmp_path / "indice.json"), catalogos)
+
+
+def escribir_csv(ruta, columnas, filas=3):
+    ruta.write_text(";".join(columnas) + "\n" + "\n".join(";".join("1" for _ in columnas) for _ in range(filas)) + "\n",
+                    encoding="utf-8")
+    return str(ruta)
+
+
+def test_huella_normalizada():
+    # Mayúsculas, espacios y encabezados recortados por la plataforma dan la misma huella
+    largo = "1. ¿En qué medida te sientes valorado por tu responsable directo?"
+    assert clave_columna(largo) == clave_columna(largo[:30].upper() + "  recortado")
+    assert huella_cabecera([" A  b", "C"]) == huella_cabecera(["a b", "c"])
+    assert huella_cabecera(["a", "b"]) != huella_cabecera(["b", "a"])
+
+
+def test_generico_por_huella_en_cada_idioma(registro):
+    for locale in ("es", "ca"):
+        columnas = [p["questionTexts"][locale] for p in CATALOGO["questions"]]
+        deteccion = registro.detectar(columnas)
+        assert (deteccion.informe, deteccion.metodo) == ("generico", "huella") and deteccion.fiable
+        assert deteccion.json_source.endswith("clima.json")
+
+
+def test_generico_por_preguntas_con_columnas_extra(registro):
+    preguntas = [p["questionTexts"]["es"] for p in CATALOGO["questions"]]
+    deteccion = registro.detectar(["Marca temporal"] + preguntas[:4] + ["Centro"])
+    assert (deteccion.informe, deteccion.metodo) == ("generico", "preguntas") and deteccion.fiable
+    # Menos de MIN_COINCIDENCIA de las preguntas: no se reconoce
+    assert registro.detectar(preguntas[:3] + ["Otra"]) is None
+
+
+def test_por_numero_de_columnas_solo_orientativo(registro):
+    deteccion = registro.detectar(COLUMNAS_SATISFACCION)
+    assert (deteccion.informe, deteccion.metodo) == ("satisfaccion", "columnas") and not deteccion.fiable
+    assert registro.detectar([f"P{i}" for i in range(7)]) is None
+
+
+def test_registrar_persiste_en_el_indice(tmp_path, registro, catalogos):
+    registro.registrar("satisfaccion", COLUMNAS_SATISFACCION)
+    guardado = json.loads((tmp_path / "indice.json").read_text(encoding="utf-8"))["cabeceras"]
+    # Solo se guardan las cabeceras aprendidas, no las de los JSON de Genérico
+    assert guardado == {huella_cabecera(COLUMNAS_SATISFACCION): {"informe": "satisfaccion"}}
+    deteccion = RegistroInstrumentos(str(tmp_path / "indice.json"), catalogos).detectar(COLUMNAS_SATISFACCION)
+    assert (deteccion.informe, deteccion.metodo) == ("satisfaccion", "huella")
+
+
+def test_detectar_fuente_lee_la_cabecera(tmp_path, registro):
+    ruta = escribir_csv(tmp_path / "respuestas.csv", [p["questionTexts"]["ca"] for p in CATALOGO["questions"]])
+    assert registro.detectar_fuente(ruta).informe == "generico"
+
+
+def test_comprobar_instrumento(tmp_path, registro):
+    ruta = escribir_csv(tmp_path / "respuestas.csv", COLUMNAS_SATISFACCION)
+    # Por el número de columnas solo se avisa: no se rechaza otro informe
+    assert comprobar_instrumento("burnout", ruta, registro).metodo == "columnas"
+    registro.registrar("satisfaccion", COLUMNAS_SATISFACCION, guardar=False)
+    assert comprobar_instrumento("satisfaccion", ruta, registro).informe == "satisfaccion"
+    with pytest.raises(ValueError, match="Satisfacción laboral"):
+        comprobar_instrumento("burnout", ruta, registro)
+    ruta_generico = escribir_csv(tmp_path / "clima.csv", [p["questionTexts"]["es"] for p in CATALOGO["questions"]])
+    with pytest.raises(ValueError, match="Genérico"):
+        comprobar_instrumento("satisfaccion", ruta_generico, registro)
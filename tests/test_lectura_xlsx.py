@@ -0,0 +1,113 @@
+import zipfile
+from xml.sax.saxutils import escape
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from Generar_informe_Satisfaccion import MAPA_RESPUESTAS_SATISFACCION, generar_informe_satisfaccion
+from lectura_xlsx import es_xlsx, leer_xlsx
+
+NS = 'xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"'
+
+
+def letra_columna(j):
+    letras = ""
+    j += 1
+    while j:
+        j, resto = divmod(j - 1, 26)
+        letras = chr(65 + resto) + letras
+    return letras
+
+
+def escribir_xlsx(ruta, tabla: pd.DataFrame):
+    """
+    Exportación .xlsx mínima de `tabla`: textos en la tabla de cadenas compartidas
+    (en tramos con formato los que contienen un espacio), cabecera en línea y
+    celdas vacías omitidas, como las de la plataforma de encuestas.
+    """
+    cadenas = {}
+    filas = []
+    for i, valores in enumerate([list(tabla.columns), *tabla.itertuples(index=False)], start=1):
+        celdas = []
+        for j, valor in enumerate(valores):
+            referencia = f"{letra_columna(j)}{i}"
+            if valor is None or (isinstance(valor, float) and np.isnan(valor)):
+                continue
+            if i == 1:
+                celdas.append(f'<c r="{referencia}" t="inlineStr"><is><t>{escape(valor)}</t></is></c>')
+            elif isinstance(valor, str):
+                celdas.append(f'<c r="{referencia}" t="s"><v>{cadenas.setdefault(valor, len(cadenas))}</v></c>')
+            else:
+                celdas.append(f'<c r="{referencia}"><v>{valor}</v></c>')
+        filas.append(f'<row r="{i}">{"".join(celdas)}</row>')
+
+    def cadena(texto):
+        if " " not in texto:
+            return f"<si><t>{escape(texto)}</t></si>"
+        primero, resto = texto.split(" ", 1)
+        return f'<si><r><t>{escape(primero)}</t></r><r><t xml:space="preserve"> {escape(resto)}</t></r></si>'
+
+    with zipfile.ZipFile(ruta, "w", zipfile.ZIP_DEFLATED) as libro:
+        libro.writestr("[Content_Types].xml", "<Types/>")
+        libro.writestr("xl/workbook.xml", f'<workbook {NS} xmlns:r="http://schemas.openxmlformats.org/'
+                                          'officeDocument/2006/relationships"><sheets><sheet name="Respuestas" '
+                                          'sheetId="1" r:id="rId1"/></sheets></workbook>')
+        libro.writestr("xl/_rels/workbook.xml.rels",
+                       '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+                       '<Relationship Id="rId1" Type="hoja" Target="worksheets/sheet1.xml"/></Relationships>')
+        libro.writestr("xl/worksheets/sheet1.xml", f'<worksheet {NS}><sheetData>{"".join(filas)}</sheetData></worksheet>')
+        libro.writestr("xl/sharedStrings.xml", f'<sst {NS}>{"".join(cadena(t) for t in cadenas)}</sst>')
+
+
+@pytest.fixture
+def tabla():
+    rng = np.random.default_rng(41)
+    textos = np.array(list(MAPA_RESPUESTAS_SATISFACCION), dtype=object)[rng.integers(0, 7, size=(40, 15))]
+    tabla = pd.DataFrame(textos, columns=[f"S{i} satisf" for i in range(1, 16)])
+    tabla.iloc[[3, 17], 4] = np.nan
+    tabla["Peso"] = rng.integers(1, 4, size=40)
+    return tabla
+
+
+@pytest.fixture
+def rutas(tabla, tmp_path):
+    csv, xlsx = tmp_path / "ACME.csv", tmp_path / "ACME.xlsx"
+    tabla.to_csv(csv, index=False)
+    escribir_xlsx(xlsx, tabla)
+    return str(csv), str(xlsx)
+
+
+@pytest.mark.parametrize("bloque_filas", [7, 10_000])
+def test_igual_que_el_csv(rutas, bloque_filas):
+    csv, xlsx = rutas
+    assert es_xlsx(xlsx) and not es_xlsx(csv)
+    pd.testing.assert_frame_equal(leer_xlsx(xlsx, bloque_filas=bloque_filas), pd.read_csv(csv))
+
+
+def test_numeros_y_textos_mezclados(tmp_path):
+    tabla = pd.DataFrame({"entero": [1, 2, None], "decimal": [0.5, 2.0, 3.25], "mixta": ["3", "a", None]},
+                         dtype=object)
+    csv, xlsx = tmp_path / "mixta.csv", tmp_path / "mixta.xlsx"
+    tabla.to_csv(csv, index=False)
+    escribir_xlsx(xlsx, tabla)
+    pd.testing.assert_frame_equal(leer_xlsx(str(xlsx)), pd.read_csv(csv))
+
+
+def test_cabecera_y_primeras_filas(rutas):
+    csv, xlsx = rutas
+    assert list(leer_xlsx(xlsx, max_filas=0).columns) == list(pd.read_csv(csv, nrows=0).columns)
+    pd.testing.assert_frame_equal(leer_xlsx(xlsx, max_filas=5), pd.read_csv(csv, nrows=5))
+    pd.testing.assert_frame_equal(leer_xlsx(xlsx, hoja="Respuestas"), leer_xlsx(xlsx))
+    with pytest.raises(ValueError):
+        leer_xlsx(xlsx, hoja="Otra")
+
+
+def test_mismo_informe_que_el_csv(rutas):
+    csv, xlsx = rutas
+    ponderacion = {"columna": "Peso"}
+    docx_csv, resultados_csv = generar_informe_satisfaccion(csv, "ACME", 50, resultados=True, ponderacion=ponderacion)
+    docx_xlsx, resultados_xlsx = generar_informe_satisfaccion(xlsx, "ACME", 50, resultados=True,
+                                                              ponderacion=ponderacion)
+    assert docx_xlsx == docx_csv
+    assert resultados_xlsx.datos == resultados_csv.datos
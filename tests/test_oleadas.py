@@ -0,0 +1,67 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from oleadas import Oleadas, envios_duplicados, ficheros_respuestas, fuente_respuestas
+
+
+def duplicados_bucle(partes):
+    """Referencia: la k-ésima fila igual de un fichero es duplicada si los anteriores ya tenían k."""
+    vistas, mascara = {}, []
+    for parte in partes:
+        en_esta = {}
+        for fila in map(tuple, parte.to_numpy().tolist()):
+            en_esta[fila] = en_esta.get(fila, 0) + 1
+            mascara.append(en_esta[fila] <= vistas.get(fila, 0))
+        for fila, veces in en_esta.items():
+            vistas[fila] = max(vistas.get(fila, 0), veces)
+    return np.array(mascara)
+
+
+def test_duplicados_igual_que_bucle():
+    rng = np.random.default_rng(42)
+    # Pocas combinaciones posibles: muchas filas iguales dentro y entre oleadas
+    partes = [pd.DataFrame(rng.integers(1, 3, size=(n, 3)), columns=list("ABC")) for n in (30, 25, 40)]
+    respuestas = pd.concat(partes, ignore_index=True)
+    np.testing.assert_array_equal(envios_duplicados(respuestas, [len(p) for p in partes]), duplicados_bucle(partes))
+
+
+def test_duplicados_por_claves():
+    respuestas = pd.DataFrame({"id": [1, 2, 1, 3], "P1": ["a", "b", "c", "d"]})
+    assert list(envios_duplicados(respuestas, [2, 2], claves=["id"])) == [False, False, True, False]
+
+
+def test_union_de_oleadas(tmp_path):
+    enero = pd.DataFrame({"P1": ["Sí", "No", "Sí", "Sí"], "P2": [3, 4, 3, 5]})
+    # Segunda exportación con solape, columnas en otro orden y un envío nuevo igual a uno antiguo
+    febrero = pd.DataFrame({"P2": [3.0, 4.0, 3.0, 3.0, 1.0], "P1": ["Sí", "No", "Sí", "Sí", "No"]})
+    enero.to_csv(tmp_path / "ACME_enero.csv", index=False)
+    febrero.to_csv(tmp_path / "ACME_febrero.csv", index=False)
+    os.utime(tmp_path / "ACME_enero.csv", (1000, 1000))
+
+    fuente = fuente_respuestas(str(tmp_path))
+    assert isinstance(fuente, Oleadas)
+    assert [os.path.basename(f) for f in fuente.fuentes] == ["ACME_enero.csv", "ACME_febrero.csv"]
+    unidas = fuente.leer_csv(",")
+    assert fuente.cabecera(",") == ["P1", "P2"]
+    # Enero tenía dos "Sí;3" y febrero tres: solo el tercero es un envío nuevo
+    assert fuente.duplicados == 3
+    assert unidas.values.tolist() == [["Sí", 3], ["No", 4], ["Sí", 3], ["Sí", 5], ["Sí", 3], ["No", 1]]
+
+
+def test_columnas_que_no_coinciden(tmp_path):
+    pd.DataFrame({"P1": [1], "P2": [2]}).to_csv(tmp_path / "a.csv", index=False)
+    pd.DataFrame({"P1": [1]}).to_csv(tmp_path / "b.csv", index=False)
+    with pytest.raises(ValueError, match="no coinciden"):
+        Oleadas([str(tmp_path / "a.csv"), str(tmp_path / "b.csv")]).leer_csv(",")
+
+
+def test_un_solo_fichero(tmp_path):
+    ruta = tmp_path / "ACME.csv"
+    ruta.write_text("P1\n1\n", encoding="utf-8")
+    assert fuente_respuestas(str(ruta)) == str(ruta)
+    assert ficheros_respuestas([str(ruta), str(tmp_path / "*.xlsx")]) == [str(ruta)]
+    with pytest.raises(ValueError):
+        fuente_respuestas(str(tmp_path / "*.xlsx"))
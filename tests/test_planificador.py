@@ -0,0 +1,75 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import planificador
+from planificador import Plan, leer_respuestas, planificar
+from validacion import decodificador
+
+VOCABULARIO = {"Nada": 1, "Poco": 2, "Algo": 3, "Bastante": 4, "Mucho": 5}
+COLUMNAS = 45
+
+
+@pytest.fixture
+def csv_respuestas(tmp_path):
+    rng = np.random.default_rng(44)
+    textos = np.array(list(VOCABULARIO))[rng.integers(0, 5, size=(300, COLUMNAS))]
+    textos[7, 3] = "Quizá"  # una fila en cuarentena
+    textos[20, 10] = ""  # una respuesta vacía
+    ruta = tmp_path / "respuestas.csv"
+    pd.DataFrame(textos, columns=[f"P{i}" for i in range(COLUMNAS)]).to_csv(ruta, index=False)
+    return str(ruta)
+
+
+def sin_muestra(*args):
+    raise AssertionError("no debería muestrearse el fichero")
+
+
+def test_fichero_pequeno_en_memoria_sin_muestrear(csv_respuestas, monkeypatch):
+    monkeypatch.setattr(planificador, "_muestra", sin_muestra)
+    plan = planificar(csv_respuestas)
+    assert plan.modo == "memoria" and plan.filas_estimadas is None
+    assert plan.columnas == COLUMNAS and plan.memoria_estimada > 0
+    assert "en memoria" in str(plan) and "filas" not in str(plan)
+
+
+def test_poca_memoria_por_bloques(csv_respuestas, monkeypatch):
+    monkeypatch.setattr(planificador, "memoria_disponible", lambda: 100_000)
+    plan = planificar(csv_respuestas)
+    assert plan.modo == "bloques"
+    assert plan.filas_estimadas == pytest.approx(300, rel=0.05)
+    assert plan.memoria_estimada > planificador.FRACCION_MEMORIA * 100_000
+
+
+def test_fichero_ancho_en_paralelo(csv_respuestas, monkeypatch):
+    monkeypatch.setattr(planificador, "MIN_BYTES_PARALELO", 1)
+    monkeypatch.setattr(planificador, "procesadores", lambda: 4)
+    plan = planificar(csv_respuestas)
+    assert plan.modo == "paralelo" and plan.procesos == 4
+    monkeypatch.setattr(planificador, "procesadores", lambda: 1)
+    assert planificar(csv_respuestas).modo == "memoria"
+
+
+def test_modo_indicado_y_fuente_no_csv(csv_respuestas):
+    plan = planificar(csv_respuestas, modo="bloques")
+    assert plan.modo == "bloques" and plan.motivo == "modo indicado" and plan.filas_estimadas
+    assert planificar([csv_respuestas, csv_respuestas]).modo == "memoria"
+    with pytest.raises(ValueError):
+        planificar([csv_respuestas], modo="bloques")
+
+
+@pytest.mark.parametrize("modo", ["bloques", "paralelo"])
+def test_mismos_resultados_en_todos_los_modos(csv_respuestas, modo):
+    decodificar = decodificador(VOCABULARIO)
+    memoria = leer_respuestas(csv_respuestas, decodificar, 1, 5)
+    otra = leer_respuestas(csv_respuestas, decodificar, 1, 5, plan=planificar(csv_respuestas, modo=modo))
+    pd.testing.assert_frame_equal(otra.valores, memoria.valores)
+    pd.testing.assert_frame_equal(otra.diagnostico, memoria.diagnostico)
+    assert list(otra.cuarentena.index) == list(memoria.cuarentena.index) == [7]
+
+
+def test_resumen_incluye_el_plan(csv_respuestas):
+    validacion = leer_respuestas(csv_respuestas, decodificador(VOCABULARIO), 1, 5, plan=Plan("memoria"))
+    lineas = validacion.resumen().splitlines()
+    assert lineas[0] == "Plan de lectura: en memoria"
+    assert lineas[1] == "1 de 300 respuestas en cuarentena"
@@ -0,0 +1,154 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import Generar_informe_Burnout
+import Generar_informe_Generico
+import Generar_informe_Satisfaccion
+from aproximacion import estimar
+from estadisticas import conteos_ponderados, describir, describir_segmentos
+from ponderacion import normalizar_pesos, pesos_postestratificacion
+
+ESTADISTICOS = ["mean", "std", "min", "max", "p25", "p75"]
+
+
+@pytest.fixture
+def rng():
+    return np.random.default_rng(50)
+
+
+@pytest.fixture
+def likert(rng):
+    matriz = rng.integers(1, 6, size=(80, 4)).astype(float)
+    matriz[rng.random(matriz.shape) < 0.1] = np.nan
+    return pd.DataFrame(matriz, columns=list("ABCD"))
+
+
+@pytest.mark.parametrize("modulo,inicio,fin", [(Generar_informe_Burnout, 1, 6),
+                                               (Generar_informe_Satisfaccion, 1, 8),
+                                               (Generar_informe_Generico, 0, 11)])
+def test_pesos_unitarios_igual_que_sin_pesos(rng, modulo, inicio, fin):
+    datos = pd.DataFrame(rng.integers(inicio, fin, size=(60, 5)))
+    assert modulo.obtenerRespuestas(datos, inicio, fin, pesos=np.ones(len(datos))) == \
+        modulo.obtenerRespuestas(datos, inicio, fin)
+
+
+def test_conteos_con_pesos_enteros_igual_que_filas_repetidas(likert, rng):
+    pesos = rng.integers(1, 5, size=len(likert))
+    repetidas = likert.loc[likert.index.repeat(pesos)]
+    np.testing.assert_allclose(conteos_ponderados(likert, 1, 6, pesos.astype(float)),
+                               conteos_ponderados(repetidas, 1, 6))
+    esperado = np.array([[(repetidas[c] == v).sum() for v in range(1, 6)] for c in likert.columns])
+    np.testing.assert_array_equal(conteos_ponderados(repetidas, 1, 6), esperado)
+
+
+def referencia_ponderada(columna: pd.Series, pesos):
+    """Media y desviación típica ponderadas: Σw·(x−m)² / Σw · n / (n − 1), con n las respuestas."""
+    validas = columna.notna().to_numpy()
+    x, w = columna.to_numpy(dtype=float)[validas], np.asarray(pesos, dtype=float)[validas]
+    media = (w * x).sum() / w.sum()
+    n = len(x)
+    return media, np.sqrt((w * (x - media) ** 2).sum() / w.sum() * n / (n - 1)) if n > 1 else np.nan
+
+
+@pytest.mark.parametrize("escala", [1, 0.37])
+def test_describir_ponderado_igual_que_referencia(likert, rng, escala):
+    # escala 1: histograma (enteros); 0.37: datos decimales, cuantiles por pesos acumulados
+    datos = likert * escala
+    pesos = rng.uniform(0.1, 3, size=len(datos))
+    ponderado = describir(datos, pesos)
+    for columna in datos.columns:
+        media, std = referencia_ponderada(datos[columna], pesos)
+        assert ponderado.loc[columna, "mean"] == pytest.approx(media)
+        assert ponderado.loc[columna, "std"] == pytest.approx(std)
+    # 'count' sigue siendo el número de respuestas, no la suma de pesos
+    pd.testing.assert_series_equal(ponderado["count"], datos.count().astype(float), check_names=False)
+
+
+@pytest.mark.parametrize("escala", [1, 0.37])
+def test_describir_no_depende_de_la_escala_de_los_pesos(likert, rng, escala):
+    datos = likert * escala
+    pesos = rng.uniform(0.1, 3, size=len(datos))
+    referencia = describir(datos, pesos)
+    for factor in (0.01, 1 / len(datos), 50):
+        pd.testing.assert_frame_equal(describir(datos, pesos * factor), referencia)
+
+
+def test_pesos_enteros_misma_media_y_cuantiles_por_histograma_y_por_orden(likert, rng):
+    pesos = rng.integers(1, 5, size=len(likert)).astype(float)
+    repetidas = likert.loc[likert.index.repeat(pesos.astype(int))]
+    histograma = describir(likert, pesos)
+    ordenado = describir(likert + 0.5, pesos)
+    pd.testing.assert_series_equal(histograma["mean"], describir(repetidas)["mean"])
+    for campo in ("mean", "p25", "p75"):
+        pd.testing.assert_series_equal(ordenado[campo] - 0.5, histograma[campo])
+    pd.testing.assert_series_equal(ordenado["std"], histograma["std"])
+
+
+def test_describir_segmentos_igual_que_groupby(likert, rng):
+    segmentos = rng.choice(["Madrid", "Sevilla", "Vigo"], size=len(likert))
+    obtenido = describir_segmentos(likert, segmentos)
+    agrupado = likert.groupby(segmentos)
+    esperado = pd.concat({"mean": agrupado.mean().stack(), "std": agrupado.std().stack(),
+                          "count": agrupado.count().stack()}, axis=1)
+    pd.testing.assert_frame_equal(obtenido.sort_index(), esperado.sort_index(), check_names=False)
+
+
+def test_describir_segmentos_ponderado(likert, rng):
+    segmentos = rng.choice(["Madrid", "Sevilla", "Vigo"], size=len(likert))
+    pesos = normalizar_pesos(rng.uniform(0.1, 3, size=len(likert)))
+    obtenido = describir_segmentos(likert, segmentos, pesos)
+    for (segmento, columna), fila in obtenido.iterrows():
+        dentro = segmentos == segmento
+        media, std = referencia_ponderada(likert.loc[dentro, columna], pesos[dentro])
+        assert fila["mean"] == pytest.approx(media) and fila["std"] == pytest.approx(std)
+
+
+@pytest.mark.parametrize("suma_pesos", [0.6, 1.0])
+def test_describir_segmentos_con_pocos_pesos(suma_pesos):
+    # Un segmento cuyos pesos suman 1 o menos (pesos normalizados a media 1 en toda la muestra)
+    datos = pd.DataFrame({"A": [1, 5, 3, 3, 3, 3]})
+    segmentos = ["pequeño", "pequeño", "grande", "grande", "grande", "grande"]
+    pesos = np.array([suma_pesos / 2, suma_pesos / 2, 1.2, 1.2, 1.2, 1.2])
+    obtenido = describir_segmentos(datos, segmentos, pesos)
+    assert obtenido.loc[("pequeño", "A"), "mean"] == pytest.approx(3)
+    assert obtenido.loc[("pequeño", "A"), "std"] == pytest.approx(np.std([1, 5], ddof=1))
+
+
+def test_postestratificacion():
+    segmentos = np.array(["A"] * 60 + ["B"] * 30 + ["C"] * 10)
+    poblacion = {"A": 100, "B": 100, "C": 200}
+    pesos = pesos_postestratificacion(segmentos, poblacion)
+    assert pesos.mean() == pytest.approx(1)
+    # Con los pesos, cada segmento pesa en la muestra lo mismo que en la plantilla
+    for segmento, personas in poblacion.items():
+        assert pesos[segmentos == segmento].sum() / pesos.sum() == pytest.approx(personas / 400)
+    assert len(set(pesos[segmentos == "A"])) == 1
+
+
+def test_postestratificacion_segmento_desconocido():
+    with pytest.raises(ValueError):
+        pesos_postestratificacion(["A", "X"], {"A": 10})
+
+
+def test_pesos_no_validos():
+    with pytest.raises(ValueError):
+        normalizar_pesos([1.0, 0.0, 2.0])
+    with pytest.raises(ValueError):
+        normalizar_pesos([1.0, "a", 2.0])
+
+
+def test_estimacion_ponderada(rng):
+    puntuaciones = pd.DataFrame(rng.integers(15, 106, size=(50, 3)),
+                                columns=["Satisfaccion_General", "Satisfaccion_Intrinseca", "Satisfaccion_Extrinseca"])
+    sin_pesos = estimar("satisfaccion", puntuaciones, n_total=500)
+    unitarios = estimar("satisfaccion", puntuaciones, n_total=500, pesos=np.ones(len(puntuaciones)))
+    pd.testing.assert_series_equal(unitarios.medias, sin_pesos.medias)
+    pd.testing.assert_series_equal(unitarios.margenes, sin_pesos.margenes)
+
+    pesos = normalizar_pesos(rng.uniform(0.2, 3, len(puntuaciones)))
+    ponderada = estimar("satisfaccion", puntuaciones, n_total=500, pesos=pesos)
+    pd.testing.assert_series_equal(ponderada.medias, describir(puntuaciones, pesos)["mean"].round(2), check_names=False)
+    # Pesos desiguales: tamaño efectivo menor y márgenes más anchos
+    assert (ponderada.margenes / describir(puntuaciones, pesos)["std"] >
+            sin_pesos.margenes / describir(puntuaciones)["std"]).all()
@@ -0,0 +1,72 @@
+from collections import Counter
+
+import pytest
+
+from proveedores import RegistroProveedores
+
+
+@pytest.fixture
+def llamadas():
+    return Counter()
+
+
+def contar(llamadas, nombre, funcion):
+    def proveedor(r):
+        llamadas[nombre] += 1
+        return funcion(r)
+    return proveedor
+
+
+def test_solo_calcula_lo_que_piden_los_marcadores(llamadas):
+    registro = RegistroProveedores()
+    registro.registrar('datos', contar(llamadas, 'datos', lambda r: [1, 2, 3]))
+    registro.registrar('suma', contar(llamadas, 'suma', lambda r: {"SUMA": sum(r.obtener('datos'))}), patron=r'SUMA')
+    registro.registrar('maximo', contar(llamadas, 'maximo', lambda r: {"MAXIMO": max(r.obtener('datos'))}),
+                       patron=r'MAXIMO')
+
+    assert registro.resolver({"SUMA", "OTRO"}) == {"SUMA": 6}
+    assert llamadas == {'datos': 1, 'suma': 1}
+    assert registro.resolver({"SUMA", "MAXIMO"}) == {"SUMA": 6, "MAXIMO": 3}
+    assert llamadas == {'datos': 1, 'suma': 1, 'maximo': 1}
+
+
+def test_misma_clave_conserva_y_otra_clave_invalida_dependientes(llamadas):
+    registro = RegistroProveedores()
+
+    def registrar(factor):
+        registro.registrar('datos', contar(llamadas, 'datos', lambda r: [1, 2, 3]), clave=())
+        registro.registrar('escalado', contar(llamadas, 'escalado', lambda r: [x * factor for x in r.obtener('datos')]),
+                           clave=(factor,))
+        registro.registrar('total', contar(llamadas, 'total', lambda r: {"TOTAL": sum(r.obtener('escalado'))}),
+                           patron=r'TOTAL', clave=())
+
+    registrar(1)
+    assert registro.resolver({"TOTAL"}) == {"TOTAL": 6}
+    registrar(1)
+    assert registro.resolver({"TOTAL"}) == {"TOTAL": 6}
+    assert llamadas == {'datos': 1, 'escalado': 1, 'total': 1}
+    registrar(2)
+    assert registro.resolver({"TOTAL"}) == {"TOTAL": 12}
+    assert llamadas == {'datos': 1, 'escalado': 2, 'total': 2}
+
+
+def test_necesita_se_recalcula_si_cambian_los_marcadores(llamadas):
+    registro = RegistroProveedores()
+    registro.registrar('base', contar(llamadas, 'base', lambda r: {"IC": r.necesita(r'IC_\w+')}), clave=())
+    registro.registrar('valores', contar(llamadas, 'valores', lambda r: {"VALOR": r.obtener('base')["IC"]}),
+                       patron=r'VALOR', clave=())
+
+    assert registro.resolver({"VALOR"}) == {"VALOR": False}
+    # Otros marcadores que no cambian la respuesta: se conserva el resultado
+    assert registro.resolver({"VALOR", "NOMBRE"}) == {"VALOR": False}
+    assert llamadas == {'base': 1, 'valores': 1}
+    # La respuesta de `necesita` cambia: se recalculan el proveedor y los que lo usan
+    assert registro.resolver({"VALOR", "IC_GENERAL"}) == {"VALOR": True}
+    assert llamadas == {'base': 2, 'valores': 2}
+
+
+def test_contiene():
+    registro = RegistroProveedores()
+    registro.registrar('datos', lambda r: 1)
+    assert 'datos' in registro
+    assert 'otros' not in registro
@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from Generar_informe_Satisfaccion import MAPA_RESPUESTAS_SATISFACCION
+from reconstruccion import Manifiesto, huellas_trabajo, obsoletos, reconstruir
+from trabajos import ficheros_configuracion, modulos_proyecto
+
+COMUNES = ["estadisticas.py", "faltantes.py", "validacion.py", "planificador.py", "proveedores.py", "utils.py",
+           "tablas.py", "graficos.py", "resultados.py"]
+
+
+def escribir_respuestas(ruta, semilla):
+    rng = np.random.default_rng(semilla)
+    textos = np.array(list(MAPA_RESPUESTAS_SATISFACCION), dtype=object)[rng.integers(0, 7, size=(20, 15))]
+    pd.DataFrame(textos, columns=[f"S{i} satisf" for i in range(1, 16)]).to_csv(ruta, index=False)
+
+
+@pytest.fixture
+def trabajo(tmp_path):
+    escribir_respuestas(tmp_path / "ACME.csv", 0)
+    return {"informe": "satisfaccion", "csv": str(tmp_path / "ACME.csv"), "empresa": "ACME", "invitados": 30,
+            "parametros": {"num_medidas": 3}, "salida": str(tmp_path / "Informe_Satisfaccion_ACME.docx")}
+
+
+@pytest.mark.parametrize("tipo", ["burnout", "satisfaccion", "generico"])
+def test_dependencias_incluyen_modulos_comunes(tipo):
+    ficheros = ficheros_configuracion(tipo)
+    assert set(COMUNES) <= set(ficheros)
+    assert len(ficheros) == len(set(ficheros))
+
+
+def test_modulos_proyecto(tmp_path):
+    (tmp_path / "a.py").write_text("import os\nfrom b import f\n", encoding="utf-8")
+    (tmp_path / "b.py").write_text("import c\nimport numpy as np\n", encoding="utf-8")
+    (tmp_path / "c.py").write_text("from b import f\n", encoding="utf-8")
+    (tmp_path / "d.py").write_text("", encoding="utf-8")
+    assert modulos_proyecto(str(tmp_path / "a.py")) == [str(tmp_path / m) for m in ("a.py", "b.py", "c.py")]
+
+
+def test_obsoleto_si_cambia_una_entrada(trabajo, tmp_path):
+    ruta_manifiesto = str(tmp_path / "manifiesto.json")
+    assert reconstruir([trabajo], ruta_manifiesto, procesos=1, usar_cache=False)["generados"] == [trabajo["salida"]]
+    # Al día: nada que regenerar
+    assert reconstruir([trabajo], ruta_manifiesto, procesos=1, usar_cache=False)["omitidos"] == [trabajo["salida"]]
+
+    manifiesto = Manifiesto(ruta_manifiesto)
+    assert set(COMUNES) <= set(manifiesto.informes[trabajo["salida"]])
+    # Otro CSV, otros parámetros o un módulo común distinto: obsoleto
+    escribir_respuestas(trabajo["csv"], 1)
+    assert obsoletos([trabajo], manifiesto)
+    escribir_respuestas(trabajo["csv"], 0)
+    assert not obsoletos([trabajo], manifiesto)
+    assert obsoletos([dict(trabajo, parametros={"num_medidas": 4})], manifiesto)
+    manifiesto.informes[trabajo["salida"]]["estadisticas.py"] = "otro"
+    assert obsoletos([trabajo], manifiesto)
+
+
+def test_obsoleto_si_falta_la_salida(trabajo, tmp_path):
+    manifiesto = Manifiesto(str(tmp_path / "manifiesto.json"))
+    manifiesto.informes[trabajo["salida"]] = huellas_trabajo(trabajo, manifiesto)
+    assert obsoletos([trabajo], manifiesto)
@@ -0,0 +1,51 @@
+import random
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from Generar_informe_Satisfaccion import MAPA_RESPUESTAS_SATISFACCION, escogerMedidas, generar_informe_satisfaccion
+
+RUTA_MEDIDAS = "Satisfacción laboral/medidas.json"
+
+
+@pytest.fixture
+def csv_satisfaccion(tmp_path):
+    rng = np.random.default_rng(47)
+    textos = np.array(list(MAPA_RESPUESTAS_SATISFACCION), dtype=object)[rng.integers(0, 7, size=(30, 15))]
+    # Dos encuestados dejan sin responder casi todas las preguntas intrínsecas (pares)
+    textos[[3, 11], 1:12:2] = ""
+    ruta = tmp_path / "respuestas.csv"
+    pd.DataFrame(textos, columns=[f"S{i} satisf" for i in range(1, 16)]).to_csv(ruta, index=False)
+    return str(ruta)
+
+
+def test_count_por_dimension(csv_satisfaccion):
+    _, resultados = generar_informe_satisfaccion(csv_satisfaccion, "ACME", 40, resultados=True)
+    cuentas = {d["dimension"]: d["count"] for d in resultados.datos["dimensiones"]}
+    assert resultados.datos["participacion"]["respuestas"] == 30
+    assert cuentas == {"Satisfaccion_General": 28, "Satisfaccion_Intrinseca": 28, "Satisfaccion_Extrinseca": 30}
+
+
+@pytest.mark.parametrize("num_medidas", [1, 3, 5])
+def test_escoger_num_medidas(num_medidas):
+    medidas = escogerMedidas(60, RUTA_MEDIDAS, random.Random(36), num_medidas)
+    assert medidas["MEDIDAS"] == len(medidas["seleccionadas"]) == num_medidas
+    assert len(set(medidas["seleccionadas"])) == num_medidas
+    # Tres marcadores en la plantilla: los que sobran vacíos, las medidas de más en el último
+    marcadores = [medidas[f"MEDIDA_{i}"] for i in range(1, 4)]
+    assert "\n".join(m for m in marcadores if m) == "\n".join(medidas["seleccionadas"])
+    assert escogerMedidas(60, RUTA_MEDIDAS, random.Random(36), num_medidas) == medidas
+
+
+def test_fuera_de_rango_sin_medidas():
+    medidas = escogerMedidas(-5, RUTA_MEDIDAS, random.Random(0))
+    assert medidas["nivel"] == "Fuera de rango" and medidas["seleccionadas"] == []
+    assert medidas["MEDIDA_1"] == medidas["MEDIDA_3"] == ""
+
+
+def test_num_medidas_en_los_resultados(csv_satisfaccion):
+    for num_medidas in (2, 4):
+        _, resultados = generar_informe_satisfaccion(csv_satisfaccion, "ACME", 40, num_medidas=num_medidas,
+                                                     resultados=True)
+        assert len(resultados.datos["medidas"]) == num_medidas
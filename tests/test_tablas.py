@@ -0,0 +1,70 @@
+import pandas as pd
+import pytest
+from docx import Document
+from docx.oxml import OxmlElement
+from docx.oxml.ns import qn
+
+from graficos import conteos_a_matriz
+from tablas import crear_tabla, rellenar_tablas, tabla_conteos, tabla_estadisticas
+
+
+@pytest.fixture
+def matriz():
+    return conteos_a_matriz({"PREGUNTA_1_1": 3, "PREGUNTA_1_2": 1, "PREGUNTA_2_2": 4, "PREGUNTA_3_1": 0})
+
+
+def documento_con_tabla(marcador="TABLA_RESPUESTAS"):
+    """Documento con una tabla de plantilla (cabecera y fila prototipo) marcada con `marcador`."""
+    doc = Document()
+    tabla = doc.add_table(rows=2, cols=2)
+    for fila, textos in zip(tabla.rows, (["Pregunta", "Valor"], ["x", "0"])):
+        for celda, texto in zip(fila.cells, textos):
+            celda.paragraphs[0].add_run(texto)
+    inicio = OxmlElement("w:bookmarkStart")
+    inicio.set(qn("w:id"), "0")
+    inicio.set(qn("w:name"), marcador)
+    tabla.rows[0].cells[0].paragraphs[0]._p.insert(0, inicio)
+    return doc
+
+
+def textos_tabla(tabla):
+    return [[celda.text for celda in fila.cells] for fila in tabla.rows]
+
+
+def test_tabla_conteos(matriz):
+    cabecera, filas = tabla_conteos(matriz, titulos=["A", "B", "C"], etiquetas={1: "Sí", 2: "No"})
+    assert cabecera == ["Pregunta", "Sí", "No"]
+    assert filas == [["A", 3, 1], ["B", 0, 4], ["C", 0, 0]]
+    _, porcentajes = tabla_conteos(matriz, porcentajes=True)
+    # Una pregunta sin respuestas da ceros, no NaN
+    assert porcentajes == [["1", 75.0, 25.0], ["2", 0.0, 100.0], ["3", 0.0, 0.0]]
+
+
+def test_tabla_estadisticas():
+    estadisticas = pd.DataFrame({"mean": [3.5], "std": [1.0], "p25": [3.0], "p75": [4.0], "ic_inf": [3.1],
+                                 "ic_sup": [3.9]}, index=["TEDIO"])
+    cabecera, filas = tabla_estadisticas(estadisticas, {"TEDIO": "Tedio"})
+    assert cabecera[-2:] == ["IC 95 % inf.", "IC 95 % sup."]
+    assert filas == [["Tedio", 3.5, 1.0, 3.0, 4.0, 3.1, 3.9]]
+
+
+def test_rellenar_tablas_de_la_plantilla(matriz):
+    doc = documento_con_tabla()
+    llamadas = []
+    proveedores = {
+        "TABLA_RESPUESTAS": lambda: llamadas.append("respuestas") or tabla_conteos(matriz, porcentajes=True),
+        "TABLA_DIMENSIONES": lambda: llamadas.append("dimensiones") or ([], []),
+    }
+    assert rellenar_tablas(doc, proveedores) == ["TABLA_RESPUESTAS"]
+    assert llamadas == ["respuestas"]
+    assert textos_tabla(doc.tables[0]) == [["Pregunta", "1", "2"], ["1", "75.00", "25.00"],
+                                           ["2", "0.00", "100.00"], ["3", "0.00", "0.00"]]
+    assert len(list(doc.element.body.iter(qn("w:bookmarkStart")))) <= 1
+
+
+def test_crear_tabla(matriz):
+    doc = Document()
+    ancla = doc.add_paragraph("Resultados")._p
+    crear_tabla(doc, ancla, *tabla_conteos(matriz))
+    assert ancla.getnext().tag == qn("w:tbl")
+    assert textos_tabla(doc.tables[0]) == [["Pregunta", "1", "2"], ["1", "3", "1"], ["2", "0", "4"], ["3", "0", "0"]]
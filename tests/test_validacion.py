@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from validacion import decodificador, minusculas, validar_respuestas
+
+VOCABULARIO = {"Nunca": 1, "A veces": 2, "Siempre": 3}
+
+
+@pytest.fixture
+def respuestas():
+    rng = np.random.default_rng(40)
+    textos = np.array(["Nunca", "a veces ", "SIEMPRE", "2", "", "Quizá", "7", "2.5"], dtype=object)
+    # Sobre todo respuestas válidas, con algunas vacías y no reconocidas
+    celdas = textos[rng.choice(8, size=(200, 4), p=[0.3, 0.3, 0.25, 0.07, 0.04, 0.02, 0.01, 0.01])]
+    return pd.DataFrame(celdas, columns=["P1", "P2", "P3", "P4"])
+
+
+def valor_celda(texto):
+    """Decodificación de referencia, celda a celda."""
+    texto = texto.strip().lower()
+    if not texto:
+        return "vacia"
+    valor = {"nunca": 1, "a veces": 2, "siempre": 3}.get(texto)
+    if valor is None and texto.replace(".", "", 1).isdigit():
+        valor = float(texto)
+    return valor if valor is not None and float(valor).is_integer() and 1 <= valor <= 3 else None
+
+
+def test_igual_que_celda_a_celda(respuestas):
+    validacion = validar_respuestas(respuestas, decodificador(VOCABULARIO, minusculas), 1, 3)
+    referencia = respuestas.map(valor_celda)
+    malas = referencia.isna().any(axis=1)
+
+    assert list(validacion.cuarentena.index) == list(respuestas.index[malas])
+    pd.testing.assert_frame_equal(validacion.cuarentena, respuestas[malas])
+    esperado = referencia[~malas].map(lambda valor: np.nan if valor == "vacia" else valor).astype(float)
+    np.testing.assert_array_equal(validacion.valores.to_numpy(dtype=float, na_value=np.nan), esperado.to_numpy())
+    assert list(validacion.diagnostico["vacias"]) == list((referencia == "vacia").sum())
+    assert list(validacion.diagnostico["invalidas"]) == list(referencia.isna().sum())
+
+
+def test_resumen_con_ejemplos():
+    respuestas = pd.DataFrame({"P1": ["Nunca", "Quizá", "Quizá", "Siempre"], "P2": ["Nunca"] * 4})
+    validacion = validar_respuestas(respuestas, decodificador(VOCABULARIO), 1, 3)
+    assert validacion.resumen().splitlines() == ["2 de 4 respuestas en cuarentena",
+                                                 "  - P1: 2 no reconocidas ('Quizá' x2)"]
+
+
+def test_demasiadas_en_cuarentena():
+    respuestas = pd.DataFrame({"P1": ["Nunca", "Quizá", "Otro", "Siempre"]})
+    with pytest.raises(ValueError, match="Demasiadas respuestas no reconocidas"):
+        validar_respuestas(respuestas, decodificador(VOCABULARIO), 1, 3, max_cuarentena=0.25)
+
+
+def test_sin_filas_o_sin_columnas():
+    with pytest.raises(ValueError, match="ninguna respuesta"):
+        validar_respuestas(pd.DataFrame({"P1": []}, dtype=object), decodificador(VOCABULARIO), 1, 3)
+    with pytest.raises(ValueError, match="columnas"):
+        validar_respuestas(pd.DataFrame({"P1": ["Nunca"]}), decodificador(VOCABULARIO), 1, 3, n_columnas=5)
@@ -0,0 +1,95 @@
+import json
+import os
+import time
+
+import pytest
+
+import vigilante
+from vigilante import Vigilante
+
+ESPERA = 0.3
+
+
+@pytest.fixture
+def carpeta(tmp_path):
+    (tmp_path / "entrada").mkdir()
+    return tmp_path
+
+
+@pytest.fixture
+def llamadas(monkeypatch):
+    trabajos = []
+    monkeypatch.setattr(vigilante, "ejecutar_trabajo", lambda trabajo, cache: trabajos.append(trabajo) or b"docx")
+    return trabajos
+
+
+def nuevo_vigilante(carpeta):
+    configuracion = {
+        "espera": ESPERA, "estado": str(carpeta / "estado.json"),
+        "carpetas": [{"ruta": str(carpeta / "entrada"), "informe": "burnout", "salida": str(carpeta / "salida"),
+                      "invitados": 50, "parametros": {"limite": 10}}],
+    }
+    (carpeta / "salida").mkdir(exist_ok=True)
+    return Vigilante(configuracion, sondeo=True)
+
+
+def esperar_y_procesar(vig):
+    """Un sondeo que descubre los cambios y otro pasada la espera, que los procesa."""
+    vig.paso()
+    time.sleep(ESPERA + 0.05)
+    vig.paso()
+
+
+def test_espera_a_que_el_fichero_deje_de_cambiar(carpeta, llamadas):
+    vig = nuevo_vigilante(carpeta)
+    csv = carpeta / "entrada" / "ACME.csv"
+    csv.write_text("a,b\n1,2\n", encoding="utf-8")
+    (carpeta / "entrada" / "notas.txt").write_text("no es un CSV", encoding="utf-8")
+    vig.paso()
+    assert llamadas == []
+    # Sigue creciendo durante la espera: se vuelve a esperar
+    time.sleep(ESPERA + 0.05)
+    with open(csv, "a", encoding="utf-8") as f:
+        f.write("3,4\n")
+    vig._listos()
+    assert llamadas == []
+    esperar_y_procesar(vig)
+    assert [t["csv"] for t in llamadas] == [str(csv)]
+    assert (carpeta / "salida" / "Informe_Burnout_ACME.docx").read_bytes() == b"docx"
+
+
+def test_mismo_contenido_no_se_regenera(carpeta, llamadas):
+    vig = nuevo_vigilante(carpeta)
+    csv = carpeta / "entrada" / "ACME.csv"
+    csv.write_text("a,b\n1,2\n", encoding="utf-8")
+    esperar_y_procesar(vig)
+    assert len(llamadas) == 1
+
+    # Guardado sin cambios (otra fecha, mismo contenido): no se regenera
+    os.utime(csv, ns=(time.time_ns(), time.time_ns() + 10**9))
+    esperar_y_procesar(vig)
+    assert len(llamadas) == 1
+    # Tampoco tras reiniciar el vigilante: las huellas se guardan en el estado
+    reiniciado = nuevo_vigilante(carpeta)
+    esperar_y_procesar(reiniciado)
+    assert len(llamadas) == 1
+
+    csv.write_text("a,b\n5,6\n", encoding="utf-8")
+    esperar_y_procesar(reiniciado)
+    assert len(llamadas) == 2
+
+
+def test_json_acompanante(carpeta, llamadas):
+    vig = nuevo_vigilante(carpeta)
+    csv = carpeta / "entrada" / "ACME.csv"
+    csv.write_text("a,b\n1,2\n", encoding="utf-8")
+    trabajo = vig.trabajo_para(str(csv))
+    assert (trabajo["empresa"], trabajo["invitados"], trabajo["parametros"]) == ("ACME", 50, {"limite": 10})
+
+    (carpeta / "entrada" / "ACME.json").write_text(
+        json.dumps({"empresa": "Acme S.A.", "invitados": 80, "parametros": {"limite": 7}}), encoding="utf-8")
+    trabajo = vig.trabajo_para(str(csv))
+    assert (trabajo["empresa"], trabajo["invitados"], trabajo["parametros"]) == ("Acme S.A.", 80, {"limite": 7})
+    # El JSON acompañante no se procesa como respuestas
+    esperar_y_procesar(vig)
+    assert [t["empresa"] for t in llamadas] == ["Acme S.A."]
@@ -0,0 +1,91 @@
+import io
+import json
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+import pytest
+from docx import Document
+
+import vista_previa
+from Generar_informe_Generico import generar_informe_generico
+from Generar_informe_Satisfaccion import MAPA_RESPUESTAS_SATISFACCION, generar_informe_satisfaccion
+from vista_previa import _escapar, vista_previa_generico, vista_previa_satisfaccion
+
+CATALOGO = {
+    "id": 1, "availableLocales": ["es", "ca"],
+    "questions": [
+        {"id": 1, "questionTexts": {"es": "1. ¿Conoces el protocolo?", "ca": "1. Coneixes el protocol?"},
+         "options": [{"id": 1, "value": "Sí", "optionTexts": {"es": "Sí", "ca": "Sí"}},
+                     {"id": 2, "value": "No", "optionTexts": {"es": "No", "ca": "No"}}]},
+        {"id": 2, "questionTexts": {"es": "2. Valora el ambiente", "ca": "2. Valora l'ambient"},
+         "options": [{"id": 10 + v, "value": str(v), "optionTexts": {"es": str(v), "ca": str(v)}}
+                     for v in range(11)]},
+    ],
+}
+
+
+@pytest.fixture
+def csv_satisfaccion(tmp_path):
+    rng = np.random.default_rng(46)
+    textos = np.array(list(MAPA_RESPUESTAS_SATISFACCION), dtype=object)[rng.integers(0, 7, size=(25, 15))]
+    ruta = tmp_path / "ACME.csv"
+    pd.DataFrame(textos, columns=[f"S{i} satisf" for i in range(1, 16)]).to_csv(ruta, index=False)
+    return str(ruta)
+
+
+@pytest.fixture
+def lecturas(monkeypatch):
+    """Cuenta las lecturas de respuestas de las vistas previas."""
+    contador = Counter()
+    for nombre in ("leer_respuestas_satisfaccion", "leer_respuestas_generico"):
+        original = getattr(vista_previa, nombre)
+        monkeypatch.setattr(vista_previa, nombre,
+                            lambda *a, _nombre=nombre, _original=original, **k:
+                            contador.update([_nombre]) or _original(*a, **k))
+    monkeypatch.setattr(vista_previa, "_estados", type(vista_previa._estados)())
+    return contador
+
+
+def parrafos_docx(docx: bytes) -> list[str]:
+    return [p.text for p in Document(io.BytesIO(docx)).paragraphs if p.text.strip()]
+
+
+def test_satisfaccion_mismo_contenido_que_el_docx(csv_satisfaccion, lecturas):
+    for num_medidas in (1, 3, 4):
+        html = vista_previa_satisfaccion(csv_satisfaccion, "ACME", 40, num_medidas=num_medidas, semilla=5)
+        docx, resultados = generar_informe_satisfaccion(csv_satisfaccion, "ACME", 40, num_medidas=num_medidas,
+                                                        semilla=5, resultados=True)
+        texto_docx = "\n".join(parrafos_docx(docx))
+        assert len(resultados.datos["medidas"]) == num_medidas
+        for medida in resultados.datos["medidas"]:
+            assert medida in texto_docx and _escapar(medida) in html
+    # Cambiar el número de medidas no vuelve a leer las respuestas
+    assert lecturas == {"leer_respuestas_satisfaccion": 1}
+
+
+def test_generico_un_calculo_para_todos_los_idiomas(tmp_path, lecturas):
+    ruta_json = tmp_path / "preguntas.json"
+    ruta_json.write_text(json.dumps(CATALOGO, ensure_ascii=False), encoding="utf-8")
+    ruta_csv = tmp_path / "respuestas.csv"
+    ruta_csv.write_text("1. ¿Conoces el protocolo?;2. Valora el ambiente\nSí;7\nNo;4\nSí;9\n", encoding="utf-8")
+
+    for locale in ("es", "ca"):
+        for formato in ("lista", "tabla"):
+            html = vista_previa_generico(str(ruta_csv), str(ruta_json), "ACME", "Clima <2026>", 5, locale=locale,
+                                         formato=formato)
+            texto = CATALOGO["questions"][1]["questionTexts"][locale]
+            assert _escapar(texto) in html
+            assert "Clima &lt;2026&gt;" in html and "<2026>" not in html
+        docx = generar_informe_generico(str(ruta_csv), str(ruta_json), "ACME", "Clima <2026>", 5, locale=locale)
+        assert any(texto in parrafo for parrafo in parrafos_docx(docx))
+    assert lecturas == {"leer_respuestas_generico": 1}
+
+
+def test_idioma_no_disponible(tmp_path):
+    ruta_json = tmp_path / "preguntas.json"
+    ruta_json.write_text(json.dumps(CATALOGO, ensure_ascii=False), encoding="utf-8")
+    ruta_csv = tmp_path / "respuestas.csv"
+    ruta_csv.write_text("1. ¿Conoces el protocolo?;2. Valora el ambiente\nSí;7\n", encoding="utf-8")
+    with pytest.raises(ValueError):
+        vista_previa_generico(str(ruta_csv), str(ruta_json), "ACME", "Clima", 5, locale="fr")
@@ -0,0 +1,53 @@
+import hashlib
+import io
+import os
+
+import pandas as pd
+
+from cache_informes import hash_fuente
+from utils import leer_cabecera, leer_csv, volcar_subida
+
+CONTENIDO = ("1. ¿Cómo valoras, en general, el ambiente?;2. ¿Y la comunicación?\n"
+             "Sí;7\nNo;4\nSí;9\n").encode("utf-8")
+
+
+class Subida(io.BytesIO):
+    """Imitación del UploadedFile de Streamlit: un BytesIO con nombre."""
+    name = "ACME.csv"
+
+
+def test_volcado_igual_que_la_subida():
+    subida = Subida(CONTENIDO)
+    subida.seek(5)
+    datos = volcar_subida(subida)
+    try:
+        assert subida.tell() == 0
+        assert datos.name == "ACME.csv" and datos.ruta.endswith(".csv") and len(datos) == len(CONTENIDO)
+        assert datos.huella() == hashlib.sha256(CONTENIDO).hexdigest() == hash_fuente(Subida(CONTENIDO))
+        # Las comas del texto de las preguntas no confunden la detección del separador
+        assert datos.separador() == ";"
+        esperado = pd.read_csv(io.BytesIO(CONTENIDO), sep=";")
+        pd.testing.assert_frame_equal(leer_csv(datos), esperado)
+        assert leer_cabecera(datos) == list(esperado.columns)
+        # Interfaz de fichero de solo lectura
+        datos.seek(0)
+        assert datos.read(3) == CONTENIDO[:3] and datos.tell() == 3
+    finally:
+        datos.close()
+    assert not os.path.exists(datos.ruta)
+
+
+def test_volcado_vacio():
+    datos = volcar_subida(Subida(b""))
+    try:
+        assert len(datos) == 0 and datos.read() == b"" and datos.separador() == ","
+        assert datos.huella() == hashlib.sha256(b"").hexdigest()
+    finally:
+        datos.close()
+
+
+def test_fichero_en_disco_no_se_borra(tmp_path):
+    ruta = tmp_path / "ACME.csv"
+    ruta.write_bytes(CONTENIDO)
+    assert leer_cabecera(str(ruta)) == ["1. ¿Cómo valoras, en general, el ambiente?", "2. ¿Y la comunicación?"]
+    assert len(leer_csv(str(ruta))) == 3 and ruta.exists()
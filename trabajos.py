@@ -0,0 +1,165 @@
+import ast
+import glob
+import os
+from functools import lru_cache
+
+from Generar_informe_Burnout import generar_informe_burnout
+from Generar_informe_Satisfaccion import generar_informe_satisfaccion
+from Generar_informe_Generico import generar_informe_generico
+from catalogo_preguntas import cargar_catalogo
+from instrumentos import comprobar_instrumento
+from oleadas import fuente_respuestas
+from proveedores import marcadores_plantilla
+from utils import guardar_atomico
+
+# Tipos de informe que se pueden generar de forma desatendida. 'dependencias'
+# lista (admite comodines) los ficheros de código, plantilla, configuración y
+# medidas de los que depende el informe, además del CSV y los parámetros. De
+# cada .py cuentan también los módulos del proyecto que importa (ver
+# `modulos_proyecto`).
+INFORMES = {
+    "burnout": {
+        "generador": generar_informe_burnout,
+        "prefijo": "Burnout",
+        "plantilla": os.path.join("Burnout", "Plantillas", "plantilla_burnout.docx"),
+        "dependencias": [
+            "Generar_informe_Burnout.py",
+            os.path.join("Burnout", "Plantillas", "plantilla_burnout.docx"),
+            os.path.join("Burnout", "Dimensiones_CBB.json"),
+            os.path.join("Burnout", "alertas.json"),
+            os.path.join("Burnout", "Medidas", "*.json"),
+        ],
+    },
+    "satisfaccion": {
+        "generador": generar_informe_satisfaccion,
+        "prefijo": "Satisfaccion",
+        "plantilla": os.path.join("Satisfacción laboral", "Plantillas", "plantilla_satisfaccion_laboral.docx"),
+        "dependencias": [
+            "Generar_informe_Satisfaccion.py",
+            os.path.join("Satisfacción laboral", "Plantillas", "plantilla_satisfaccion_laboral.docx"),
+            os.path.join("Satisfacción laboral", "informacion_prl.json"),
+            os.path.join("Satisfacción laboral", "medidas.json"),
+        ],
+    },
+    "generico": {
+        "generador": generar_informe_generico,
+        "prefijo": "Generico",
+        "plantilla": os.path.join("Generico", "Plantillas", "plantilla_generico.docx"),
+        "dependencias": [
+            "Generar_informe_Generico.py",
+            os.path.join("Generico", "Plantillas", "plantilla_generico.docx"),
+        ],
+    },
+}
+
+
+def tipo_informe(tipo: str) -> dict:
+    if tipo not in INFORMES:
+        raise ValueError(f"Tipo de informe '{tipo}' no reconocido. Solo están: {list(INFORMES)}")
+    return INFORMES[tipo]
+
+
+@lru_cache(maxsize=64)
+def _importaciones(ruta: str, mtime: float) -> tuple:
+    with open(ruta, "r", encoding="utf-8") as f:
+        arbol = ast.parse(f.read(), ruta)
+    nombres = set()
+    for nodo in ast.walk(arbol):
+        if isinstance(nodo, ast.Import):
+            nombres.update(alias.name.split(".")[0] for alias in nodo.names)
+        elif isinstance(nodo, ast.ImportFrom) and nodo.module and nodo.level == 0:
+            nombres.add(nodo.module.split(".")[0])
+    return tuple(sorted(nombres))
+
+
+def modulos_proyecto(ruta: str) -> list[str]:
+    """
+    `ruta` y los módulos del proyecto (los .py de su misma carpeta) que importa,
+    directa o indirectamente. Las importaciones de cada fichero se cachean
+    mientras no cambie.
+    """
+    carpeta = os.path.dirname(ruta)
+    modulos, pendientes = set(), [ruta]
+    while pendientes:
+        actual = pendientes.pop()
+        if actual in modulos or not os.path.exists(actual):
+            continue
+        modulos.add(actual)
+        for nombre in _importaciones(actual, os.path.getmtime(actual)):
+            candidato = os.path.join(carpeta, nombre + ".py")
+            if os.path.exists(candidato):
+                pendientes.append(candidato)
+    return sorted(modulos)
+
+
+def ficheros_configuracion(tipo: str) -> list[str]:
+    """
+    Ficheros de código (con los módulos que importa), plantilla, configuración y
+    medidas de un tipo de informe (comodines expandidos).
+    """
+    ficheros = []
+    for patron in tipo_informe(tipo)["dependencias"]:
+        if patron.endswith(".py"):
+            ficheros.extend(f for f in modulos_proyecto(patron) if f not in ficheros)
+        else:
+            ficheros.extend(sorted(glob.glob(patron)) if glob.has_magic(patron) else [patron])
+    return ficheros
+
+
+def ejecutar_trabajo(trabajo: dict, cache=None, resultados: bool = False):
+    """
+    Genera el informe descrito por `trabajo` y devuelve el .docx en bytes o, con
+    `resultados`, (bytes, resultados.Resultados).
+
+    Estructura de `trabajo`
+    -----------------------
+    {
+        "informe": "burnout" | "satisfaccion" | "generico",
+        "csv": ruta del CSV de respuestas (o lista, carpeta o comodín con
+               varias oleadas de la misma empresa, que se unen sin duplicados),
+        "empresa": nombre de la empresa,
+        "invitados": número de personas invitadas,
+        "parametros": {...}   # resto de argumentos del generador
+                              # (limite, num_medidas, json_source, titulo, locale...)
+    }
+
+    Con `cache` (un `cache_informes.CacheInformes`) se reutiliza el .docx de una
+    ejecución anterior con exactamente las mismas entradas.
+    """
+    csv_source = fuente_respuestas(trabajo["csv"])
+    # Un CSV de otro cuestionario se rechaza por su cabecera, antes de leerlo
+    comprobar_instrumento(trabajo["informe"], csv_source)
+    argumentos = dict(
+        csv_source=csv_source,
+        empresa=trabajo["empresa"],
+        invitados=trabajo.get("invitados", 0),
+        **trabajo.get("parametros", {}),
+    )
+    if cache is not None:
+        if resultados:
+            return cache.generar_resultados(trabajo["informe"], **argumentos)
+        return cache.generar(trabajo["informe"], **argumentos)
+    if resultados:
+        return tipo_informe(trabajo["informe"])["generador"](**argumentos, resultados=True)
+    return tipo_informe(trabajo["informe"])["generador"](**argumentos)
+
+
+def ruta_salida(trabajo: dict, carpeta: str) -> str:
+    """Ruta del .docx de un trabajo: <carpeta>/Informe_<Tipo>_<empresa>.docx."""
+    prefijo = tipo_informe(trabajo["informe"])["prefijo"]
+    return os.path.join(carpeta, f"Informe_{prefijo}_{trabajo['empresa']}.docx")
+
+
+def precalentar(trabajos=()):
+    """
+    Deja cargado en el proceso lo que se puede reutilizar entre informes:
+    los marcadores de todas las plantillas y los catálogos de preguntas de
+    los trabajos genéricos indicados.
+    """
+    for tipo in INFORMES.values():
+        if os.path.exists(tipo["plantilla"]):
+            marcadores_plantilla(tipo["plantilla"])
+    for trabajo in trabajos:
+        json_source = trabajo.get("parametros", {}).get("json_source")
+        if json_source and os.path.exists(json_source):
+            cargar_catalogo(json_source)
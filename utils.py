@@ -1,15 +1,27 @@
+import csv
+import mmap
 import os
+import shutil
+import tempfile
+import weakref
 import pandas as pd
 from docx import Document
 from docx.oxml import OxmlElement
 from docx.oxml.ns import qn
 import glob
 from datetime import datetime
+import hashlib
 import json
 import random
+import zipfile
+from io import BytesIO
 from copy import deepcopy
 from docx.oxml import OxmlElement
 from docx.oxml.ns import qn
+from lectura_xlsx import FIRMA_ZIP, es_xlsx, leer_xlsx
+
+# Extensiones de los ficheros de respuestas que se aceptan (CSV y exportaciones de Excel)
+EXTENSIONES_RESPUESTAS = (".csv", ".xlsx")
 
 def load_csv(source) -> pd.DataFrame:
     """
@@ -33,4 +45,226 @@ def df_a_reemplazos(df_stats: pd.DataFrame) -> dict:
     for dim, row in df_stats.iterrows():
         reemplazos[f"MEDIA_{dim}"] = row['mean']
         reemplazos[f"STD_{dim}"] = row['std']
-    return reemplazos
\ No newline at end of file
+        if 'p25' in row:
+            reemplazos[f"P25_{dim}"] = row['p25']
+            reemplazos[f"P75_{dim}"] = row['p75']
+        if 'ic_inf' in row:
+            reemplazos[f"IC_INF_{dim}"] = row['ic_inf']
+            reemplazos[f"IC_SUP_{dim}"] = row['ic_sup']
+    return reemplazos
+
+# Fecha que se graba en todas las entradas de los .zip/.docx generados, para que
+# el mismo contenido produzca siempre los mismos bytes (cacheables y deduplicables)
+FECHA_ZIP = (1980, 1, 1, 0, 0, 0)
+
+def empaquetar_zip(ficheros: dict) -> bytes:
+    """
+    Empaqueta en memoria varios ficheros {nombre: bytes} en un único .zip
+    y devuelve sus bytes (p. ej. las versiones de un informe en varios idiomas).
+    """
+    buffer = BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as zf:
+        for nombre, contenido in ficheros.items():
+            zf.writestr(zipfile.ZipInfo(nombre, FECHA_ZIP), contenido, zipfile.ZIP_DEFLATED)
+    return buffer.getvalue()
+
+def docx_a_bytes(doc) -> bytes:
+    """
+    Guarda un docx.Document en memoria y devuelve sus bytes de forma determinista:
+    python-docx graba la hora actual en cada entrada del paquete, así que se
+    reescriben todas con FECHA_ZIP sin tocar su contenido ni su orden.
+    """
+    original = BytesIO()
+    doc.save(original)
+    original.seek(0)
+    return empaquetar_zip({
+        info.filename: contenido
+        for info, contenido in _entradas_zip(original)
+    })
+
+def _entradas_zip(buffer):
+    with zipfile.ZipFile(buffer) as zf:
+        for info in zf.infolist():
+            yield info, zf.read(info)
+
+def huella_respuestas(respuestas: pd.DataFrame):
+    """
+    Hash SHA-256 (sin cerrar) del contenido de las respuestas. Se puede pasar a
+    `semilla_derivada` en lugar de las respuestas para no volver a recorrerlas.
+    """
+    return hashlib.sha256(pd.util.hash_pandas_object(respuestas, index=True).to_numpy().tobytes())
+
+def semilla_derivada(respuestas, *partes) -> int:
+    """
+    Semilla de 64 bits derivada del contenido de las respuestas (o de su
+    `huella_respuestas`) y del resto de entradas del informe (empresa,
+    parámetros...). Las mismas entradas dan siempre la misma semilla y, con ella,
+    la misma selección de medidas y el mismo bootstrap.
+    """
+    h = huella_respuestas(respuestas) if isinstance(respuestas, pd.DataFrame) else respuestas.copy()
+    h.update(json.dumps(partes, ensure_ascii=False, default=str).encode("utf-8"))
+    return int.from_bytes(h.digest()[:8], "little")
+
+def _liberar(mapa, fichero, ruta_temporal):
+    if mapa is not None:
+        mapa.close()
+    fichero.close()
+    if ruta_temporal and os.path.exists(ruta_temporal):
+        os.remove(ruta_temporal)
+
+class DatosMapeados:
+    """
+    Fichero en disco proyectado en memoria (mmap) que se comparte, sin copias,
+    entre el cálculo del hash, la detección del separador y la lectura del CSV.
+
+    Se comporta como un fichero binario de solo lectura (read/seek/tell), así que
+    puede pasarse donde antes se pasaba el UploadedFile de Streamlit. Si es un
+    volcado temporal (`volcar_subida`), el fichero se borra al cerrarlo o al
+    liberarse el objeto.
+    """
+
+    def __init__(self, ruta: str, temporal: bool = False, nombre: str = None):
+        self.ruta = ruta
+        self.name = nombre or os.path.basename(ruta)
+        self._fichero = open(ruta, "rb")
+        tamano = os.fstat(self._fichero.fileno()).st_size
+        # mmap no admite ficheros vacíos
+        self._mapa = mmap.mmap(self._fichero.fileno(), 0, access=mmap.ACCESS_READ) if tamano else None
+        self._huella = None
+        self._cerrar = weakref.finalize(self, _liberar, self._mapa, self._fichero, ruta if temporal else None)
+
+    def __len__(self):
+        return len(self._mapa) if self._mapa is not None else 0
+
+    def huella(self) -> str:
+        """Hash SHA-256 del contenido (se calcula una sola vez, directamente sobre el mapa)."""
+        if self._huella is None:
+            h = hashlib.sha256()
+            if self._mapa is not None:
+                with memoryview(self._mapa) as vista:
+                    h.update(vista)
+            self._huella = h.hexdigest()
+        return self._huella
+
+    def separador(self, n_lineas: int = 5) -> str:
+        """
+        Separador del CSV detectado con csv.Sniffer, como pandas con sep=None, pero
+        sobre las primeras `n_lineas` en lugar de solo la cabecera (los encabezados
+        con comas en el texto de la pregunta no confunden la detección).
+        """
+        if self._mapa is None:
+            return ","
+        fin = -1
+        for _ in range(n_lineas):
+            siguiente = self._mapa.find(b"\n", fin + 1, 1 << 20)
+            if siguiente < 0:
+                break
+            fin = siguiente
+        texto = self._mapa[:fin if fin >= 0 else 1 << 20].decode("utf-8-sig", errors="replace")
+        return csv.Sniffer().sniff(texto).delimiter
+
+    def leer_csv(self, sep=None, **kwargs) -> pd.DataFrame:
+        """
+        Lee el CSV con el motor C de pandas sobre el fichero proyectado en memoria
+        (o, si es un .xlsx, su primera hoja en streaming).
+        """
+        if self._mapa is not None and self._mapa[:len(FIRMA_ZIP)] == FIRMA_ZIP:
+            return leer_xlsx(self.ruta)
+        return pd.read_csv(self.ruta, sep=sep or self.separador(), memory_map=True, **kwargs)
+
+    def cabecera(self, sep=None) -> list:
+        """Nombres de las columnas (los mismos que daría `leer_csv`), sin leer el resto del fichero."""
+        if self._mapa is not None and self._mapa[:len(FIRMA_ZIP)] == FIRMA_ZIP:
+            return list(leer_xlsx(self.ruta, max_filas=0).columns)
+        return list(pd.read_csv(self.ruta, sep=sep or self.separador(), nrows=0).columns)
+
+    # Interfaz de fichero binario de solo lectura
+    def read(self, n: int = -1) -> bytes:
+        return self._mapa.read(n) if self._mapa is not None else b""
+
+    def seek(self, posicion: int, desde: int = 0) -> int:
+        if self._mapa is not None:
+            self._mapa.seek(posicion, desde)
+        return self.tell()
+
+    def tell(self) -> int:
+        return self._mapa.tell() if self._mapa is not None else 0
+
+    def close(self):
+        self._cerrar()
+
+def volcar_subida(subida, bloque: int = 1 << 20) -> DatosMapeados:
+    """
+    Vuelca una subida (UploadedFile de Streamlit u otro file-like) a un fichero
+    temporal, por bloques, y la devuelve proyectada en memoria.
+    """
+    sufijo = os.path.splitext(getattr(subida, "name", "") or "")[1]
+    subida.seek(0)
+    with tempfile.NamedTemporaryFile(delete=False, suffix=sufijo) as temporal:
+        shutil.copyfileobj(subida, temporal, bloque)
+    subida.seek(0)
+    return DatosMapeados(temporal.name, temporal=True, nombre=getattr(subida, "name", None))
+
+def guardar_atomico(ruta: str, datos: bytes):
+    """
+    Escribe `datos` en `ruta` a través de un fichero temporal de la misma carpeta
+    y `os.replace`, de modo que nunca queda a la vista un informe a medio escribir.
+    """
+    carpeta = os.path.dirname(ruta) or "."
+    os.makedirs(carpeta, exist_ok=True)
+    descriptor, temporal = tempfile.mkstemp(dir=carpeta, suffix=".tmp")
+    try:
+        with os.fdopen(descriptor, "wb") as f:
+            f.write(datos)
+        os.replace(temporal, ruta)
+    except BaseException:
+        if os.path.exists(temporal):
+            os.remove(temporal)
+        raise
+
+def leer_csv(source, sep=None) -> pd.DataFrame:
+    """
+    Lee un CSV de respuestas desde un DatosMapeados, unas Oleadas, una ruta o un file-like.
+    Con `sep=None` el separador se detecta a partir de la primera línea. Un
+    DataFrame (respuestas ya leídas, p. ej. una muestra) se devuelve tal cual.
+
+    Las rutas y los volcados se leen proyectados en memoria con el motor C;
+    los file-like se leen como hasta ahora (motor python). Las exportaciones
+    .xlsx (se reconocen por su contenido) se leen en streaming con `leer_xlsx`.
+    """
+    if isinstance(source, pd.DataFrame):
+        return source
+    if hasattr(source, "leer_csv"):  # DatosMapeados, oleadas.Oleadas
+        return source.leer_csv(sep)
+    if isinstance(source, (str, os.PathLike)):
+        datos = DatosMapeados(source)
+        try:
+            return datos.leer_csv(sep)
+        finally:
+            datos.close()
+    if es_xlsx(source):
+        return leer_xlsx(source)
+    return pd.read_csv(source, sep=sep, engine="python")
+
+def leer_cabecera(source, sep=None) -> list:
+    """
+    Nombres de las columnas de un fichero de respuestas (las mismas fuentes que
+    `leer_csv`) leyendo solo su primera fila.
+    """
+    if isinstance(source, pd.DataFrame):
+        return list(source.columns)
+    if hasattr(source, "cabecera"):  # DatosMapeados, oleadas.Oleadas
+        return source.cabecera(sep)
+    if isinstance(source, (str, os.PathLike)):
+        datos = DatosMapeados(source)
+        try:
+            return datos.cabecera(sep)
+        finally:
+            datos.close()
+    posicion = source.tell()
+    try:
+        if es_xlsx(source):
+            return list(leer_xlsx(source, max_filas=0).columns)
+        return list(pd.read_csv(source, sep=sep, engine="python", nrows=0).columns)
+    finally:
+        source.seek(posicion)
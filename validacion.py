@@ -0,0 +1,214 @@
+"""
+Validación de las respuestas de un CSV antes de calcular nada.
+
+Todas las celdas se comprueban contra el vocabulario y el rango del cuestionario
+en una sola pasada: `pd.factorize` reduce la matriz de respuestas a códigos
+categóricos, cada valor distinto (unas pocas decenas, aunque haya miles de filas)
+se decodifica una vez y el resultado se reparte a todas las celdas indexando por
+código. Las filas con alguna respuesta no reconocida quedan en cuarentena con un
+diagnóstico por columna y el informe continúa con las demás; si el fichero no es
+aprovechable se lanza ValueError antes de las fases costosas.
+"""
+import numbers
+
+import numpy as np
+import pandas as pd
+
+from faltantes import enteros_enmascarados
+
+# Fracción máxima de filas en cuarentena para seguir adelante con el informe
+MAX_CUARENTENA = 0.5
+
+# Número de valores no reconocidos que se muestran por columna en el diagnóstico
+MAX_EJEMPLOS = 5
+
+# Estado de cada valor distinto
+VALIDO, VACIO, INVALIDO = 0, 1, 2
+
+
+def minusculas(texto: str) -> str:
+    """Normalización sin distinguir mayúsculas ni espacios de los extremos."""
+    return texto.strip().lower()
+
+
+class Decodificador:
+    """
+    Función texto → valor numérico (o None si no se reconoce) para un vocabulario
+    {respuesta: valor}. El texto se normaliza con `normalizar` antes de buscarlo;
+    los textos numéricos ('3') se aceptan como su número.
+
+    Es una clase (y no una función anidada) para poder enviarla a otros procesos.
+    """
+
+    def __init__(self, vocabulario: dict, normalizar=str.strip):
+        self.normalizar = normalizar
+        self.vocabulario = {normalizar(texto): valor for texto, valor in vocabulario.items()}
+
+    def __call__(self, texto: str):
+        texto = self.normalizar(texto)
+        if texto in self.vocabulario:
+            return self.vocabulario[texto]
+        try:
+            return float(texto)
+        except ValueError:
+            return None
+
+
+def decodificador(vocabulario: dict, normalizar=str.strip) -> Decodificador:
+    return Decodificador(vocabulario, normalizar)
+
+
+def _decodificar_valor(valor, decodificar, minimo, maximo):
+    """(estado, valor numérico) de un valor distinto de las respuestas."""
+    if isinstance(valor, str):
+        if not valor.strip():
+            return VACIO, np.nan
+        valor = decodificar(valor)
+    if isinstance(valor, bool) or not isinstance(valor, numbers.Real):
+        return INVALIDO, np.nan
+    valor = float(valor)
+    if np.isnan(valor):
+        return VACIO, np.nan
+    if not valor.is_integer() or not minimo <= valor <= maximo:
+        return INVALIDO, np.nan
+    return VALIDO, valor
+
+
+class Evaluacion:
+    """
+    Resultado de evaluar un bloque de respuestas (todas las filas o un trozo):
+    valores numéricos de cada celda, filas con alguna respuesta no reconocida y,
+    por columna, recuentos de vacías y no reconocidas y {valor: veces} de estas.
+    """
+    __slots__ = ("valores", "malas", "vacias", "invalidas", "ejemplos")
+
+    def __init__(self, valores, malas, vacias, invalidas, ejemplos):
+        self.valores = valores
+        self.malas = malas
+        self.vacias = vacias
+        self.invalidas = invalidas
+        self.ejemplos = ejemplos
+
+
+def evaluar_respuestas(respuestas: pd.DataFrame, columnas, decodificar, minimo: int, maximo: int) -> Evaluacion:
+    """Decodifica y clasifica todas las celdas de `columnas` en una sola pasada por códigos categóricos."""
+    n = len(respuestas)
+    codigos, distintos = pd.factorize(respuestas[columnas].to_numpy(dtype=object).ravel())
+    codigos = codigos.reshape(n, len(columnas))
+
+    # Cada valor distinto se decodifica una sola vez; el último hueco es el de las celdas vacías (-1)
+    decodificados = [_decodificar_valor(valor, decodificar, minimo, maximo) for valor in distintos]
+    estados = np.array([estado for estado, _ in decodificados] + [VACIO], dtype=np.int8)[codigos]
+    valores = np.array([valor for _, valor in decodificados] + [np.nan], dtype=float)[codigos]
+
+    invalidas = estados == INVALIDO
+    ejemplos = []
+    for j in range(len(columnas)):
+        distintos_malos, cuenta = np.unique(codigos[invalidas[:, j], j], return_counts=True)
+        ejemplos.append({distintos[k]: int(c) for k, c in zip(distintos_malos, cuenta)})
+    return Evaluacion(valores, invalidas.any(axis=1), (estados == VACIO).sum(axis=0),
+                      invalidas.sum(axis=0), ejemplos)
+
+
+def diagnostico_columnas(columnas, vacias, invalidas, ejemplos) -> pd.DataFrame:
+    """Tabla por columna con las vacías, las no reconocidas y los valores no reconocidos más frecuentes."""
+    textos = []
+    for cuenta in ejemplos:
+        frecuentes = sorted(cuenta.items(), key=lambda par: -par[1])[:MAX_EJEMPLOS]
+        textos.append(", ".join(f"{valor!r} x{veces}" for valor, veces in frecuentes))
+    return pd.DataFrame({"vacias": vacias, "invalidas": invalidas, "ejemplos": textos}, index=list(columnas))
+
+
+class Validacion:
+    """
+    Resultado de `validar_respuestas`.
+
+    - respuestas: filas válidas con los textos originales (None si el fichero se
+      ha leído por bloques o por columnas y no se han conservado).
+    - valores: las filas válidas con cada respuesta convertida a su valor numérico
+      (int64; si hay respuestas vacías, enteros con máscara, ver faltantes.py).
+    - cuarentena: filas descartadas, con los textos originales.
+    - diagnostico: por columna, número de respuestas vacías y no reconocidas y
+      ejemplos de los valores no reconocidos.
+    - plan: plan de lectura con el que se ha obtenido (ver planificador.py), si lo hay.
+    """
+
+    def __init__(self, respuestas, valores, cuarentena, diagnostico, plan=None):
+        self.respuestas = respuestas
+        self.valores = valores
+        self.cuarentena = cuarentena
+        self.diagnostico = diagnostico
+        self.plan = plan
+
+    def resumen(self) -> str:
+        """Texto con el plan de lectura, las filas en cuarentena y las columnas que las han causado."""
+        total = len(self.valores) + len(self.cuarentena)
+        lineas = [str(self.plan)] if self.plan is not None else []
+        lineas.append(f"{len(self.cuarentena)} de {total} respuestas en cuarentena")
+        for columna, fila in self.diagnostico[self.diagnostico["invalidas"] > 0].iterrows():
+            lineas.append(f"  - {columna}: {fila['invalidas']} no reconocidas ({fila['ejemplos']})")
+        return "\n".join(lineas)
+
+
+def comprobar_columnas(n_columnas_csv: int, n_columnas: int = None):
+    if n_columnas is not None and n_columnas_csv < n_columnas:
+        raise ValueError(f"El CSV tiene {n_columnas_csv} columnas y el cuestionario necesita "
+                         f"{n_columnas}: ¿es el fichero del informe correcto?")
+
+
+def componer_validacion(valores: np.ndarray, indice, columnas, malas: np.ndarray, cuarentena: pd.DataFrame,
+                        diagnostico: pd.DataFrame, respuestas=None, max_cuarentena: float = MAX_CUARENTENA,
+                        plan=None) -> Validacion:
+    """
+    Monta la Validacion a partir de los valores de las filas válidas y aplica el
+    límite de cuarentena (ValueError si se supera; aviso por pantalla si no).
+    """
+    if len(malas) == 0:
+        raise ValueError("El CSV no contiene ninguna respuesta")
+    if np.isnan(valores).any():
+        limpias = enteros_enmascarados(valores, indice, list(columnas))
+    else:
+        limpias = pd.DataFrame(valores, index=indice, columns=list(columnas)).astype("int64")
+    validacion = Validacion(respuestas, limpias, cuarentena, diagnostico, plan)
+
+    if malas.any():
+        if malas.mean() > max_cuarentena:
+            raise ValueError(f"Demasiadas respuestas no reconocidas en el CSV.\n{validacion.resumen()}")
+        print(validacion.resumen())
+    return validacion
+
+
+def validar_respuestas(respuestas: pd.DataFrame, decodificar, minimo: int, maximo: int,
+                       columnas=None, n_columnas: int = None,
+                       max_cuarentena: float = MAX_CUARENTENA, plan=None) -> Validacion:
+    """
+    Comprueba todas las respuestas contra el vocabulario (`decodificar`, texto →
+    valor o None) y el rango entero [minimo, maximo] del cuestionario.
+
+    Parámetros
+    ----------
+    respuestas : pd.DataFrame
+        CSV leído (una fila por encuestado).
+    columnas : list | None
+        Columnas con respuestas a validar (por defecto, todas).
+    n_columnas : int | None
+        Número mínimo de columnas que debe tener el CSV.
+    max_cuarentena : float
+        Fracción máxima de filas que se pueden descartar.
+    plan : planificador.Plan | None
+        Plan de lectura con el que se ha leído `respuestas` (se guarda en la Validacion).
+
+    Las celdas vacías no invalidan la fila (quedan enmascaradas). Lanza ValueError
+    si el CSV no tiene respuestas, le faltan columnas o se descartarían más de
+    `max_cuarentena` de las filas, con el diagnóstico en el mensaje.
+    """
+    comprobar_columnas(respuestas.shape[1], n_columnas)
+    columnas = list(respuestas.columns) if columnas is None else list(columnas)
+    if respuestas.empty:
+        raise ValueError("El CSV no contiene ninguna respuesta")
+
+    evaluacion = evaluar_respuestas(respuestas, columnas, decodificar, minimo, maximo)
+    malas = evaluacion.malas
+    diagnostico = diagnostico_columnas(columnas, evaluacion.vacias, evaluacion.invalidas, evaluacion.ejemplos)
+    return componer_validacion(evaluacion.valores[~malas], respuestas.index[~malas], columnas, malas,
+                               respuestas[malas], diagnostico, respuestas[~malas], max_cuarentena, plan)
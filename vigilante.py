@@ -0,0 +1,314 @@
+"""
+Vigilante de carpetas: genera automáticamente el informe de cada CSV que se
+deja (o se actualiza) en las carpetas configuradas.
+
+Sustituye el flujo de `seleccionar_csv` + `exec.sh`/`exec.bat` + `input()`:
+el proceso queda en marcha con plantillas y catálogos ya cargados y cada
+informe aparece en la carpeta de salida unos segundos después de la exportación.
+
+Uso
+---
+    python vigilante.py vigilante.json [--sondeo]
+
+Configuración (JSON)
+--------------------
+{
+    "espera": 2.0,                      # segundos sin cambios antes de procesar un CSV
+    "estado": ".vigilante_estado.json", # huellas de los CSV ya procesados
+    "carpetas": [
+        {
+            "ruta": "./Burnout/Respuestas",
+            "informe": "burnout",
+            "salida": "./Burnout/Informes generados",
+            "invitados": 50,
+            "parametros": {"limite": 10}
+        },
+        {
+            "ruta": "./Generico/Respuestas",
+            "informe": "generico",
+            "salida": "./Generico/Informes generados",
+            "parametros": {"json_source": "./Generico/Aspectesorganitzatius.json",
+                           "titulo": "Aspectes organitzatius", "locale": "ca"}
+        }
+    ]
+}
+
+Además de CSV se procesan las exportaciones .xlsx. El nombre de la empresa es,
+por defecto, el nombre del fichero sin extensión. Si junto al fichero hay un JSON
+con el mismo nombre (p. ej. `ACME.csv` y `ACME.json`), sus claves `empresa`, `invitados` y `parametros` tienen prioridad sobre las de la carpeta.
+"""
+import argparse
+import hashlib
+import json
+import os
+import threading
+import time
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:  # sin watchdog se usa siempre el sondeo
+    FileSystemEventHandler = object
+    Observer = None
+
+from cache_informes import CacheInformes
+from trabajos import ejecutar_trabajo, guardar_atomico, precalentar, ruta_salida, tipo_informe
+from utils import EXTENSIONES_RESPUESTAS
+
+# Segundos sin eventos ni cambios de tamaño para dar un CSV por terminado de escribir
+ESPERA_ESTABLE = 2.0
+
+# Cada cuánto se revisan los pendientes (y las carpetas, en modo sondeo)
+INTERVALO_SONDEO = 1.0
+
+
+def huella_fichero(ruta: str, bloque: int = 1 << 20) -> str:
+    """Hash SHA-256 del contenido de un fichero, leído por bloques."""
+    h = hashlib.sha256()
+    with open(ruta, "rb") as f:
+        for trozo in iter(lambda: f.read(bloque), b""):
+            h.update(trozo)
+    return h.hexdigest()
+
+
+def _firma(ruta: str):
+    """(tamaño, mtime) del fichero, o None si ha desaparecido."""
+    try:
+        info = os.stat(ruta)
+    except OSError:
+        return None
+    return info.st_size, info.st_mtime_ns
+
+
+def leer_configuracion(ruta: str) -> dict:
+    with open(ruta, "r", encoding="utf-8") as f:
+        configuracion = json.load(f)
+
+    base = os.path.dirname(os.path.abspath(ruta))
+    carpetas = []
+    for carpeta in configuracion.get("carpetas", []):
+        tipo_informe(carpeta["informe"])
+        carpetas.append({
+            **carpeta,
+            "ruta": os.path.abspath(carpeta["ruta"]),
+            "salida": os.path.abspath(carpeta.get("salida", carpeta["ruta"])),
+        })
+    if not carpetas:
+        raise ValueError(f"La configuración {ruta} no define ninguna carpeta a vigilar")
+
+    return {
+        "espera": float(configuracion.get("espera", ESPERA_ESTABLE)),
+        "estado": os.path.join(base, configuracion.get("estado", ".vigilante_estado.json")),
+        "carpetas": carpetas,
+    }
+
+
+class _Manejador(FileSystemEventHandler):
+    """Traslada los eventos del sistema de ficheros al vigilante."""
+
+    def __init__(self, vigilante):
+        self.vigilante = vigilante
+
+    def on_created(self, event):
+        if not event.is_directory:
+            self.vigilante.notificar(event.src_path)
+
+    def on_modified(self, event):
+        if not event.is_directory:
+            self.vigilante.notificar(event.src_path)
+
+    def on_moved(self, event):
+        if not event.is_directory:
+            self.vigilante.notificar(event.dest_path)
+
+
+class Vigilante:
+    """
+    Vigila las carpetas configuradas y genera el informe de cada CSV nuevo o modificado.
+
+    - Los cambios llegan por notificación del sistema (watchdog) o, si no está
+      disponible o se pide `sondeo=True`, revisando las carpetas periódicamente.
+    - Un CSV solo se procesa cuando lleva `espera` segundos sin eventos y con el
+      mismo tamaño y fecha (evita leer ficheros a medio copiar).
+    - Se calcula la huella SHA-256 del contenido: si coincide con la del último
+      informe generado para ese CSV no se hace nada (guardados sin cambios, copias
+      repetidas, reinicios del vigilante).
+    """
+
+    def __init__(self, configuracion: dict, sondeo: bool = False):
+        self.carpetas = configuracion["carpetas"]
+        self.espera = configuracion["espera"]
+        self.ruta_estado = configuracion["estado"]
+        self.sondeo = sondeo or Observer is None
+        self.huellas = self._cargar_estado()
+        self._pendientes = {}
+        self._firmas = {}
+        self._cerrojo = threading.Lock()
+        self._observador = None
+        self.cache = CacheInformes()
+
+    # ------------------------------------------------------------------ estado
+    def _cargar_estado(self) -> dict:
+        if not os.path.exists(self.ruta_estado):
+            return {}
+        with open(self.ruta_estado, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def _guardar_estado(self):
+        datos = json.dumps(self.huellas, ensure_ascii=False, indent=2).encode("utf-8")
+        guardar_atomico(self.ruta_estado, datos)
+
+    # ---------------------------------------------------------------- eventos
+    def _carpeta_de(self, ruta: str):
+        directorio = os.path.dirname(os.path.abspath(ruta))
+        for carpeta in self.carpetas:
+            if carpeta["ruta"] == directorio:
+                return carpeta
+        return None
+
+    def notificar(self, ruta: str):
+        """Marca un CSV como pendiente; cada nuevo evento reinicia su espera."""
+        if not ruta.lower().endswith(EXTENSIONES_RESPUESTAS) or self._carpeta_de(ruta) is None:
+            return
+        ruta = os.path.abspath(ruta)
+        with self._cerrojo:
+            self._pendientes[ruta] = (time.monotonic(), _firma(ruta))
+
+    def sondear(self):
+        """Revisa las carpetas y notifica los CSV nuevos o con tamaño/fecha distintos."""
+        for carpeta in self.carpetas:
+            if not os.path.isdir(carpeta["ruta"]):
+                continue
+            for entrada in os.scandir(carpeta["ruta"]):
+                if not entrada.is_file() or not entrada.name.lower().endswith(EXTENSIONES_RESPUESTAS):
+                    continue
+                firma = _firma(entrada.path)
+                if self._firmas.get(entrada.path) != firma:
+                    self._firmas[entrada.path] = firma
+                    self.notificar(entrada.path)
+
+    def _listos(self) -> list[str]:
+        """CSV pendientes que ya llevan `espera` segundos estables."""
+        ahora = time.monotonic()
+        listos = []
+        with self._cerrojo:
+            for ruta, (instante, firma) in list(self._pendientes.items()):
+                if ahora - instante < self.espera:
+                    continue
+                actual = _firma(ruta)
+                if actual is None:
+                    del self._pendientes[ruta]
+                elif actual != firma:
+                    # Sigue creciendo: se vuelve a esperar
+                    self._pendientes[ruta] = (ahora, actual)
+                else:
+                    del self._pendientes[ruta]
+                    listos.append(ruta)
+        return listos
+
+    # ---------------------------------------------------------------- trabajo
+    def trabajo_para(self, ruta: str) -> dict:
+        """Construye el trabajo de un CSV a partir de su carpeta y de su JSON acompañante."""
+        carpeta = self._carpeta_de(ruta)
+        nombre = os.path.splitext(os.path.basename(ruta))[0]
+        trabajo = {
+            "informe": carpeta["informe"],
+            "csv": ruta,
+            "empresa": carpeta.get("empresa", nombre),
+            "invitados": carpeta.get("invitados", 0),
+            "parametros": dict(carpeta.get("parametros", {})),
+        }
+
+        acompanante = os.path.splitext(ruta)[0] + ".json"
+        if os.path.exists(acompanante):
+            with open(acompanante, "r", encoding="utf-8") as f:
+                extra = json.load(f)
+            trabajo["empresa"] = extra.get("empresa", trabajo["empresa"])
+            trabajo["invitados"] = extra.get("invitados", trabajo["invitados"])
+            trabajo["parametros"].update(extra.get("parametros", {}))
+        return trabajo
+
+    def procesar(self, ruta: str):
+        try:
+            huella = huella_fichero(ruta)
+        except OSError as error:
+            print(f"No se pudo leer {ruta}: {error}")
+            return
+        if self.huellas.get(ruta) == huella:
+            return
+
+        trabajo = self.trabajo_para(ruta)
+        salida = ruta_salida(trabajo, self._carpeta_de(ruta)["salida"])
+        inicio = time.perf_counter()
+        try:
+            guardar_atomico(salida, ejecutar_trabajo(trabajo, self.cache))
+        except Exception as error:
+            # El CSV se reintentará en cuanto vuelva a cambiar
+            print(f"Error al generar el informe de {ruta}: {error}")
+            return
+
+        self.huellas[ruta] = huella
+        self._guardar_estado()
+        print(f"Informe generado en {time.perf_counter() - inicio:.1f} s: {salida}")
+
+    # ------------------------------------------------------------------ bucle
+    def iniciar(self):
+        precalentar([{"parametros": c.get("parametros", {})} for c in self.carpetas])
+
+        if not self.sondeo:
+            try:
+                self._observador = Observer()
+                manejador = _Manejador(self)
+                for carpeta in self.carpetas:
+                    os.makedirs(carpeta["ruta"], exist_ok=True)
+                    self._observador.schedule(manejador, carpeta["ruta"], recursive=False)
+                self._observador.start()
+            except OSError as error:
+                print(f"No se pueden recibir notificaciones ({error}); se vigilará por sondeo")
+                self._observador = None
+                self.sondeo = True
+
+        # Los CSV que ya estaban en las carpetas también se revisan al arrancar
+        self.sondear()
+        modo = "sondeo" if self.sondeo else "notificaciones"
+        print(f"Vigilando {len(self.carpetas)} carpeta(s) por {modo}. Ctrl+C para salir.")
+
+    def paso(self):
+        """Una iteración del bucle: sondeo (si procede) y procesado de los CSV listos."""
+        if self.sondeo:
+            self.sondear()
+        for ruta in self._listos():
+            self.procesar(ruta)
+
+    def detener(self):
+        if self._observador is not None:
+            self._observador.stop()
+            self._observador.join()
+            self._observador = None
+
+    def ejecutar(self):
+        self.iniciar()
+        try:
+            while True:
+                self.paso()
+                time.sleep(INTERVALO_SONDEO)
+        except KeyboardInterrupt:
+            print("Vigilante detenido")
+        finally:
+            self.detener()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Genera informes automáticamente al dejar CSV en carpetas vigiladas.")
+    parser.add_argument("configuracion", nargs="?", default="vigilante.json",
+                        help="JSON con las carpetas a vigilar (por defecto vigilante.json)")
+    parser.add_argument("--sondeo", action="store_true",
+                        help="Revisar las carpetas periódicamente en lugar de usar notificaciones "
+                             "(unidades de red, sistemas sin inotify/FSEvents)")
+    args = parser.parse_args()
+
+    Vigilante(leer_configuracion(args.configuracion), sondeo=args.sondeo).ejecutar()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,360 @@
+"""
+Vista previa en HTML del contenido de un informe, sin montar el .docx.
+
+La aplicación la vuelve a pintar cada vez que cambia un parámetro (límite de
+alertas, número de medidas, idioma, título...), así que todo lo que no depende
+de ese parámetro se reutiliza:
+
+- Las respuestas de cada fichero se leen y se validan una sola vez y se guardan,
+  junto a un RegistroProveedores propio, en una caché LRU en memoria
+  (MAX_ESTADOS ficheros, por contenido).
+- En cada vista previa los proveedores del informe se vuelven a registrar con los
+  parámetros actuales: el registro solo descarta (y recalcula) los datos que
+  dependen de los parámetros que han cambiado. Cambiar el límite de Burnout
+  vuelve a sortear las medidas, pero no vuelve a agrupar ni a describir las respuestas.
+- La plantilla se recorre una sola vez (mientras no cambie en disco) y se
+  reduce a párrafos con sus marcadores; pintarla es sustituir textos.
+
+Los marcadores se sustituyen como en `replace_bookmark_pair` (incluidos los
+valores de varias líneas, que ocupan varios párrafos) y las tablas TABLA_* y las
+preguntas de Genérico se pintan con los mismos datos que el .docx. Los gráficos,
+las imágenes y el índice se omiten.
+
+Ejemplo de uso
+--------------
+>>> html = vista_previa_burnout("ACME.csv", "ACME", 50, limite=12)
+"""
+import html
+import json
+import os
+import re
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+
+from docx import Document
+from docx.oxml.ns import qn
+from docx.text.paragraph import Paragraph
+
+from cache_informes import hash_fuente
+from catalogo_preguntas import cargar_catalogo
+from Generar_informe_Burnout import leer_respuestas_cbb, registrar_proveedores_burnout, tablas_burnout
+from Generar_informe_Generico import (contenido_pregunta, informacion_generico, leer_respuestas_generico,
+                                     resumir_generico, tabla_generico)
+from Generar_informe_Satisfaccion import (leer_respuestas_satisfaccion, registrar_proveedores_satisfaccion,
+                                          tablas_satisfaccion)
+from ponderacion import clave_ponderacion, columnas_ponderacion, pesos_encuestados
+from proveedores import RegistroProveedores, marcadores_plantilla
+from tablas import formatear_celda
+from utils import leer_cabecera
+
+PLANTILLAS = {
+    "burnout": os.path.join("Burnout", "Plantillas", "plantilla_burnout.docx"),
+    "satisfaccion": os.path.join("Satisfacción laboral", "Plantillas", "plantilla_satisfaccion_laboral.docx"),
+    "generico": os.path.join("Generico", "Plantillas", "plantilla_generico.docx"),
+}
+RUTA_CONFIG_BURNOUT = os.path.join("Burnout", "Dimensiones_CBB.json")
+
+# Ficheros de respuestas (ya validadas) que se mantienen en memoria
+MAX_ESTADOS = 4
+
+# Párrafo de la plantilla genérica donde van las preguntas
+ANCLA_PREGUNTAS = "TEXTO_PREGUNTAS"
+
+# Elementos de texto de un párrafo (el texto de <w:t> es el suyo)
+TEXTOS = {qn('w:t'): "", qn('w:tab'): "\t", qn('w:br'): "\n", qn('w:cr'): "\n"}
+MC_FALLBACK = "{http://schemas.openxmlformats.org/markup-compatibility/2006}Fallback"
+
+_estados = OrderedDict()
+_cerrojo_estados = threading.Lock()
+
+
+# ---------------------------------------------------------------------------
+# Esqueleto de la plantilla
+# ---------------------------------------------------------------------------
+
+def _segmentos(parrafo) -> tuple:
+    """
+    Texto de un párrafo <w:p> como tupla de segmentos: cadenas literales y, por
+    cada marcador, (nombre, texto original hasta su bookmarkEnd). Los marcadores
+    internos de Word (_Toc, _GoBack...) se tratan como texto. Los párrafos de los
+    cuadros de texto se separan con saltos de línea y se omite su copia de
+    compatibilidad (mc:Fallback).
+    """
+    segmentos, actual = [], None
+
+    def recorrer(elemento):
+        nonlocal actual
+        for hijo in elemento:
+            if hijo.tag == MC_FALLBACK:
+                continue
+            if hijo.tag == qn('w:bookmarkStart'):
+                nombre = hijo.get(qn('w:name'), '')
+                if actual is None and not nombre.startswith('_'):
+                    actual = (nombre, hijo.get(qn('w:id')), [])
+            elif hijo.tag == qn('w:bookmarkEnd'):
+                if actual is not None and hijo.get(qn('w:id')) == actual[1]:
+                    segmentos.append((actual[0], "".join(actual[2])))
+                    actual = None
+            elif hijo.tag in TEXTOS:
+                texto = hijo.text or "" if hijo.tag == qn('w:t') else TEXTOS[hijo.tag]
+                (actual[2] if actual is not None else segmentos).append(texto)
+            else:
+                if hijo.tag == qn('w:p') and segmentos:
+                    segmentos.append("\n")
+                recorrer(hijo)
+
+    recorrer(parrafo)
+    if actual is not None:
+        # El marcador termina en otro párrafo
+        segmentos.append((actual[0], "".join(actual[2])))
+    return tuple(segmentos)
+
+
+def _etiqueta(estilo: str) -> str:
+    """Etiqueta HTML de un estilo de párrafo de Word."""
+    encabezado = re.match(r"(?:Heading|Título) (\d)", estilo)
+    if encabezado:
+        return f"h{min(int(encabezado.group(1)) + 1, 6)}"
+    if estilo.startswith(("Title", "Título")):
+        return "h1"
+    if "List" in estilo or "lista" in estilo:
+        return "li"
+    return "p"
+
+
+@lru_cache(maxsize=8)
+def _esqueleto_cacheado(ruta: str, mtime: float) -> tuple:
+    doc = Document(ruta)
+    bloques = []
+    for elemento in doc.element.body:
+        if elemento.tag == qn('w:p'):
+            estilo = Paragraph(elemento, doc._body).style
+            bloques.append(("p", _etiqueta(estilo.name if estilo is not None else ""), _segmentos(elemento)))
+        elif elemento.tag == qn('w:tbl'):
+            marcada = next((b.get(qn('w:name')) for b in elemento.iter(qn('w:bookmarkStart'))
+                            if b.get(qn('w:name'), '').startswith('TABLA_')), None)
+            filas = tuple(
+                tuple(tuple(_segmentos(p) for p in celda.iter(qn('w:p'))) for celda in fila.findall(qn('w:tc')))
+                for fila in elemento.findall(qn('w:tr'))
+            )
+            bloques.append(("tabla", marcada, filas))
+        # El índice (<w:sdt>) y las propiedades de sección no tienen contenido que previsualizar
+    return tuple(bloques)
+
+
+def esqueleto_plantilla(ruta: str) -> tuple:
+    """
+    Párrafos y tablas del cuerpo de una plantilla, reducidos a sus textos y
+    marcadores: ('p', etiqueta HTML, segmentos) o ('tabla', marcador TABLA_* o
+    None, filas de celdas de segmentos). Se cachea mientras el fichero no cambie.
+    """
+    return _esqueleto_cacheado(str(ruta), os.path.getmtime(ruta))
+
+
+# ---------------------------------------------------------------------------
+# Pintado en HTML
+# ---------------------------------------------------------------------------
+
+def _lineas(segmentos, reemplazos: dict) -> list[str]:
+    """
+    Líneas de un párrafo con los marcadores sustituidos. Como en
+    `replace_bookmark_pair`, un valor con saltos de línea sustituye al párrafo
+    entero (una línea por párrafo).
+    """
+    partes = []
+    for segmento in segmentos:
+        if isinstance(segmento, str):
+            partes.append(segmento)
+            continue
+        nombre, original = segmento
+        if nombre not in reemplazos:
+            partes.append(original)
+            continue
+        valor = "" if reemplazos[nombre] is None else str(reemplazos[nombre])
+        if "\n" in valor:
+            return valor.split("\n")
+        partes.append(valor)
+    return ["".join(partes)]
+
+
+def _escapar(texto) -> str:
+    return html.escape(str(texto)).replace("\n", "<br>")
+
+
+def tabla_html(cabecera, filas) -> str:
+    """Tabla HTML de (cabecera, filas), con los valores formateados como en el .docx."""
+    partes = ["<table><thead><tr>"]
+    partes += [f"<th>{_escapar(formatear_celda(valor))}</th>" for valor in cabecera]
+    partes.append("</tr></thead><tbody>")
+    for fila in filas:
+        partes.append("<tr>" + "".join(f"<td>{_escapar(formatear_celda(valor))}</td>" for valor in fila) + "</tr>")
+    partes.append("</tbody></table>")
+    return "".join(partes)
+
+
+def _lista(lineas) -> str:
+    return "<ul>" + "".join(f"<li>{_escapar(linea)}</li>" for linea in lineas) + "</ul>"
+
+
+def preguntas_html(calculo: dict, locale: str, formato: str = "lista") -> str:
+    """Bloques de preguntas del informe genérico (o su tabla compacta) en HTML."""
+    if formato == "tabla":
+        return tabla_html(*tabla_generico(calculo, locale))
+    partes = []
+    for seccion in calculo["secciones"]:
+        contenido = contenido_pregunta(seccion, locale, calculo["intervalos"])
+        partes.append(f"<p>{_escapar(contenido['texto'])}</p>")
+        partes.append(_lista(f"{texto}: {cnt}" for texto, cnt in contenido["conteos"].items()))
+        partes.append("<p>Resultados:</p>")
+        partes.append(_lista(contenido["resultados"]))
+    return "".join(partes)
+
+
+def renderizar_html(plantilla: str, reemplazos: dict, tablas: dict = None, preguntas: str = None) -> str:
+    """
+    HTML del contenido de `plantilla` con los marcadores de `reemplazos`.
+
+    `tablas` son los proveedores {TABLA_*: función → (cabecera, filas)} de
+    `rellenar_tablas` (solo se llaman los de las tablas presentes) y `preguntas`
+    el HTML que sustituye al párrafo TEXTO_PREGUNTAS. Los párrafos vacíos se omiten.
+    """
+    tablas = tablas or {}
+    partes, en_lista = ['<div class="vista-previa">'], False
+    for tipo, etiqueta, contenido in esqueleto_plantilla(plantilla):
+        if tipo == "tabla":
+            bloque = [tabla_html(*tablas[etiqueta]())] if etiqueta in tablas else [
+                "<table>" + "".join(
+                    "<tr>" + "".join(
+                        "<td>" + "<br>".join(_escapar(linea) for p in celda for linea in _lineas(p, reemplazos)
+                                             if linea.strip()) + "</td>"
+                        for celda in fila) + "</tr>"
+                    for fila in contenido) + "</table>"]
+            etiqueta = "table"
+        else:
+            lineas = [linea for linea in _lineas(contenido, reemplazos) if linea.strip()]
+            bloque = []
+            if preguntas is not None and any(ANCLA_PREGUNTAS in linea for linea in lineas):
+                lineas = [linea.replace(ANCLA_PREGUNTAS, "") for linea in lineas]
+                lineas = [linea for linea in lineas if linea.strip()]
+                bloque.append(preguntas)
+                etiqueta = "p" if etiqueta == "li" else etiqueta
+            bloque[:0] = [f"<{etiqueta}>{_escapar(linea)}</{etiqueta}>" for linea in lineas]
+        if not bloque:
+            continue
+        if (etiqueta == "li") != en_lista:
+            partes.append("<ul>" if not en_lista else "</ul>")
+            en_lista = not en_lista
+        partes.extend(bloque)
+    if en_lista:
+        partes.append("</ul>")
+    partes.append("</div>")
+    return "".join(partes)
+
+
+# ---------------------------------------------------------------------------
+# Respuestas ya leídas y proveedores reutilizables
+# ---------------------------------------------------------------------------
+
+class EstadoVista:
+    """
+    Respuestas validadas de un fichero y registro de proveedores que se reutiliza
+    en todas sus vistas previas. `cerrojo` serializa las vistas previas de
+    distintas sesiones sobre el mismo fichero.
+    """
+    __slots__ = ("validacion", "registro", "config", "catalogo", "cabecera", "cerrojo")
+
+    def __init__(self, validacion, config=None, catalogo=None, cabecera=None):
+        self.validacion = validacion
+        self.registro = RegistroProveedores()
+        self.config = config
+        self.catalogo = catalogo
+        self.cabecera = cabecera
+        self.cerrojo = threading.Lock()
+
+
+def _leer_estado(informe: str, csv_source, json_source=None, excluir=()) -> EstadoVista:
+    if informe == "burnout":
+        with open(RUTA_CONFIG_BURNOUT, "r", encoding="utf-8") as f:
+            config = json.load(f)
+        return EstadoVista(leer_respuestas_cbb(csv_source, config, excluir=excluir), config=config)
+    if informe == "satisfaccion":
+        return EstadoVista(leer_respuestas_satisfaccion(csv_source, excluir=excluir))
+    if informe == "generico":
+        catalogo = cargar_catalogo(json_source)
+        cabecera = leer_cabecera(csv_source, sep=";")
+        return EstadoVista(leer_respuestas_generico(csv_source, catalogo, cabecera),
+                           catalogo=catalogo, cabecera=cabecera)
+    raise ValueError(f"Tipo de informe desconocido: {informe}")
+
+
+def estado_vista(informe: str, csv_source, json_source=None, excluir=()) -> EstadoVista:
+    """
+    EstadoVista de unas entradas (por contenido): se lee la primera vez y después
+    se reutiliza. `excluir` son las columnas de la ponderación, que no se validan.
+    """
+    clave = (informe, hash_fuente(csv_source), hash_fuente(json_source) if json_source is not None else None,
+             tuple(excluir))
+    with _cerrojo_estados:
+        if clave in _estados:
+            _estados.move_to_end(clave)
+            return _estados[clave]
+    estado = _leer_estado(informe, csv_source, json_source, excluir)
+    with _cerrojo_estados:
+        estado = _estados.setdefault(clave, estado)
+        _estados.move_to_end(clave)
+        if len(_estados) > MAX_ESTADOS:
+            _estados.popitem(last=False)
+    return estado
+
+
+# ---------------------------------------------------------------------------
+# Vistas previas de cada informe
+# ---------------------------------------------------------------------------
+
+def vista_previa_burnout(csv_source, empresa, invitados, limite=10, intervalos_confianza=False,
+                         n_remuestras=1000, semilla=None, ponderacion=None) -> str:
+    """HTML con el contenido del informe de Burnout que generaría `generar_informe_burnout`."""
+    estado = estado_vista("burnout", csv_source, excluir=columnas_ponderacion(ponderacion))
+    plantilla = PLANTILLAS["burnout"]
+    with estado.cerrojo:
+        registrar_proveedores_burnout(estado.registro, estado.validacion, estado.config, empresa, invitados,
+                                      limite, intervalos_confianza, n_remuestras, semilla,
+                                      ponderacion=ponderacion)
+        reemplazos = estado.registro.resolver(marcadores_plantilla(plantilla))
+        return renderizar_html(plantilla, reemplazos, tablas_burnout(estado.registro, estado.config))
+
+
+def vista_previa_satisfaccion(csv_source, empresa, invitados, num_medidas=3, intervalos_confianza=False,
+                              n_remuestras=1000, semilla=None, ponderacion=None) -> str:
+    """HTML con el contenido del informe de satisfacción que generaría `generar_informe_satisfaccion`."""
+    estado = estado_vista("satisfaccion", csv_source, excluir=columnas_ponderacion(ponderacion))
+    plantilla = PLANTILLAS["satisfaccion"]
+    with estado.cerrojo:
+        registrar_proveedores_satisfaccion(estado.registro, estado.validacion, empresa, invitados, num_medidas,
+                                           intervalos_confianza, n_remuestras, semilla,
+                                           ponderacion=ponderacion)
+        reemplazos = estado.registro.resolver(marcadores_plantilla(plantilla))
+        return renderizar_html(plantilla, reemplazos, tablas_satisfaccion(estado.registro))
+
+
+def vista_previa_generico(csv_source, json_source, empresa: str, titulo: str, invitados: int, locale: str = "es",
+                          intervalos_confianza: bool = False, n_remuestras: int = 1000, semilla=None,
+                          formato: str = "lista", ponderacion=None) -> str:
+    """
+    HTML con el contenido del informe genérico que generaría `generar_informe_generico`.
+    Cambiar el idioma, el título o el formato no repite ningún cálculo.
+    """
+    estado = estado_vista("generico", csv_source, json_source)
+    estado.catalogo.validar_locale(locale)
+    plantilla = PLANTILLAS["generico"]
+    with estado.cerrojo:
+        registro = estado.registro
+        registro.registrar('calculo', lambda r: resumir_generico(
+            estado.validacion, estado.catalogo, estado.cabecera, intervalos_confianza, n_remuestras, semilla,
+            pesos_encuestados(estado.validacion, ponderacion)),
+            clave=(intervalos_confianza, n_remuestras, semilla, clave_ponderacion(ponderacion)))
+        registro.registrar('informacion', lambda r: informacion_generico(r.obtener('calculo'), empresa, titulo, invitados),
+                           patron=r'NOMBRE_EMPRESA|TITULO_INFORME|PARTICIPACION', clave=(empresa, titulo, invitados))
+        reemplazos = registro.resolver(marcadores_plantilla(plantilla))
+        return renderizar_html(plantilla, reemplazos, preguntas=preguntas_html(registro.obtener('calculo'), locale, formato))